@@ -6,12 +6,24 @@ import time
 import traceback
 from datetime import datetime
 
-from PIL import Image
-from fpdf import FPDF
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
+from image_crop import crop_images
+from image_output import IMAGE_EXTENSIONS, OutputCodec
+from page_count import PagePlan, resolve_page_count
+from pdf_writer import A4, IncrementalPdfWriter
+from tiled_capture import TiledCapture
+
 
 class NewspaperDownloader:
+    # Upper bound used only when the viewer does not expose a page count
+    MAX_PAGES = 60
+    # Page screenshots: "png", "jpeg" or "webp" (lossless)
+    OUTPUT_FORMAT = "png"
+    # Viewer screenshots are taken as clip tiles of this many CSS pixels and
+    # stitched off the browser thread; None takes one full-page screenshot
+    CAPTURE_TILE_SIZE = 1024
+
     # ───────────────────────── SET-UP ────────────────────────── #
     def __init__(self):
         self.setup_logging()
@@ -28,8 +40,13 @@ class NewspaperDownloader:
         self.output_dir = self.create_directories()
         self.pages_dir = self.output_dir  # Use same path for saving pages
 
-        # Crop box tuned for this paper (adjust if needed)
-        self.crop_box = (300, 350, 1700, 2540)
+        # None → detect the page area in each screenshot; set a
+        # (left, top, right, bottom) box to force a fixed crop instead
+        self.crop_box = None
+
+        self.codec = OutputCodec(self.OUTPUT_FORMAT)
+        self.capture = (TiledCapture(tile_size=self.CAPTURE_TILE_SIZE, workdir=self.output_dir)
+                        if self.CAPTURE_TILE_SIZE else None)
 
     # ───────────────────────── UTILITIES ─────────────────────── #
     @staticmethod
@@ -109,9 +126,14 @@ class NewspaperDownloader:
                 ).forEach(el => el.style.display = 'none');
             }""")
 
-            # Full-page screenshot
-            page.screenshot(path=screenshot_path, full_page=True, type="png", omit_background=True)
-            logging.info(f"✅ Saved full-page screenshot: {screenshot_path}")
+            if self.capture:
+                # Tiles are grabbed now; stitching and encoding run in the background
+                self.capture.capture(page, screenshot_path, codec=self.codec)
+                logging.info(f"✅ Captured page {page_number} tiles, saving in background")
+            else:
+                screenshot = page.screenshot(full_page=True, type="png", omit_background=True)
+                screenshot_path = self.codec.save_bytes(screenshot, screenshot_path)
+                logging.info(f"✅ Saved full-page screenshot: {screenshot_path}")
 
             # Restore zoom
             try:
@@ -291,17 +313,11 @@ class NewspaperDownloader:
     # ───────────────────────── POST-PROCESS ──────────────────── #
     def crop_all_images(self):
         logging.info(f"✂️ Starting cropping of images in: {self.pages_dir}")
-        image_files = [f for f in os.listdir(self.pages_dir) if f.lower().endswith(('.png', '.jpg'))]
-
-        for image_file in image_files:
-            image_path = os.path.join(self.pages_dir, image_file)
-            try:
-                with Image.open(image_path) as img:
-                    cropped = img.crop(self.crop_box)
-                    cropped.save(image_path)
-                    logging.info(f"✂️ Cropped and saved: {image_path}")
-            except Exception as crop_err:
-                logging.error(f"❌ Failed to crop {image_file}: {crop_err}\n{traceback.format_exc()}")
+        image_files = [os.path.join(self.pages_dir, f) for f in os.listdir(self.pages_dir)
+                       if f.lower().endswith(IMAGE_EXTENSIONS)]
+        results = crop_images(image_files, box=self.crop_box)
+        for image_path in results["failed"]:
+            logging.error(f"❌ Failed to crop {image_path}")
 
     @staticmethod
     def natural_sort_key(s):
@@ -309,32 +325,15 @@ class NewspaperDownloader:
 
     def create_pdf(self):
         logging.info("📄 Creating PDF…")
-        pdf = FPDF(unit="mm", format="A4")
-        a4_width, a4_height = 210, 297
-
-        images = [f for f in os.listdir(self.pages_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+        images = [f for f in os.listdir(self.pages_dir) if f.lower().endswith(IMAGE_EXTENSIONS)]
         images.sort(key=self.natural_sort_key)
 
-        for image_file in images:
-            image_path = os.path.join(self.pages_dir, image_file)
-            with Image.open(image_path) as img:
-                img_width, img_height = img.size
-                aspect = img_width / img_height
-
-                if a4_width / a4_height > aspect:
-                    h = a4_height
-                    w = h * aspect
-                else:
-                    w = a4_width
-                    h = w / aspect
-
-                x = (a4_width - w) / 2
-                y = (a4_height - h) / 2
-                pdf.add_page()
-                pdf.image(image_path, x=x, y=y, w=w, h=h)
-
         pdf_output_path = os.path.join(self.output_dir, f"{self.today}_{self.publication_name}.pdf")
-        pdf.output(pdf_output_path)
+        # Pages are fitted and centred on A4, one image in memory at a time
+        with IncrementalPdfWriter(pdf_output_path, page_size=A4) as writer:
+            for image_file in images:
+                writer.add_file(os.path.join(self.pages_dir, image_file))
+        writer.report()
         logging.info(f"✅ PDF created: {pdf_output_path}")
 
         return pdf_output_path
@@ -348,16 +347,24 @@ class NewspaperDownloader:
 
             try:
                 self.navigate_to_newspaper(page)
-                current_page = 1
-                max_pages = 20  # adjust if you need more
+                total_pages = resolve_page_count(page, "de_viewer")
+                if total_pages:
+                    logging.info(f"📑 Viewer reports {total_pages} pages")
+                else:
+                    total_pages = self.MAX_PAGES
+                    logging.warning(f"Page count not found, stopping at the last page (max {total_pages})")
+                plan = PagePlan(self.publication_name, total_pages)
 
-                while current_page <= max_pages:
+                for current_page in plan:
                     self.process_page(page, current_page)
+                    plan.mark(current_page)
 
+                    if current_page == len(plan):
+                        break
                     if not self.navigate_to_next_page(page, current_page):
                         break
 
-                    current_page += 1
+                plan.summary()
 
             finally:
                 context.close()
@@ -366,20 +373,13 @@ class NewspaperDownloader:
         self.post_processing()
 
     def post_processing(self):
+        if self.capture:
+            self.capture.close()
+        self.codec.report("screenshots")
         self.crop_all_images()
+        # Cropped pages are already in output_dir (pages_dir is the same folder)
         pdf_output_path = self.create_pdf()
 
-        # Move cropped images (now ready) to main folder and delete Pages/
-        try:
-            image_files = [f for f in os.listdir(self.pages_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-            for image_file in image_files:
-                src_path = os.path.join(self.pages_dir, image_file)
-                dst_path = os.path.join(self.output_dir, image_file)
-                os.rename(src_path, dst_path)
-                logging.info(f"✅ Moved cropped image {image_file} → {dst_path}")
-        except Exception as e:
-            logging.error(f"❌ Failed to move cropped images: {e}")
-
         try:
             os.remove(pdf_output_path)
             logging.info(f"✅ Removed E-Paper PDF at: {pdf_output_path}")
@@ -0,0 +1,78 @@
+"""
+Concurrent HTTP resolution of article detail pages.
+
+Map-area scrapers used to open every article in a browser tab, wait, and
+parse ``driver.page_source``. Once the detail page URLs are known from the
+page markup they can be fetched directly with requests, a few at a time, and
+only the ``<img>`` tags parsed out of the response.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+
+DEFAULT_WORKERS = 8
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+
+_IMG_ONLY = SoupStrainer("img")
+
+
+def session_from_driver(driver, referer=None, pool_size=DEFAULT_WORKERS):
+    """Build a requests session that carries the Selenium driver's cookies."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    if referer:
+        session.headers["Referer"] = referer
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie["name"], cookie["value"],
+                            domain=cookie.get("domain"),
+                            path=cookie.get("path", "/"))
+    return session
+
+
+def extract_image_urls(html, base_url, keep=None):
+    """Return absolute ``src``/``data-src`` URLs of the images in ``html``.
+
+    Only ``<img>`` tags are built into the tree, which keeps parsing cheap on
+    large detail pages. ``keep`` filters the URLs when given.
+    """
+    soup = BeautifulSoup(html, "html.parser", parse_only=_IMG_ONLY)
+    urls = []
+    for img in soup.find_all("img"):
+        src = img.get("src") or img.get("data-src")
+        if not src:
+            continue
+        src = urljoin(base_url, src)
+        if keep is None or keep(src):
+            urls.append(src)
+    return urls
+
+
+def fetch_articles(session, articles, handle, max_workers=DEFAULT_WORKERS,
+                   timeout=30):
+    """Fetch detail pages concurrently and pass each one to ``handle``.
+
+    ``articles`` is an iterable of ``(key, url)`` pairs. ``handle`` receives
+    ``(key, url, html)`` and runs in the worker thread, so it can download
+    the images it finds without waiting on other articles. Results are
+    returned in the order of ``articles``; failed fetches yield None.
+    """
+    def work(article):
+        key, url = article
+        try:
+            response = session.get(url, timeout=timeout)
+            if response.status_code != 200:
+                print(f"Failed to fetch {url}: HTTP {response.status_code}")
+                return None
+            return handle(key, url, response.text)
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(work, list(articles)))
@@ -0,0 +1,128 @@
+"""
+Article regions cropped locally from a downloaded page image.
+
+Viewers such as the pagerectangle (Namasthe Telangana), areamapper and
+carousel platforms overlay each article with a positioned element whose
+top/left/width/height are in CSS pixels of the displayed page (or in
+percent of it). Scaling those boxes to the high-resolution page image lets a
+scraper cut every article out of the one page it already downloaded instead
+of fetching N article images. The edition manifest records each article's
+box in page-image pixels; no later stage reads it yet.
+"""
+import json
+import os
+import re
+
+from PIL import Image
+
+MIN_REGION = 16  # pixels; smaller boxes are overlay artefacts
+# Largest relative difference between the displayed and the image aspect
+# ratio for pixel positions to be trusted
+MAX_ASPECT_ERROR = 0.03
+_NUMBER = re.compile(r"^\s*(-?[\d.]+)\s*(px|%)?\s*$")
+
+
+def parse_style(style):
+    """``"top: 10px; left: 5%"`` -> ``{"top": "10px", "left": "5%"}``."""
+    position = {}
+    for declaration in (style or "").split(";"):
+        key, sep, value = declaration.partition(":")
+        if sep:
+            position[key.strip().lower()] = value.strip()
+    return position
+
+
+def _length(value, view, image):
+    """One CSS length in image pixels: px scaled by image/view, % of image."""
+    match = _NUMBER.match(str(value))
+    if match is None:
+        raise ValueError(f"unsupported CSS length: {value!r}")
+    number, unit = float(match.group(1)), match.group(2)
+    if unit == "%":
+        return number * image / 100
+    if not view:
+        raise ValueError("pixel positions need the displayed page size")
+    return number * image / view
+
+
+def scale_box(position, view_size, image_size):
+    """Pixel ``(left, top, right, bottom)`` of a CSS box, clamped to the image.
+
+    ``position`` holds top/left/width/height strings; ``view_size`` is the
+    size of the element the box is positioned in, ``image_size`` the size of
+    the downloaded page image.
+    """
+    view_w, view_h = view_size or (None, None)
+    image_w, image_h = image_size
+    left = _length(position["left"], view_w, image_w)
+    top = _length(position["top"], view_h, image_h)
+    right = left + _length(position["width"], view_w, image_w)
+    bottom = top + _length(position["height"], view_h, image_h)
+    left, top = max(0, round(left)), max(0, round(top))
+    right, bottom = min(image_w, round(right)), min(image_h, round(bottom))
+    if right - left < MIN_REGION or bottom - top < MIN_REGION:
+        raise ValueError(f"region too small: {(left, top, right, bottom)}")
+    return left, top, right, bottom
+
+
+def view_matches(view_size, image_size, max_error=MAX_ASPECT_ERROR):
+    """True when ``view_size`` plausibly displays an image of ``image_size``.
+
+    The displayed size is read from the overlays' container; if that is not
+    the element showing the page, its aspect ratio gives it away.
+    """
+    if not view_size or not all(view_size):
+        return False
+    view_ratio = view_size[0] / view_size[1]
+    image_ratio = image_size[0] / image_size[1]
+    return abs(view_ratio - image_ratio) <= max_error * image_ratio
+
+
+def crop_regions(page_path, regions, view_size, quality=95):
+    """Cut each region out of the page image.
+
+    ``regions`` is a list of ``(position, dest)`` pairs. The page is decoded
+    once; returns ``{dest: box}`` for the regions saved, failures are skipped.
+    Raises ValueError when ``view_size`` does not fit the page image.
+    """
+    saved = {}
+    with Image.open(page_path) as page:
+        if not view_matches(view_size, page.size):
+            raise ValueError(f"displayed size {view_size} does not match the page "
+                             f"image {page.size}")
+        page = page.convert("RGB")
+        for position, dest in regions:
+            try:
+                box = scale_box(position, view_size, page.size)
+            except (KeyError, ValueError) as e:
+                print(f"⚠️ Skipping region for {dest}: {e}")
+                continue
+            os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+            page.crop(box).save(dest, "JPEG", quality=quality)
+            saved[dest] = box
+    return saved
+
+
+class EditionManifest:
+    """Page images and article boxes of one edition, saved as JSON."""
+
+    def __init__(self, path, publication, edition, date):
+        self.path = path
+        self.data = {"publication": publication, "edition": edition,
+                     "date": date, "pages": []}
+
+    def add_page(self, page_number, image, view_size, articles):
+        """``articles`` are dicts with at least ``position`` and, once cropped,
+        ``box`` (image pixels) and ``image`` (the crop path)."""
+        self.data["pages"].append({
+            "page_number": page_number,
+            "image": image,
+            "view_size": list(view_size) if view_size else None,
+            "articles": articles,
+        })
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        return self.path
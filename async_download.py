@@ -0,0 +1,91 @@
+"""
+Non-blocking downloads for the async (Playwright) scrapers.
+
+Calling ``requests`` or ``time.sleep`` from a coroutine freezes the event
+loop, so the browser sits idle while every file downloads one after the
+other. AsyncDownloader shares one aiohttp session per crawl, caps the number
+of transfers in flight and lets a scraper schedule a download and carry on
+driving the browser, collecting the results with ``drain()`` at the end.
+"""
+import asyncio
+import os
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+DEFAULT_CONCURRENCY = 8
+CHUNK_SIZE = 64 * 1024
+
+
+class AsyncDownloader:
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, timeout=30, retries=3,
+                 headers=None):
+        self.concurrency = concurrency
+        self.timeout = ClientTimeout(total=timeout)
+        self.retries = retries
+        self.headers = headers or {"User-Agent": "Mozilla/5.0"}
+        self.session = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pending = []
+
+    async def __aenter__(self):
+        self.session = ClientSession(
+            timeout=self.timeout,
+            headers=self.headers,
+            connector=TCPConnector(limit=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.drain()
+        await self.session.close()
+
+    async def _request(self, url, handle):
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with self._semaphore:
+                    async with self.session.get(url) as response:
+                        response.raise_for_status()
+                        return await handle(response)
+            except Exception as e:
+                if attempt == self.retries:
+                    print(f"Failed to download {url} after {self.retries} attempts: {e}")
+                    return None
+                print(f"Retry {attempt}/{self.retries} for {url}: {e}")
+                await asyncio.sleep(2 * attempt)
+
+    async def fetch(self, url):
+        """Return the response body as bytes, or None on failure."""
+        return await self._request(url, lambda response: response.read())
+
+    async def fetch_text(self, url):
+        """Return the response body as text, or None on failure."""
+        return await self._request(url, lambda response: response.text())
+
+    async def download(self, url, dest):
+        """Stream ``url`` to ``dest``; returns ``dest`` or None on failure."""
+        dest = str(dest)
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+
+        async def save(response):
+            with open(dest, "wb") as f:
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    f.write(chunk)
+            return dest
+
+        path = await self._request(url, save)
+        if path:
+            print(f"Downloaded: {url} -> {dest}")
+        return path
+
+    def schedule(self, url, dest):
+        """Start a download in the background and return its task."""
+        task = asyncio.ensure_future(self.download(url, dest))
+        self._pending.append(task)
+        return task
+
+    async def drain(self):
+        """Wait for every scheduled download and return their results."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return []
+        return await asyncio.gather(*pending)
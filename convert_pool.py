@@ -0,0 +1,119 @@
+"""
+Background format conversion for downloaded pages.
+
+Converting a GIF or JPEG to PDF, or re-encoding an image, is CPU work that
+used to run inline between downloads, so the network sat idle while a page
+was converted. ConversionPool runs those jobs in worker processes: a
+download submits its conversion and moves straight on to the next one.
+Throughput is reported per format when the pool is closed.
+"""
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import img2pdf
+from PIL import Image
+
+from image_output import OutputCodec
+
+
+# ───────── conversion jobs (run in worker processes) ───────── #
+def gif_to_pdf(gif_path, pdf_path, delete_source=True):
+    """Convert a downloaded GIF page to a single-page PDF."""
+    with Image.open(gif_path) as img:
+        img.convert("RGB").save(pdf_path)
+    if delete_source:
+        os.remove(gif_path)
+    return pdf_path
+
+
+def image_to_pdf(content, pdf_path):
+    """Wrap image bytes in a PDF; JPEG data is embedded without re-encoding."""
+    with open(pdf_path, "wb") as f:
+        f.write(img2pdf.convert(content))
+    return pdf_path
+
+
+def encode_image(content, dest, fmt="original", **options):
+    """Save image bytes through OutputCodec; returns the path written."""
+    return OutputCodec(fmt, **options).save_bytes(content, dest)
+
+
+def _timed(func, args, kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def _input_size(args):
+    source = args[0] if args else None
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    if isinstance(source, (str, os.PathLike)) and os.path.exists(source):
+        return os.path.getsize(source)
+    return 0
+
+
+class ConversionPool:
+    """Process pool that download loops hand conversion jobs to.
+
+    ``submit(fmt, func, *args)`` returns immediately; ``fmt`` is the label
+    the job's throughput is reported under (e.g. "gif", "jpeg").
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._futures = {}
+        self._started = time.perf_counter()
+        self.stats = defaultdict(lambda: {"jobs": 0, "failed": 0,
+                                          "seconds": 0.0, "bytes": 0})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def submit(self, fmt, func, *args, **kwargs):
+        future = self._executor.submit(_timed, func, args, kwargs)
+        self._futures[future] = (fmt, _input_size(args))
+        return future
+
+    def wait(self):
+        """Wait for every submitted job; returns their results (None if failed)."""
+        results = []
+        pending, self._futures = self._futures, {}
+        for future in as_completed(pending):
+            fmt, size = pending[future]
+            stats = self.stats[fmt]
+            stats["jobs"] += 1
+            try:
+                result, seconds = future.result()
+                stats["seconds"] += seconds
+                stats["bytes"] += size
+                print(f"Converted ({fmt}): {result}")
+                results.append(result)
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"Error converting {fmt} job: {str(e)}")
+                results.append(None)
+        return results
+
+    def close(self):
+        self.wait()
+        self._executor.shutdown()
+        self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self._started
+        for fmt, stats in sorted(self.stats.items()):
+            done = stats["jobs"] - stats["failed"]
+            per_job = stats["seconds"] / done if done else 0
+            rate = stats["bytes"] / (1024 * 1024) / stats["seconds"] if stats["seconds"] else 0
+            print(f"🔁 {fmt}: {done}/{stats['jobs']} converted, "
+                  f"{per_job * 1000:.0f} ms per job, {rate:.1f} MB/s per worker")
+        if self.stats:
+            print(f"Conversions finished {elapsed:.1f}s after start "
+                  f"with {self.workers} workers")
@@ -9,6 +9,8 @@ from typing import Optional
 from playwright.async_api import async_playwright, Page, ElementHandle, \
     TimeoutError as PlaywrightTimeoutError
 
+from async_download import AsyncDownloader
+
 
 # === Configuration ===
 MAX_RETRIES = 3
@@ -26,23 +28,16 @@ BASE_URL_TEMPLATE = "http://webmilap.com/edition/HindiMilap/HINDIMIL_HIN/HINDIMI
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
-def download_image(url: str, filepath: str):
-    import requests
+def download_image(downloader: AsyncDownloader, url: str, filepath: str):
+    """Schedule an image download without blocking the crawl."""
     global HINDI_MILAP_LOGO_DOWNLOADED
-    try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        if HINDI_MILAP_LOGO_NAME in url:
-            if HINDI_MILAP_LOGO_DOWNLOADED:
-                print(f"Skipped duplicate logo: {url}")
-                return
-            HINDI_MILAP_LOGO_DOWNLOADED = True
-
-        with open(filepath, 'wb') as f:
-            f.write(r.content)
-        print(f"Downloaded: {url} -> {filepath}")
-    except Exception as e:
-        print(f"Failed downloading {url}: {e}")
+    if HINDI_MILAP_LOGO_NAME in url:
+        if HINDI_MILAP_LOGO_DOWNLOADED:
+            print(f"Skipped duplicate logo: {url}")
+            return
+        HINDI_MILAP_LOGO_DOWNLOADED = True
+
+    downloader.schedule(url, filepath)
 
 
 async def remove_overlay(element: ElementHandle):
@@ -65,7 +60,8 @@ async def open_article_popup(page: Page, article_div: ElementHandle) -> \
     return None
 
 
-async def extract_images_from_tab(tab: Page, page_num: int, article_num: int):
+async def extract_images_from_tab(tab: Page, downloader: AsyncDownloader,
+                                  page_num: int, article_num: int):
     try:
         await tab.wait_for_load_state('networkidle', timeout=TIMEOUT_LOAD)
     except PlaywrightTimeoutError:
@@ -96,11 +92,12 @@ async def extract_images_from_tab(tab: Page, page_num: int, article_num: int):
             ext = os.path.splitext(src)[-1].split("?")[0] or ".jpg"
             filename = f"daily_hindi_milap{date.strftime('%Y_%m_%d')}{page_num}{article_num}{ext}"
             filepath = os.path.join(OUTPUT_DIR, filename)
-            await asyncio.to_thread(download_image, src, filepath)
+            download_image(downloader, src, filepath)
 
 
-async def process_article(page: Page, article_div: ElementHandle,
-                          page_num: int, article_num: int):
+async def process_article(page: Page, downloader: AsyncDownloader,
+                          article_div: ElementHandle, page_num: int,
+                          article_num: int):
     try:
         await remove_overlay(article_div)
         if await article_div.is_visible():
@@ -112,7 +109,8 @@ async def process_article(page: Page, article_div: ElementHandle,
                 f"Failed to open popup for article {article_num} on page {page_num}")
             return
 
-        await extract_images_from_tab(new_tab, page_num, article_num)
+        await extract_images_from_tab(new_tab, downloader, page_num,
+                                      article_num)
         await new_tab.close()
 
     except Exception as e:
@@ -120,7 +118,8 @@ async def process_article(page: Page, article_div: ElementHandle,
             f"Unexpected error in article {article_num} on page {page_num}: {e}")
 
 
-async def scrape_page(page: Page, page_index: int):
+async def scrape_page(page: Page, downloader: AsyncDownloader,
+                      page_index: int):
     await page.click(f".carousel-indicators li:nth-child({page_index + 1})")
     await page.wait_for_selector(
         ".carousel-item.active div.epaper-article-container",
@@ -132,28 +131,29 @@ async def scrape_page(page: Page, page_index: int):
     print(f"Page {page_index + 1} has {len(articles)} articles")
 
     for idx, article in enumerate(articles, 1):
-        await process_article(page, article, page_index + 1, idx)
+        await process_article(page, downloader, article, page_index + 1, idx)
 
 
-async def scrape_all_carousel_items(page: Page):
+async def scrape_all_carousel_items(page: Page, downloader: AsyncDownloader):
     await page.wait_for_selector(".carousel-inner", timeout=TIMEOUT_SELECTOR)
     indicators = await page.query_selector_all(".carousel-indicators li")
     print(f"Carousel has {len(indicators)} pages")
 
     for index in range(len(indicators)):
-        await scrape_page(page, index)
+        await scrape_page(page, downloader, index)
 
 
 async def hindi_milap_crawler():
     today = datetime.date.today()
     base_url = BASE_URL_TEMPLATE.format(date=today.strftime("%Y%m%d"), page=1)
 
-    async with async_playwright() as pw:
+    async with async_playwright() as pw, AsyncDownloader() as downloader:
         browser = await pw.chromium.launch(headless=True)
         page = await browser.new_page()
         await page.goto(base_url)
-        await scrape_all_carousel_items(page)
+        await scrape_all_carousel_items(page, downloader)
         await browser.close()
+        await downloader.drain()
 
 
 if __name__ == "__main__":
@@ -2,10 +2,10 @@ import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 from pathlib import Path
-from pdf2image import convert_from_path
-import os
 import shutil
 
+from universal_pdf_processor import page_jobs, rasterize
+
 # === CONFIGURATION ===
 publication_name = "dainik_sambad"
 edition_name = "agartala"
@@ -30,13 +30,15 @@ num_pages = len(select.find_all("option"))
 # Step 4: Prepare folder
 base_folder.mkdir(parents=True, exist_ok=True)
 
-# Step 5: Download PDFs and convert to PNG
+# Step 5: Download PDFs, then render all pages to PNG in parallel
 base_url = f"https://dainiksambad.net/epaperimages/{date_str}"
+image_prefix = f"{publication_name.lower().replace(' ', '_')}_{edition_name.lower()}_{date_str}"
 
+jobs = []
 for i in range(1, num_pages + 1):
     pdf_url = f"{base_url}/PAGE-{i}.PDF"
     pdf_path = base_folder / f"page_{i}.pdf"
-    
+
     try:
         # Download PDF
         r = requests.get(pdf_url)
@@ -44,21 +46,12 @@ for i in range(1, num_pages + 1):
         with open(pdf_path, "wb") as f:
             f.write(r.content)
         print(f"✅ Downloaded: PAGE-{i}.pdf")
+        jobs.extend(page_jobs(pdf_path, base_folder.parent, f"{image_prefix}_{i}"))
 
-        # Convert PDF to image
-        images = convert_from_path(str(pdf_path), dpi=400)
-        for img_index, img in enumerate(images):
-            image_filename = f"{publication_name.lower().replace(' ', '_')}_{edition_name.lower()}_{date_str}_{i}.png"
-            image_path = base_folder.parent / image_filename
-            img.save(image_path, "PNG")
-            print(f"🖼️  Saved image: {image_path.name}")
-        
-        # Delete the original PDF
-        os.remove(pdf_path)
-        print(f"🗑️  Deleted PDF: {pdf_path.name}")
-        
     except Exception as e:
         print(f"❌ Failed PAGE-{i}: {e}")
 
+# Convert PDFs to images; the PDFs are removed with their folder below
+rasterize(jobs, dpi=400)
 
-shutil.rmtree(base_folder)
\ No newline at end of file
+shutil.rmtree(base_folder)
@@ -6,14 +6,14 @@ Extracts every clipped article image from each page of the
 Chennai and Hyderabad editions at http://epaper.deccanchronicle.com
 
 Saves files under:
-  DeccanChronicle/{EditionName}/(DeccanChronicle{DATE}{EditionName}{page:02d}article{idx}).png
+  DeccanChronicle/{EditionName}/(DeccanChronicle{DATE}{EditionName}{page:02d}article{idx}).{ext}
+where {ext} follows OUTPUT_FORMAT ("original" keeps the served JPEG as-is).
 """
 
-import io, pathlib, re, sys, time
+import pathlib, re, sys, time
 from datetime import date
 
 import requests
-from PIL import Image
 from selenium import webdriver
 from selenium.common.exceptions import (
     NoSuchElementException, TimeoutException)
@@ -30,13 +30,19 @@ except ImportError:
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+from convert_pool import ConversionPool, encode_image
+from image_output import sniff_format
+from page_count import PagePlan, resolve_page_count
+
 # ───────── user settings ─────────
 DATE          = date.today().strftime("%Y-%m-%d")
 EDITIONS      = [("CHN", "chennai"), ("HYD", "hyderabad")]
-LAST_PAGE     = 10
+LAST_PAGE     = None  # None → read from the viewer's page thumbnails
+MAX_PAGES     = 60    # upper bound when the viewer exposes no count
 HEADLESS      = True
 BASE_SAVE_DIR = pathlib.Path("downloads/deccan_chronicle")
 PUB           = "DeccanChronicle"
+OUTPUT_FORMAT = "original"  # or "png", "jpeg", "webp"
 # ─────────────────────────────────
 
 # CSS/XPath selectors
@@ -55,23 +61,28 @@ def make_driver(headless=True):
         service=Service(ChromeDriverManager().install()), options=opts
     )
 
-def save_png(src_url, dest_path):  # changed: save as PNG
+def save_clip(src_url, dest_path, pool):
+    """Download a clip and queue it to be saved in OUTPUT_FORMAT."""
     if src_url.startswith("//"):
         src_url = "https:" + src_url
     r = requests.get(src_url, timeout=(60,60))
     r.raise_for_status()
-    img = Image.open(io.BytesIO(r.content)).convert("RGB")
-    dest_path.parent.mkdir(parents=True, exist_ok=True)
-    img.save(dest_path, "PNG", quality=90)
+    # Encoding runs in the pool while the next clip downloads
+    return pool.submit(sniff_format(r.content) or "image", encode_image,
+                       r.content, str(dest_path), OUTPUT_FORMAT)
 
-def scrape_edition(driver, wait, edition_name):
+def scrape_edition(driver, wait, edition_name, pool):
     """
-    After selecting edition, loop pages 1…LAST_PAGE by clicking the thumbnail
-    with title="{page}", then extracting all clipped article images.
+    After selecting edition, resolve the page count from the thumbnail strip,
+    loop over every page by clicking the thumbnail with title="{page}", then
+    extract all clipped article images.
     Saves into BASE_SAVE_DIR/edition_name/ with filenames including edition.
     """
     edition_dir = BASE_SAVE_DIR / edition_name                   # changed: no date directory
-    for page in range(1, LAST_PAGE + 1):
+    last_page = LAST_PAGE or resolve_page_count(driver, "aspx_thumbs") or MAX_PAGES
+    plan = PagePlan(edition_name, last_page)
+    print(f"  {edition_name}: {len(plan)} pages planned")
+    for page in plan:
         print(f"  {edition_name} Page {page}")
 
         # a) Click thumbnail to navigate if page > 1
@@ -81,6 +92,7 @@ def scrape_edition(driver, wait, edition_name):
                 thumb = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, thumb_selector)))
             except TimeoutException:
                 print(f"   Thumbnail for page {page} not found → stopping {edition_name}.")
+                plan.mark(page, ok=False)
                 break
             thumb.click()
             time.sleep(1)  # allow page to load
@@ -90,11 +102,13 @@ def scrape_edition(driver, wait, edition_name):
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, OVERLAY_CSS)))
         except TimeoutException:
             print(f"   No overlays on {edition_name} page {page} → skipping.")
+            plan.mark(page)
             continue
 
         overlays = driver.find_elements(By.CSS_SELECTOR, OVERLAY_CSS)
         if not overlays:
             print(f"   No overlays found on {edition_name} page {page} → skipping.")
+            plan.mark(page)
             continue
 
         print(f"   Found {len(overlays)} overlays on {edition_name} page {page}")
@@ -120,21 +134,25 @@ def scrape_edition(driver, wait, edition_name):
                 continue
 
             img_src = img_el.get_attribute("src")
-            # filename includes edition inside parentheses, save as PNG
-            filename = f"({PUB}{DATE}{edition_name}{page:02d}article{idx}).png"  # changed: .png extension
-            dest = edition_dir / filename
-            save_png(img_src, dest)
-            print(f"    • Saved {filename}")
+            # filename includes edition inside parentheses; the extension
+            # follows the format actually written
+            filename = f"({PUB}{DATE}{edition_name}{page:02d}article{idx}).png"
+            save_clip(img_src, edition_dir / filename, pool)
+            print(f"    • Queued {filename}")
 
             driver.close()
             driver.switch_to.window(main_handle)
             time.sleep(0.2)
 
+        plan.mark(page)
         time.sleep(0.5)  # brief pause before next page
 
+    plan.summary()
+
 def main():
     driver = make_driver(HEADLESS)
     wait   = WebDriverWait(driver, 20)
+    pool   = ConversionPool()
 
     try:
         driver.get("http://epaper.deccanchronicle.com/epaper_main.aspx#2840765")
@@ -152,12 +170,13 @@ def main():
             print(f"Selecting edition: {edition_name} ({code})")
             select.select_by_value(code)
             time.sleep(2)  # allow postback
-            scrape_edition(driver, wait, edition_name)
+            scrape_edition(driver, wait, edition_name, pool)
             print(f"Finished edition {edition_name}\n")
             time.sleep(1)
 
     finally:
         driver.quit()
+        pool.close()
         print("All done. Images saved under:", BASE_SAVE_DIR.resolve())  # changed: no date in path
 
 if __name__ == "__main__":
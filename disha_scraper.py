@@ -5,11 +5,18 @@ from pathlib import Path
 
 from playwright.sync_api import sync_playwright, Page
 
+from tiled_capture import TiledCapture
+
 
 class DishaCrawler:
-    def __init__(self, base_url: str, output_dir: str = "downloads/disha"):
+    def __init__(self, base_url: str, output_dir: str = "downloads/disha",
+                 capture_tile_size: int = 512):
         self.base_url = base_url
         self.output_dir = Path(output_dir)
+        # Page screenshots are taken as clip tiles of this many CSS pixels and
+        # stitched off the browser thread; 0 takes one element screenshot
+        self.capture_tile_size = capture_tile_size
+        self.capture = None
         self._setup_logging()
         self._create_output_dir()
 
@@ -126,11 +133,18 @@ class DishaCrawler:
 
             page.set_viewport_size({"width": 800, "height": 1000})
 
+            image_path = page_folder / f"disha_{paper_date}_{current_page}.png"
+            if self.capture:
+                # Tiles are grabbed now; stitching runs in the background
+                self.capture.capture(page, image_path, element=container)
+                self._restore_pagination(page)
+                self.logger.info(f"Screenshot tiles captured: {image_path}")
+                return True
+
             screenshot_bytes = container.screenshot()
 
             self._restore_pagination(page)
             # Save the screenshot
-            image_path = page_folder / f"disha_{paper_date}_{current_page}.png"
             with open(image_path, "wb") as f:
                 f.write(screenshot_bytes)
 
@@ -308,6 +322,8 @@ class DishaCrawler:
             browser = playwright.chromium.launch(headless=True)
             context = browser.new_context()
             page = context.new_page()
+            if self.capture_tile_size:
+                self.capture = TiledCapture(tile_size=self.capture_tile_size)
 
             try:
                 page.goto(self.base_url)
@@ -343,6 +359,10 @@ class DishaCrawler:
                 self.logger.error(f"Critical error: {e}")
 
             finally:
+                if self.capture:
+                    saved = self.capture.close()
+                    self.logger.info(f"Stitched {len(saved)} tiled screenshots")
+                    self.capture = None
                 browser.close()
 
 
@@ -2,11 +2,13 @@ import requests
 from datetime import datetime
 import os
 from bs4 import BeautifulSoup
-from PyPDF2 import PdfMerger
+from edition_pool import DEFAULT_CONCURRENCY, run_editions
+from pdf_merge import StreamingPdfMerger, merge_pdfs
 
 
 class TheEchoOfIndiaCrawler:
-    def __init__(self):
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY):
+        self.concurrency = concurrency
         self.base_url = "http://www.echoofindia.com/ePaper/index.aspx?page=VEVPSQ=="
         self.page_url = (
             "http://www.echoofindia.com/WebService/Master.asmx/GetPdfDocument"
@@ -25,17 +27,10 @@ class TheEchoOfIndiaCrawler:
 
     def merge_pdfs(self,pdf_files, output_path):
         """Merge all PDFs into one and delete individual files"""
-        merger = PdfMerger()
-        for pdf in pdf_files:
-            try:
-                merger.append(pdf)
-            except Exception as e:
-                print(f"Error merging {pdf}: {str(e)}")
-                continue
-
         try:
-            merger.write(output_path)
-            merger.close()
+            if not merge_pdfs(pdf_files, output_path):
+                print(f"Nothing merged into {output_path}")
+                return False
             print(f"Merged PDF created: {output_path}")
 
             # Delete individual PDFs
@@ -51,14 +46,15 @@ class TheEchoOfIndiaCrawler:
             print(f"Error saving merged PDF: {str(e)}")
             return False
 
-    def download_pdf_data(self, page_name_list, date_str, addition_name):
+    def download_pdf_data(self, page_name_list, date_str, addition_name,
+                          session=None, merger=None):
+        session = session or self.session
         try:
             # output_folder_paper = self.create_folder(
             #     date_str, addition_name, self.news_paper
             # )
             output_folder_page = self.create_folder(addition_name)
 
-            # merger = PdfMerger()
             for page_name in page_name_list:
                 pdf_url = f"{self.pdf_download_url}/{page_name}"
                 print(f"Processing pdf_url: {pdf_url}")
@@ -67,19 +63,15 @@ class TheEchoOfIndiaCrawler:
                     f"{addition_name}_{date_str}_{page_name.split('_')[-1]}"
                 )
                 file_path = os.path.join(output_folder_page, filename)
-                response = requests.get(pdf_url)
+                response = session.get(pdf_url)
                 print(f"News page saved: {file_path}")
 
                 with open(file_path, "wb") as f:
                     f.write(response.content)
 
-                # merger.append(file_path)
-
-            # filename = f"{self.newspaper_name}-{addition_name}-{date_str}.pdf"
-            # file_path = os.path.join(output_folder_paper, filename)
-            # print(f"News paper saved: {file_path}")
-            # merger.write(file_path)
-            # merger.close()
+                # Appended to the edition PDF as soon as it lands
+                if merger is not None:
+                    merger.page_ready(page_name, file_path)
 
             return True
 
@@ -87,8 +79,9 @@ class TheEchoOfIndiaCrawler:
             print(f"Error downloading PDF: {str(e)}")
             return None, None
 
-    def get_page_details(self, addition_id):
-        response = requests.post(
+    def get_page_details(self, addition_id, session=None):
+        session = session or self.session
+        response = session.post(
             self.page_url, json={"company_key": 1, "edition_key": addition_id}
         )
         if response.status_code == 200:
@@ -96,27 +89,55 @@ class TheEchoOfIndiaCrawler:
         else:
             return None
 
+    def process_addition(self, addition_name, addition_id, date_str):
+        """Download every page of one addition using its own session."""
+        print(
+            f"Processing | addition_name: {addition_name} | addition_id: {addition_id}"
+        )
+        session = requests.Session()
+        page_data_list = self.get_page_details(addition_id=addition_id,
+                                               session=session)
+        if not page_data_list:
+            print("Page not found")
+            return False
+        page_name_lists = []
+        for page_data in page_data_list:
+            page_name_list = page_data["PDF_DOCUMENT"].split("|")
+            page_name_list = list(filter(None, page_name_list))
+            print(f"Found {len(page_name_list)} pages")
+            if page_name_list:
+                page_name_lists.append(page_name_list)
+
+        # The page-order manifest is every page of the addition, in order
+        merger = StreamingPdfMerger(
+            os.path.join(self.create_folder(addition_name),
+                         f"{addition_name}_{date_str}.pdf"),
+            order=[name for names in page_name_lists for name in names])
+        pages = 0
+        try:
+            for page_name_list in page_name_lists:
+                self.download_pdf_data(
+                    page_name_list=page_name_list,
+                    date_str=date_str,
+                    addition_name=addition_name,
+                    session=session,
+                    merger=merger,
+                )
+                pages += len(page_name_list)
+        finally:
+            if merger.finish():
+                merger.report()
+        return pages
+
     def process_latest_newspaper(self, addition_dict: dict):
         date_str = datetime.now().strftime("%Y_%m_%d")
-        for addition_name, addition_id in addition_dict.items():
-            print(
-                f"Processing | addition_name: {addition_name} | addition_id: {addition_id}"
-            )
-            page_data_list = self.get_page_details(addition_id=addition_id)
-            if not page_data_list:
-                print("Page not found")
-                continue
-            for page_data in page_data_list:
-                page_name_list = page_data["PDF_DOCUMENT"].split("|")
-                page_name_list = list(filter(None, page_name_list))
-                print(f"Found {len(page_name_list)} pages")
-                if page_name_list:
-                    self.download_pdf_data(
-                        page_name_list=page_name_list,
-                        date_str=date_str,
-                        addition_name=addition_name,
-                    )
-        return True
+        report = run_editions(
+            self.newspaper_name, list(addition_dict.items()),
+            lambda addition: self.process_addition(*addition, date_str),
+            concurrency=self.concurrency,
+            name=lambda addition: addition[0])
+        report.print_summary()
+        return bool(report.succeeded)
 
     def get_addition_list(self):
         try:
@@ -0,0 +1,126 @@
+"""
+Edition-level fan-out for multi-edition scrapers.
+
+Each edition is handed to a worker that owns its own browser context or HTTP
+session, and at most ``concurrency`` editions run at the same time. Outcomes
+are merged into a single EditionRunReport for the whole run.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_CONCURRENCY = 4
+
+
+class EditionRunReport:
+    def __init__(self, paper):
+        self.paper = paper
+        self.results = []
+        self._started = time.perf_counter()
+        self._finished = None
+
+    def add(self, edition, ok, elapsed, detail=None, error=None):
+        self.results.append({
+            "edition": edition,
+            "ok": ok,
+            "elapsed": round(elapsed, 2),
+            "detail": detail,
+            "error": error,
+        })
+
+    def finish(self):
+        self._finished = time.perf_counter()
+        return self
+
+    @property
+    def wall_time(self):
+        end = self._finished or time.perf_counter()
+        return end - self._started
+
+    @property
+    def succeeded(self):
+        return [r for r in self.results if r["ok"]]
+
+    @property
+    def failed(self):
+        return [r for r in self.results if not r["ok"]]
+
+    def summary(self):
+        serial_time = sum(r["elapsed"] for r in self.results)
+        return {
+            "paper": self.paper,
+            "editions": len(self.results),
+            "succeeded": len(self.succeeded),
+            "failed": len(self.failed),
+            "wall_time": round(self.wall_time, 2),
+            "edition_time": round(serial_time, 2),
+            "results": self.results,
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n===== {self.paper}: {summary['succeeded']}/{summary['editions']} "
+              f"editions ok in {summary['wall_time']}s "
+              f"(sum of edition times {summary['edition_time']}s) =====")
+        for result in self.results:
+            status = "OK " if result["ok"] else "ERR"
+            line = f"  [{status}] {result['edition']} ({result['elapsed']}s)"
+            if result["error"]:
+                line += f" - {result['error']}"
+            print(line)
+
+
+def _is_success(value):
+    return value is not False and value is not None
+
+
+def run_editions(paper, editions, worker, concurrency=DEFAULT_CONCURRENCY,
+                 name=str):
+    """Run ``worker(edition)`` for every edition in a thread pool.
+
+    The worker must not share a browser page or a non thread-safe client with
+    other editions. Returning False or None marks the edition as failed, any
+    other return value is stored as the edition's detail.
+    """
+    report = EditionRunReport(paper)
+    if not editions:
+        return report.finish()
+
+    def timed(edition):
+        start = time.perf_counter()
+        try:
+            value = worker(edition)
+            return value, None, time.perf_counter() - start
+        except Exception as e:
+            return None, str(e), time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {executor.submit(timed, edition): edition
+                   for edition in editions}
+        for future in as_completed(futures):
+            value, error, elapsed = future.result()
+            report.add(name(futures[future]), error is None and _is_success(value),
+                       elapsed, detail=value, error=error)
+
+    return report.finish()
+
+
+async def run_editions_async(paper, editions, worker,
+                             concurrency=DEFAULT_CONCURRENCY, name=str):
+    """Async counterpart of run_editions bounded by a semaphore."""
+    report = EditionRunReport(paper)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def timed(edition):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                value = await worker(edition)
+                error = None
+            except Exception as e:
+                value, error = None, str(e)
+            report.add(name(edition), error is None and _is_success(value),
+                       time.perf_counter() - start, detail=value, error=error)
+
+    await asyncio.gather(*(timed(edition) for edition in editions))
+    return report.finish()
@@ -3,10 +3,11 @@
 import os
 import requests
 import datetime
-from PIL import Image
-from io import BytesIO
 from pathlib import Path
 
+from pdf_writer import IncrementalPdfWriter
+from tile_stitch import TiledPage, fetch_tiles
+
 # === CONFIG ===
 publication_name = "gomantak"
 edition = "Goa"
@@ -24,62 +25,53 @@ TILE_URL_PATTERN = (
 )
 
 def download_tile(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return Image.open(BytesIO(response.content)).convert("RGB")
-    except Exception:
+    """Tile bytes, or None when the tile does not exist (end of the page)."""
+    response = requests.get(url, timeout=30)
+    # S3 answers 403 rather than 404 for a missing key when listing is denied
+    if response.status_code in (403, 404):
         return None
-
-def stitch_tiles(tiles):
-    width, height = tiles[0].size
-    stitched = Image.new("RGB", (width * 3, height * 3))
-    for row in range(3):
-        for col in range(3):
-            idx = row * 3 + col
-            stitched.paste(tiles[idx], (col * width, row * height))
-    return stitched
+    response.raise_for_status()
+    return response.content
 
 def download_page(page_number):
-    tiles = []
-    for i in range(9):
-        url = TILE_URL_PATTERN.format(page=page_number, tile=i)
-        img = download_tile(url)
-        if img is None:
-            print(f"❌ Missing tile: {url}")
-            return None
-        tiles.append(img)
-    return stitch_tiles(tiles)
+    """Stitch a page from however many tiles it has; None if it has none."""
+    try:
+        tiles = fetch_tiles(lambda i: download_tile(
+            TILE_URL_PATTERN.format(page=page_number, tile=i)))
+    except ValueError as e:
+        print(f"❌ Cannot download page {page_number}: {e}")
+        return None
+    if not tiles:
+        print(f"❌ Missing tiles for page {page_number}")
+        return None
+    try:
+        return TiledPage(tiles, workdir=folder_path)
+    except ValueError as e:
+        print(f"❌ Cannot stitch page {page_number}: {e}")
+        return None
 
 def main():
-    pages = []
-    saved_images = []
     page_num = 1
-    while True:
-        print(f"📥 Downloading page {page_num}")
-        image = download_page(page_num)
-        if image is None:
-            break
-        img_path = folder_path / f"page_{page_num:02d}.jpg"
-        image.save(img_path)
-        pages.append(image)
-        saved_images.append(img_path)
-        page_num += 1
-
-    if pages:
-        print("🖨️ Creating PDF...")
-        pages[0].save(PDF_PATH, save_all=True, append_images=pages[1:])
-        print(f"✅ PDF saved at: {PDF_PATH}")
+    # Pages are stitched on disk and appended to the PDF one at a time, so
+    # memory holds the compressed tiles plus one decoded tile.
+    with IncrementalPdfWriter(PDF_PATH) as writer:
+        while True:
+            print(f"📥 Downloading page {page_num}")
+            page = download_page(page_num)
+            if page is None:
+                break
+            with page:
+                print(f"🧩 {page.cols}x{page.rows} tiles, {page.width}x{page.height}px")
+                writer.add_jpeg(page.encode("jpeg"))
+            page_num += 1
 
-        # 🔥 Delete image files
-        for img_file in saved_images:
-            try:
-                img_file.unlink()
-                print(f"🗑️ Deleted: {img_file}")
-            except Exception as e:
-                print(f"⚠️ Could not delete {img_file}: {e}")
-    else:
-        print("⚠️ No pages downloaded.")
+        if len(writer):
+            writer.close()
+            writer.report()
+            print(f"✅ PDF saved at: {PDF_PATH}")
+        else:
+            writer.abort()
+            print("⚠️ No pages downloaded.")
 
 if __name__ == "__main__":
     main()
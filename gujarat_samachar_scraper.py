@@ -31,10 +31,12 @@ except ImportError:
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+from page_count import PagePlan, probe_page_count, resolve_page_count
+
 # ───────── user settings ─────────
 DATE       = "02-06-2025"                # format in URL (DD-MM-YYYY)
 EDITION    = "ahmedabad"                 # e.g., "Ahmedabad", "Surat", etc.
-LAST_PAGE  = 10                          # number of pages in this edition
+LAST_PAGE  = None                        # None → discovered from the viewer
 HEADLESS   = True
 DOWNLOADS = 'downloads'
 PUB        = "gujarat_samachar"
@@ -67,13 +69,47 @@ def save_png(src_url, dest_path):
     dest_path.parent.mkdir(parents=True, exist_ok=True)
     img.save(dest_path, "PNG", quality=90)
 
-def main(date_str: str, last_page: int):
+def page_url_for(date_str, page):
+    return f"https://epaper.gujaratsamachar.com/{EDITION}/{date_str}/{page}"
+
+def page_has_overlays(driver, date_str, page):
+    """Cheap existence probe: does the page render any article overlay?"""
+    driver.get(page_url_for(date_str, page))
+    try:
+        WebDriverWait(driver, 8).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, OVERLAY_CSS)))
+        return True
+    except TimeoutException:
+        return False
+
+def find_last_page(driver, date_str):
+    """Read the page count from the viewer's pagination, else probe for it."""
+    driver.get(page_url_for(date_str, 1))
+    try:
+        WebDriverWait(driver, 20).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, OVERLAY_CSS)))
+    except TimeoutException:
+        pass
+    exists = lambda page: page_has_overlays(driver, date_str, page)
+    # Probes from the highest shown page when the pagination is windowed
+    last_page = resolve_page_count(driver, "pagination", probe=exists)
+    if last_page:
+        return last_page
+    print("Page count not shown in viewer → probing")
+    return probe_page_count(exists)
+
+def main(date_str: str, last_page: int = None):
     driver = make_driver(HEADLESS)
     wait   = WebDriverWait(driver, 20)
 
     try:
-        for page in range(1, last_page + 1):
-            page_url = f"https://epaper.gujaratsamachar.com/{EDITION}/{date_str}/{page}"
+        if not last_page:
+            last_page = find_last_page(driver, date_str)
+        plan = PagePlan(PUB, last_page)
+        print(f"{len(plan)} pages planned")
+
+        for page in plan:
+            page_url = page_url_for(date_str, page)
             print("→", page_url)
             driver.get(page_url)
 
@@ -82,11 +118,13 @@ def main(date_str: str, last_page: int):
                 wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, OVERLAY_CSS)))
             except TimeoutException:
                 print(f"No overlays on page {page} → skipping")
+                plan.mark(page, ok=False)
                 continue
 
             overlays = driver.find_elements(By.CSS_SELECTOR, OVERLAY_CSS)
             if not overlays:
                 print(f"No overlays found on page {page} → skipping")
+                plan.mark(page)
                 continue
 
             print(f"Found {len(overlays)} overlays on page {page}")
@@ -126,9 +164,12 @@ def main(date_str: str, last_page: int):
                 driver.switch_to.window(main_handle)
                 time.sleep(0.2)
 
+            plan.mark(page)
             # small pause before next page
             time.sleep(0.5)
 
+        plan.summary()
+
     finally:
         driver.quit()
         print("\nDone. Images saved under:", SAVE_ROOT.resolve())
@@ -1,6 +1,5 @@
 import asyncio
 import os
-import time
 from datetime import datetime, timedelta
 
 from playwright.async_api import async_playwright
@@ -17,7 +16,7 @@ async def download_hamro_praja_shakti():
 
         # Open the website
         await page.goto("https://www.hamroprajashakti.in/", timeout=60000)
-        time.sleep(5)
+        await asyncio.sleep(5)
         # Wait for the iframe to load and get its content
         iframe_element = await page.wait_for_selector('iframe.pdf-container',
                                                       timeout=60000)
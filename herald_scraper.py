@@ -3,10 +3,15 @@ import asyncio
 from datetime import datetime
 from playwright.async_api import async_playwright
 
+from edition_pool import DEFAULT_CONCURRENCY, run_editions_async
+from pdf_merge import StreamingPdfMerger
+
 
 class HeraldEpaperScraper:
-    def __init__(self, base_url: str, download_root: str = "herald"):
+    def __init__(self, base_url: str, download_root: str = "herald",
+                 concurrency: int = DEFAULT_CONCURRENCY):
         self.base_url = base_url
+        self.concurrency = concurrency
         self.download_dir = os.path.join("downloads",download_root)
         self.today = datetime.now().strftime("%Y-%m-%d")
         self.today_date = datetime.strptime(self.today, "%Y-%m-%d").strftime(
@@ -16,22 +21,37 @@ class HeraldEpaperScraper:
         os.makedirs(self.download_dir, exist_ok=True)
         async with async_playwright() as p:
             self.browser = await p.chromium.launch(headless=True)
-            self.context = await self.browser.new_context(accept_downloads=True)
-            self.page = await self.context.new_page()
+            context = await self.browser.new_context()
+            page = await context.new_page()
 
-            await self.page.goto(self.base_url)
-            await self.page.wait_for_selector('.content-title', timeout=60000)
+            await page.goto(self.base_url)
+            await page.wait_for_selector('.content-title', timeout=60000)
 
-            edition_names = await self._get_edition_names()
+            edition_names = await self._get_edition_names(page)
+            await context.close()
 
-            for index, edition_name in enumerate(edition_names):
-                print(f"\n>>> Processing edition: {edition_name}")
-                await self._process_edition(index, edition_name)
+            # Every edition runs in its own browser context, so there is no
+            # need to navigate back to the landing page between editions.
+            report = await run_editions_async(
+                "herald", list(enumerate(edition_names)),
+                lambda edition: self._process_edition(*edition),
+                concurrency=self.concurrency,
+                name=lambda edition: edition[1])
 
             await self.browser.close()
 
-    async def _get_edition_names(self):
-        edition_elements = await self.page.query_selector_all('.thumBox')
+        report.print_summary()
+        return report
+
+    async def _open_landing_page(self):
+        context = await self.browser.new_context(accept_downloads=True)
+        page = await context.new_page()
+        await page.goto(self.base_url)
+        await page.wait_for_selector('.content-title', timeout=60000)
+        return context, page
+
+    async def _get_edition_names(self, page):
+        edition_elements = await page.query_selector_all('.thumBox')
         names = []
 
         for edition in edition_elements:
@@ -42,46 +62,58 @@ class HeraldEpaperScraper:
         return names
 
     async def _process_edition(self, index, edition_name):
-        editions = await self.page.query_selector_all('.thumBox')
-        await editions[index].click()
-
-        for attempt in range(3):
+        print(f"\n>>> Processing edition: {edition_name}")
+        context, page = await self._open_landing_page()
+        try:
+            editions = await page.query_selector_all('.thumBox')
+            await editions[index].click()
+
+            for attempt in range(3):
+                try:
+                    await page.wait_for_load_state('load', timeout=120000)
+                    break
+                except TimeoutError:
+                    print(f"Retry {attempt + 1} for edition load failed...")
+                    await asyncio.sleep(5)
+
+            await page.wait_for_selector('.pg_thumb_main_div', timeout=60000)
+            thumb_panel = await page.query_selector('.col_sidebar.page_thumb_panel')
+            thumbs = await thumb_panel.query_selector_all('.pg_thumb_main_div')
+
+            # Each page PDF is appended to the edition PDF as soon as it lands
+            merger = StreamingPdfMerger(
+                os.path.join(self.download_dir, edition_name,
+                             f"{edition_name.replace(' ', '_')}_{self.today_date}.pdf"),
+                order=range(1, len(thumbs) + 1))
+            saved = 0
             try:
-                await self.page.wait_for_load_state('load', timeout=120000)
-                break
-            except TimeoutError:
-                print(f"Retry {attempt + 1} for edition load failed...")
-                await asyncio.sleep(5)
-
-        await self.page.wait_for_selector('.pg_thumb_main_div', timeout=60000)
-        thumb_panel = await self.page.query_selector('.col_sidebar.page_thumb_panel')
-        thumbs = await thumb_panel.query_selector_all('.pg_thumb_main_div')
-
-        for page_index, thumb in enumerate(thumbs):
-            await self._download_full_page_and_clips(thumb, edition_name, page_index + 1)
-
-        # Return to landing page
-        home_button = await self.page.query_selector('#gotoLandingPageBtn')
-        if home_button:
-            await home_button.click()
-            await self.page.reload()
-            await asyncio.sleep(5)
-        await self.page.wait_for_selector('.content-title', timeout=60000)
-        await self.page.bring_to_front()
-        await asyncio.sleep(2)
-
-    async def _download_full_page_and_clips(self, thumb, edition_name, page_number):
+                for page_index, thumb in enumerate(thumbs):
+                    file_path = await self._download_full_page_and_clips(
+                        page, thumb, edition_name, page_index + 1)
+                    if file_path:
+                        saved += 1
+                        await asyncio.to_thread(merger.page_ready, page_index + 1, file_path)
+                    else:
+                        merger.page_failed(page_index + 1)
+            finally:
+                if await asyncio.to_thread(merger.finish):
+                    merger.report()
+            return saved
+        finally:
+            await context.close()
+
+    async def _download_full_page_and_clips(self, page, thumb, edition_name, page_number):
         img = await thumb.query_selector('img')
         if not img:
-            return
+            return False
 
         await thumb.click()
         await asyncio.sleep(2)
 
         try:
-            await self.page.wait_for_selector("#downloadpagetoolbar", timeout=60000)
-            async with self.page.expect_download() as download_info:
-                btn = await self.page.query_selector("#downloadpagetoolbar")
+            await page.wait_for_selector("#downloadpagetoolbar", timeout=60000)
+            async with page.expect_download() as download_info:
+                btn = await page.query_selector("#downloadpagetoolbar")
                 if btn:
                     await btn.click()
             download = await download_info.value
@@ -94,14 +126,16 @@ class HeraldEpaperScraper:
             await download.save_as(file_path)
             print(f"Saved full page: {file_path}")
 
-            # await self._get_article_clips(edition_name, page_number)
+            # await self._get_article_clips(page, edition_name, page_number)
+            return file_path
 
         except Exception as e:
             print(f"Error downloading page {page_number} of {edition_name}: {str(e)}")
+            return False
 
-    async def _get_article_clips(self, edition_name, page_number):
-        await self.page.wait_for_selector('#ImageContainer', timeout=60000)
-        articles = await self.page.query_selector_all('#ImageContainer .pagerectangle')
+    async def _get_article_clips(self, page, edition_name, page_number):
+        await page.wait_for_selector('#ImageContainer', timeout=60000)
+        articles = await page.query_selector_all('#ImageContainer .pagerectangle')
         print(f"Found {len(articles)} article clips.")
 
         for idx, article in enumerate(articles):
@@ -109,7 +143,7 @@ class HeraldEpaperScraper:
             try:
                 await article.scroll_into_view_if_needed()
 
-                await self.page.evaluate('''(element) => {
+                await page.evaluate('''(element) => {
                     const mouseOverEvent = new MouseEvent('mouseover', {
                         view: window, bubbles: true, cancelable: true
                     });
@@ -121,14 +155,14 @@ class HeraldEpaperScraper:
                     element.dispatchEvent(clickEvent);
                 }''', article)
 
-                await self.page.wait_for_load_state('load', timeout=60000)
+                await page.wait_for_load_state('load', timeout=60000)
 
-                download_button = await self.page.wait_for_selector('#downloadImage', timeout=10000)
+                download_button = await page.wait_for_selector('#downloadImage', timeout=10000)
                 if download_button:
                     await download_button.scroll_into_view_if_needed()
                     await download_button.evaluate('btn => btn.click()')
 
-                    download = await self.page.wait_for_event('download')
+                    download = await page.wait_for_event('download')
 
                     clip_dir = os.path.join(self.download_dir, edition_name)
                     os.makedirs(clip_dir, exist_ok=True)
@@ -0,0 +1,178 @@
+"""
+Parallel crop stage for screenshot-based scrapers.
+
+Viewer screenshots carry margins (page background, transparent padding,
+toolbars) around the newspaper page. Instead of a hard-coded crop box per
+paper, content_bbox finds the page by scanning the margins with vectorized
+NumPy comparisons against the background colour. A page with no uniform
+margin counts as already cropped, so running the stage twice does not cut
+into the page again. Screenshots with no uniform margin at all (a toolbar
+across the top, corners of different colours) are reported separately:
+they need a fixed crop box. crop_images runs the crop across a process
+pool, leaves no-op crops untouched and replaces files atomically; JPEGs
+are re-encoded with their own quantization tables and subsampling.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from PIL import Image, JpegImagePlugin
+
+DEFAULT_TOLERANCE = 16
+# An edge is a margin when this share of its pixels is background
+MIN_MARGIN_SHARE = 0.9
+# Content box at least this much background: the "background" is the paper
+MAX_INTERIOR_BACKGROUND = 0.5
+
+
+def content_bbox(image, tolerance=DEFAULT_TOLERANCE, padding=0):
+    """Return the ``(left, top, right, bottom)`` box around the content.
+
+    The full frame is returned when there is nothing to crop (see
+    ``find_content``); None only for a blank (uniform) image.
+    """
+    status, box = find_content(image, tolerance, padding)
+    if status == "blank":
+        return None
+    return box or (0, 0) + image.size
+
+
+def find_content(image, tolerance=DEFAULT_TOLERANCE, padding=0):
+    """``(status, box)`` for the content of ``image``.
+
+    Transparent images use the alpha channel; otherwise a pixel is content
+    when any channel differs from the background colour (the median of the
+    four corners) by more than ``tolerance``. Status is "crop" with the
+    ``(left, top, right, bottom)`` box, "unchanged" when the background
+    colour also fills the content box (already cropped to the page),
+    "no_margin" when no edge is a uniform margin, or "blank" for a uniform
+    image; the box is None for all but "crop".
+    """
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        alpha = np.asarray(image.convert("RGBA").getchannel("A"))
+        if alpha.min() < 255:
+            mask = alpha > tolerance
+        else:
+            mask = None
+    else:
+        mask = None
+
+    if mask is None:
+        pixels = np.asarray(image.convert("RGB"), dtype=np.int16)
+        corners = pixels[[0, 0, -1, -1], [0, -1, 0, -1]]
+        background = np.median(corners, axis=0)
+        mask = (np.abs(pixels - background) > tolerance).any(axis=2)
+        height, width = mask.shape
+        edges = (mask[0], mask[-1], mask[:, 0], mask[:, -1])
+        if mask.any() and max(1 - edge.mean() for edge in edges) < MIN_MARGIN_SHARE:
+            return "no_margin", None  # content or chrome reaches every edge
+
+    rows = mask.any(axis=1)
+    cols = mask.any(axis=0)
+    if not rows.any():
+        return "blank", None
+    top = int(rows.argmax())
+    bottom = int(len(rows) - rows[::-1].argmax())
+    left = int(cols.argmax())
+    right = int(len(cols) - cols[::-1].argmax())
+
+    height, width = mask.shape
+    if 1 - mask[top:bottom, left:right].mean() >= MAX_INTERIOR_BACKGROUND:
+        return "unchanged", None  # edges are the page's own paper colour
+    box = (max(left - padding, 0), max(top - padding, 0),
+           min(right + padding, width), min(bottom + padding, height))
+    if box == (0, 0, width, height):
+        return "unchanged", None
+    return "crop", box
+
+
+def save_options(image):
+    """Encoder options that keep a JPEG's quality when re-saving a crop.
+
+    Pillow's default (quality 75, 4:2:0) would degrade every cropped page;
+    reusing the source's quantization tables and subsampling does not.
+    """
+    if image.format != "JPEG":
+        return {}
+    options = {"subsampling": JpegImagePlugin.get_sampling(image)}
+    if getattr(image, "quantization", None):
+        options["qtables"] = image.quantization
+    else:
+        options["quality"] = 95
+    for key in ("icc_profile", "exif", "dpi"):
+        if image.info.get(key):
+            options[key] = image.info[key]
+    return options
+
+
+def crop_image(path, box=None, tolerance=DEFAULT_TOLERANCE, padding=0):
+    """Crop one image in place; returns ``(path, status)``.
+
+    ``box`` is a fixed ``(left, top, right, bottom)``; without it the
+    content box is detected. Status is "cropped", "unchanged", "no_margin"
+    or "blank" (see ``find_content``).
+    """
+    with Image.open(path) as image:
+        width, height = image.size
+        if box is None:
+            status, crop_box = find_content(image, tolerance, padding)
+            if status != "crop":
+                return path, status
+        else:
+            left, top, right, bottom = box
+            crop_box = (max(left, 0), max(top, 0),
+                        min(right, width), min(bottom, height))
+
+        if crop_box == (0, 0, width, height):
+            return path, "unchanged"
+
+        cropped = image.crop(crop_box)
+        image_format = image.format
+        root, ext = os.path.splitext(path)
+        temp_path = f"{root}.part{ext}"
+        try:
+            cropped.save(temp_path, format=image_format, **save_options(image))
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    return path, "cropped"
+
+
+def crop_images(paths, box=None, tolerance=DEFAULT_TOLERANCE, padding=0,
+                workers=None):
+    """Crop many images across a process pool.
+
+    Returns a dict mapping each status ("cropped", "unchanged", "no_margin",
+    "blank", "failed") to the list of paths that ended in it.
+    """
+    started = time.perf_counter()
+    results = {"cropped": [], "unchanged": [], "no_margin": [], "blank": [], "failed": []}
+    if not paths:
+        return results
+
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(crop_image, path, box, tolerance, padding): path
+                   for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                _, status = future.result()
+            except Exception as e:
+                print(f"❌ Failed to crop {path}: {e}")
+                status = "failed"
+            results[status].append(path)
+
+    elapsed = time.perf_counter() - started
+    print(f"✂️ Cropped {len(results['cropped'])} images, "
+          f"{len(results['unchanged'])} already tight, "
+          f"{len(results['blank'])} blank, {len(results['failed'])} failed "
+          f"in {elapsed:.1f}s with {workers} workers")
+    if results["no_margin"]:
+        print(f"⚠️ {len(results['no_margin'])} images have no uniform margin "
+              f"(toolbar or mixed-colour corners?) and were left uncropped; "
+              f"pass a fixed box for them")
+    return results
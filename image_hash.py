@@ -0,0 +1,285 @@
+"""
+Perceptual image hashes and a near-duplicate index.
+
+A 64-bit difference hash (dHash) or DCT hash (pHash) changes little under
+re-encoding, resizing or small shifts, so visually identical images end up a
+few bits apart and can be compared by Hamming distance. HashIndex keeps the
+pHashes of everything ingested in a BK-tree, persisted as one short line per
+image, so full-page ads and syndicated pages that reappear in another
+edition or on another day are flagged when they are downloaded and later
+stages can skip work already done on them.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are small and rarely interleave
+    fcntl = None
+
+DEFAULT_INDEX = os.path.join("downloads", "phash_index.tsv")
+DEFAULT_DUPLICATES = os.path.join("downloads", "phash_duplicates.jsonl")
+
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def dhash(image, size=8):
+    """Difference hash of a Pillow image as a ``size * size``-bit int."""
+    small = image.convert("L").resize((size + 1, size), Image.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    return _bits_to_int(pixels[:, :-1] > pixels[:, 1:])
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+
+_DCT32 = _dct_matrix(32)
+
+
+def phash(image, size=8):
+    """DCT hash: low frequencies of a 32x32 thumbnail against their median."""
+    small = image.convert("L").resize((32, 32), Image.BILINEAR)
+    pixels = np.asarray(small, dtype=np.float64)
+    dct = _DCT32 @ pixels @ _DCT32.T
+    low = dct[:size, :size].ravel()[1:]  # drop the DC term
+    bits = np.append(low > np.median(low), False)
+    return _bits_to_int(bits)
+
+
+def _open(data=None, path=None):
+    if data is not None:
+        return Image.open(BytesIO(data))
+    return Image.open(path)
+
+
+def dhash_bytes(data, size=8):
+    with _open(data) as image:
+        return dhash(image, size)
+
+
+def phash_bytes(data):
+    with _open(data) as image:
+        return phash(image)
+
+
+def phash_file(path):
+    with _open(path=path) as image:
+        return phash(image)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes with Hamming distance."""
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, value, key):
+        self.size += 1
+        if self.root is None:
+            self.root = (value, key, {})
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, key, {})
+                return
+            node = child
+
+    def search(self, value, radius):
+        """All ``(distance, key, hash)`` within ``radius`` bits, nearest first."""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.append((distance, node[1], node[0]))
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return sorted(found)
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive advisory lock on ``<path>.lock`` (shared between processes)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class HashIndex:
+    """Persistent pHash index flagging near-duplicate pages and clips.
+
+    Each entry is one ``<hash>\\t<date>\\t<key>[\\t<path>]`` line, appended
+    under a file lock so concurrent scrapers do not lose each other's lines.
+    Entries older than ``max_age_days`` are ignored on load and removed from
+    the file only by ``prune`` (``python image_hash.py --prune``). Every
+    near-duplicate found is appended to ``duplicates_path`` as JSON, which
+    batch OCR reads to reuse the text of the earlier image.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX, max_distance=6, max_age_days=30,
+                 duplicates_path=DEFAULT_DUPLICATES):
+        self.path = path
+        self.duplicates_path = duplicates_path
+        self.max_distance = max_distance
+        self.max_age_days = max_age_days
+        self.tree = BKTree()
+        self.keys = set()
+        self.paths = {}
+        self._lock = threading.Lock()
+        self._load(date.today() - timedelta(days=max_age_days))
+
+    def __len__(self):
+        return len(self.tree)
+
+    @staticmethod
+    def _parse(line):
+        """``(hash, day, key, path)`` of one index line; raises ValueError."""
+        fields = line.rstrip("\n").split("\t")
+        if len(fields) not in (3, 4):
+            raise ValueError(line)
+        path = fields[3] if len(fields) == 4 else None
+        return int(fields[0], 16), date.fromisoformat(fields[1]), fields[2], path
+
+    def _load(self, cutoff):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    value, day, key, path = self._parse(line)
+                except ValueError:
+                    continue
+                if day < cutoff or key in self.keys:
+                    continue
+                self.tree.add(value, key)
+                self.keys.add(key)
+                if path:
+                    self.paths[key] = path
+
+    def prune(self):
+        """Drop expired and repeated entries from the file; returns lines removed.
+
+        A maintenance step: the file is rewritten to a temp file and renamed
+        under the same lock that appends take.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        cutoff = date.today() - timedelta(days=self.max_age_days)
+        with _file_lock(self.path):
+            kept, seen, removed = [], set(), 0
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        _, day, key, _ = self._parse(line)
+                    except ValueError:
+                        removed += 1
+                        continue
+                    if day < cutoff or key in seen:
+                        removed += 1
+                        continue
+                    seen.add(key)
+                    kept.append(line)
+            temp_path = f"{self.path}.part"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(kept)
+            os.replace(temp_path, self.path)
+        return removed
+
+    def find(self, value, max_distance=None, exclude=None):
+        """Closest indexed ``(key, distance)`` within range, else None.
+
+        ``exclude`` is a key to ignore (the image itself on a re-run).
+        """
+        radius = self.max_distance if max_distance is None else max_distance
+        with self._lock:
+            matches = self.tree.search(value, radius)
+        for distance, key, _ in matches:
+            if key != exclude:
+                return key, distance
+        return None
+
+    def add(self, value, key, path=None):
+        """Index ``key`` unless it already is; returns True when added."""
+        with self._lock:
+            if key in self.keys:
+                return False
+            self.tree.add(value, key)
+            self.keys.add(key)
+            if path:
+                self.paths[key] = path
+            line = f"{value:016x}\t{date.today().isoformat()}\t{key}"
+            with _file_lock(self.path), open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"{line}\t{path}\n" if path else f"{line}\n")
+            return True
+
+    def _record_duplicate(self, key, path, match):
+        entry = {"key": key, "path": path, "duplicate_of": match[0],
+                 "duplicate_path": self.paths.get(match[0]), "distance": match[1],
+                 "date": date.today().isoformat()}
+        with _file_lock(self.duplicates_path), \
+                open(self.duplicates_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def check(self, key, data=None, path=None):
+        """Index an image under ``key``; returns ``(key, distance)`` of an
+        earlier near-duplicate with another key, or None. Matches are also
+        recorded in ``duplicates_path``. Never raises on undecodable input.
+        """
+        try:
+            value = phash_bytes(data) if data is not None else phash_file(path)
+        except Exception as e:
+            print(f"Could not hash {key}: {e}")
+            return None
+        saved_path = os.path.abspath(path) if path else None
+        match = self.find(value, exclude=key)
+        if self.add(value, key, saved_path) and match:
+            print(f"♻️ {key} duplicates {match[0]} ({match[1]} bits apart)")
+            self._record_duplicate(key, saved_path, match)
+        return match
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the shared pHash index")
+    parser.add_argument("--index", default=DEFAULT_INDEX)
+    parser.add_argument("--max-age-days", type=int, default=30)
+    parser.add_argument("--prune", action="store_true",
+                        help="drop expired and repeated entries from the index file")
+    args = parser.parse_args()
+    index = HashIndex(args.index, max_age_days=args.max_age_days)
+    if args.prune:
+        print(f"🧹 Pruned {index.prune()} entries from {args.index}")
+    print(f"{len(index)} images indexed")
@@ -0,0 +1,119 @@
+"""
+Configurable output encoding for saved page and clip images.
+
+Scrapers used to decode whatever the server sent and re-encode it as a
+maximum-effort PNG, or write JPEG bytes under a ``.png`` name. OutputCodec
+keeps the original encoded bytes whenever no transform is needed and
+otherwise encodes with a fast, explicit setting (JPEG quality, lossless
+WebP, PNG compress level). Encode time and bytes written are recorded per
+image so the cost of each format can be compared on a real run.
+"""
+import os
+import time
+from io import BytesIO
+
+from PIL import Image
+
+EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp", "gif": ".gif"}
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def sniff_format(data):
+    """Return "jpeg", "png", "webp" or "gif" from the leading bytes, else None."""
+    if data[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    return None
+
+
+class OutputCodec:
+    """Save images in one configured format.
+
+    ``fmt`` is "original" (keep the source encoding), "png", "jpeg" or
+    "webp". ``quality`` applies to JPEG, ``png_compress_level`` (0-9) to
+    PNG; WebP is lossless unless ``webp_lossless`` is False.
+    """
+
+    def __init__(self, fmt="original", quality=90, png_compress_level=1,
+                 webp_lossless=True):
+        fmt = fmt.lower()
+        if fmt == "jpg":
+            fmt = "jpeg"
+        if fmt != "original" and fmt not in EXTENSIONS:
+            raise ValueError(f"Unsupported output format: {fmt}")
+        self.fmt = fmt
+        self.quality = quality
+        self.png_compress_level = png_compress_level
+        self.webp_lossless = webp_lossless
+        self.stats = []
+
+    def path_for(self, dest, source_format=None):
+        """``dest`` with the extension of the format that will be written."""
+        fmt = source_format if self.fmt == "original" else self.fmt
+        root, ext = os.path.splitext(str(dest))
+        return root + EXTENSIONS.get(fmt, ext)
+
+    def _encode(self, image, fmt):
+        buffer = BytesIO()
+        if fmt == "jpeg":
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(buffer, "JPEG", quality=self.quality, optimize=False)
+        elif fmt == "webp":
+            image.save(buffer, "WEBP", lossless=self.webp_lossless,
+                       quality=self.quality, method=0 if self.webp_lossless else 4)
+        else:
+            image.save(buffer, "PNG", compress_level=self.png_compress_level)
+        return buffer.getvalue()
+
+    def _write(self, dest, data, started, passthrough):
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        with open(dest, "wb") as f:
+            f.write(data)
+        self.stats.append({
+            "path": dest,
+            "seconds": time.perf_counter() - started,
+            "bytes": len(data),
+            "passthrough": passthrough,
+        })
+        return dest
+
+    def save_bytes(self, data, dest):
+        """Save encoded image bytes, re-encoding only if the format differs.
+
+        Returns the path written, whose extension follows the actual format.
+        """
+        started = time.perf_counter()
+        source_format = sniff_format(data)
+        if self.fmt == "original" or self.fmt == source_format:
+            return self._write(self.path_for(dest, source_format), data,
+                               started, passthrough=True)
+        with Image.open(BytesIO(data)) as image:
+            encoded = self._encode(image, self.fmt)
+        return self._write(self.path_for(dest), encoded, started,
+                           passthrough=False)
+
+    def save_image(self, image, dest):
+        """Encode a Pillow image; "original" falls back to fast PNG."""
+        started = time.perf_counter()
+        fmt = "png" if self.fmt == "original" else self.fmt
+        dest = self.path_for(dest, fmt)
+        return self._write(dest, self._encode(image, fmt), started,
+                           passthrough=False)
+
+    def report(self, label="images"):
+        if not self.stats:
+            return
+        seconds = sum(stat["seconds"] for stat in self.stats)
+        size = sum(stat["bytes"] for stat in self.stats)
+        kept = sum(1 for stat in self.stats if stat["passthrough"])
+        print(f"💾 {len(self.stats)} {label} as {self.fmt}: "
+              f"{size / (1024 * 1024):.1f} MB, {seconds:.2f}s encoding, "
+              f"{kept} kept as downloaded, "
+              f"{size / len(self.stats) / 1024:.0f} KB and "
+              f"{seconds / len(self.stats) * 1000:.0f} ms per image")
@@ -0,0 +1,171 @@
+"""
+Early validation of streamed image downloads.
+
+Scrapers used to download a full response, write it to disk and only then
+notice it was an HTML error page, a 1 KB stub or the site's "page not
+available" image. ImageValidator reads the first chunks of a streamed
+response, checks the magic bytes and the dimensions in the header and closes
+the connection as soon as the response is known to be bad. Small bodies are
+kept in memory until the end, where they are compared against known
+placeholder images by perceptual hash before anything touches the disk.
+"""
+import os
+from collections import namedtuple
+
+import requests
+
+from image_hash import dhash_bytes, hamming
+from image_output import sniff_format
+from pdf_writer import jpeg_info
+
+CHUNK_SIZE = 16 * 1024
+# Progressive JPEGs can carry large EXIF/ICC blocks before their SOF marker
+HEADER_LIMIT = 256 * 1024
+
+Verdict = namedtuple("Verdict", "ok reason format width height size")
+
+
+def image_header(data):
+    """Return ``(format, width, height)`` from the leading bytes, else None.
+
+    Returns ``(format, None, None)`` when the format is known but the
+    dimensions are not in ``data`` yet.
+    """
+    fmt = sniff_format(data)
+    if fmt is None:
+        return None
+    if fmt == "jpeg":
+        info = jpeg_info(data)
+        return (fmt, info[0], info[1]) if info else (fmt, None, None)
+    if fmt == "png" and len(data) >= 24:
+        return (fmt, int.from_bytes(data[16:20], "big"),
+                int.from_bytes(data[20:24], "big"))
+    if fmt == "gif" and len(data) >= 10:
+        return (fmt, int.from_bytes(data[6:8], "little"),
+                int.from_bytes(data[8:10], "little"))
+    if fmt == "webp" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            return (fmt, int.from_bytes(data[26:28], "little") & 0x3FFF,
+                    int.from_bytes(data[28:30], "little") & 0x3FFF)
+        if chunk == b"VP8L":
+            b = data[21:25]
+            return (fmt, 1 + (((b[1] & 0x3F) << 8) | b[0]),
+                    1 + (((b[3] & 0x0F) << 10) | (b[2] << 2) | ((b[1] & 0xC0) >> 6)))
+        if chunk == b"VP8X":
+            return (fmt, 1 + int.from_bytes(data[24:27], "little"),
+                    1 + int.from_bytes(data[27:30], "little"))
+    return fmt, None, None
+
+
+class ImageValidator:
+    """Stream an image to disk only if it looks like a real page or clip.
+
+    ``placeholders`` are dHashes of known placeholder images; any body no
+    larger than ``placeholder_max_bytes`` is hashed and rejected when it is
+    within ``max_distance`` bits of one of them.
+    """
+
+    def __init__(self, min_bytes=1024, min_width=1, min_height=1,
+                 placeholders=(), max_distance=6, placeholder_max_bytes=96 * 1024):
+        self.min_bytes = min_bytes
+        self.min_width = min_width
+        self.min_height = min_height
+        self.placeholders = list(placeholders)
+        self.max_distance = max_distance
+        self.placeholder_max_bytes = placeholder_max_bytes
+
+    def add_placeholder(self, data):
+        """Learn a placeholder from its image bytes."""
+        self.placeholders.append(dhash_bytes(data))
+
+    def is_placeholder(self, data):
+        if not self.placeholders:
+            return False
+        try:
+            value = dhash_bytes(data)
+        except Exception:
+            return False
+        return any(hamming(value, known) <= self.max_distance
+                   for known in self.placeholders)
+
+    def check_header(self, head):
+        """Validate the first bytes of a body; returns a Verdict."""
+        header = image_header(head)
+        if header is None:
+            return Verdict(False, "not an image", None, None, None, len(head))
+        fmt, width, height = header
+        if width is not None and (width < self.min_width or height < self.min_height):
+            return Verdict(False, f"too small ({width}x{height})", fmt, width,
+                           height, len(head))
+        return Verdict(True, "ok", fmt, width, height, len(head))
+
+    def fetch(self, url, dest, session=None, **kwargs):
+        """Download ``url`` to ``dest`` unless it fails validation.
+
+        The transfer is abandoned as soon as the response is known to be
+        bad; nothing is written for rejected responses.
+        """
+        kwargs.setdefault("timeout", 30)
+        response = (session or requests).get(url, stream=True, **kwargs)
+        try:
+            if not response.ok:
+                return Verdict(False, f"HTTP {response.status_code}", None, None, None, 0)
+            length = response.headers.get("Content-Length")
+            if length and length.isdigit() and int(length) < self.min_bytes:
+                return Verdict(False, f"too short ({length} bytes)", None, None, None, 0)
+            return self._stream(response.iter_content(CHUNK_SIZE), str(dest))
+        finally:
+            response.close()
+
+    def _stream(self, chunks, dest):
+        buffer = bytearray()
+        verdict = None
+        handle = None
+        temp_path = dest + ".part"
+        try:
+            for chunk in chunks:
+                if handle is not None:
+                    handle.write(chunk)
+                    continue
+                buffer.extend(chunk)
+
+                if verdict is None or verdict.width is None:
+                    verdict = self.check_header(bytes(buffer[:HEADER_LIMIT]))
+                    if not verdict.ok:
+                        return verdict
+                    if verdict.width is None and len(buffer) >= HEADER_LIMIT:
+                        verdict = verdict._replace(width=0, height=0)
+
+                # Large bodies cannot be placeholders: go straight to disk
+                if len(buffer) > self.placeholder_max_bytes:
+                    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+                    handle = open(temp_path, "wb")
+                    handle.write(buffer)
+                    buffer = None
+
+            if handle is None:
+                data = bytes(buffer)
+                if verdict is None:
+                    return Verdict(False, "empty body", None, None, None, 0)
+                if len(data) < self.min_bytes:
+                    return verdict._replace(ok=False, reason=f"too short ({len(data)} bytes)",
+                                            size=len(data))
+                if self.is_placeholder(data):
+                    return verdict._replace(ok=False, reason="placeholder image",
+                                            size=len(data))
+                os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                size = len(data)
+            else:
+                size = handle.tell()
+                handle.close()
+                handle = None
+            os.replace(temp_path, dest)
+            return verdict._replace(size=size)
+        finally:
+            if handle is not None:
+                handle.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
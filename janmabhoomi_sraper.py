@@ -1,18 +1,15 @@
-import os
-import tempfile
 import time
 from datetime import datetime
-from io import BytesIO
 
-import img2pdf
 import requests
-from PIL import Image
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from pdf_writer import IncrementalPdfWriter
+
 
 def setup_driver():
     # Set up Chrome options
@@ -41,40 +38,12 @@ def download_image(url):
     try:
         response = requests.get(url, stream=True)
         response.raise_for_status()
-        return Image.open(BytesIO(response.content))
+        return response.content
     except Exception as e:
         print(f"Error downloading image {url}: {str(e)}")
         return None
 
 
-def create_pdf(images, output_path):
-    try:
-        # Create a temporary directory to store images
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save images to temporary files
-            image_paths = []
-            for idx, img in enumerate(images):
-                if img is not None:
-                    temp_path = os.path.join(temp_dir, f'page_{idx}.jpg')
-                    img.save(temp_path, 'JPEG')
-                    image_paths.append(temp_path)
-
-            # Convert images to PDF
-            pdf_bytes = img2pdf.convert(image_paths)
-
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-            # Save PDF
-            with open(output_path, "wb") as f:
-                f.write(pdf_bytes)
-            print(f"Created PDF: {output_path}")
-            return True
-    except Exception as e:
-        print(f"Error creating PDF: {str(e)}")
-        return False
-
-
 def get_page_image(driver, page_num):
     try:
         # Wait for the epaper image to be present
@@ -188,9 +157,6 @@ def login_to_epaper():
                 # Format date for folder structure (YYYY-MM-DD)
                 folder_date = datetime.strptime(today_date, "%d-%m-%Y").strftime("%Y-%m-%d")
 
-                # List to store all page images
-                page_images = []
-
                 # Get total number of pages
                 page_numbers = WebDriverWait(driver, 10).until(
                     EC.presence_of_element_located((By.CLASS_NAME, "ep_page_numbers"))
@@ -199,31 +165,37 @@ def login_to_epaper():
                 total_pages = len(page_links)
                 print(f"Found {total_pages} page links")
 
-                # Process each page
-                for page_num in range(1, total_pages + 1):
-                    try:
-                        print(f"Processing page {page_num}")
-
-                        # Navigate to the page
-                        page_url = f"https://epaper.janmabhoominewspapers.com/view/epaper/{today_date}/{page_num}"
-                        driver.get(page_url)
-
-                        # Wait for page to load
-                        time.sleep(3)
-
-                        # Get the page image
-                        page_image = get_page_image(driver, page_num)
-                        if page_image:
-                            page_images.append(page_image)
-
-                    except Exception as e:
-                        print(f"Error processing page {page_num}: {str(e)}")
-                        continue
-
-                # Create PDF from all collected images
-                if page_images:
-                    pdf_path = f"downloads/janmbhoomi/mumbai/janmbhoomi_{folder_date}.pdf"
-                    create_pdf(page_images, pdf_path)
+                # Each page is appended to the PDF as soon as it is downloaded;
+                # JPEG pages are embedded without re-encoding.
+                pdf_path = f"downloads/janmbhoomi/mumbai/janmbhoomi_{folder_date}.pdf"
+                with IncrementalPdfWriter(pdf_path) as writer:
+                    # Process each page
+                    for page_num in range(1, total_pages + 1):
+                        try:
+                            print(f"Processing page {page_num}")
+
+                            # Navigate to the page
+                            page_url = f"https://epaper.janmabhoominewspapers.com/view/epaper/{today_date}/{page_num}"
+                            driver.get(page_url)
+
+                            # Wait for page to load
+                            time.sleep(3)
+
+                            # Get the page image
+                            page_image = get_page_image(driver, page_num)
+                            if page_image:
+                                writer.add_bytes(page_image)
+
+                        except Exception as e:
+                            print(f"Error processing page {page_num}: {str(e)}")
+                            continue
+
+                    if len(writer):
+                        writer.close()
+                        writer.report()
+                        print(f"Created PDF: {pdf_path}")
+                    else:
+                        writer.abort()
 
             else:
                 print(f"URL does not match expected format. Expected: {expected_url_format}")
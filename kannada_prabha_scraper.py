@@ -1,18 +1,17 @@
 # Clipped Article Images
 
 import asyncio
-import time
 from pathlib import Path
 from datetime import datetime  # added for execution date
 
-import requests
 from playwright.async_api import (
     async_playwright,
     Browser,
     Page,
     Error as PWError,
 )
-from tqdm import tqdm
+
+from async_download import AsyncDownloader
 
 # ──────────────── configurable ────────────────────────────────────────────── #
 
@@ -22,40 +21,10 @@ EDITION_NAME = "bangalore"
 HEADLESS = True          # set False to watch the browser
 TIMEOUT = 25_000         # ms – Playwright waits
 RETRY_MAX = 3            # per image download
+DOWNLOAD_CONCURRENCY = 8 # images fetched while the browser keeps clicking
 
 # ──────────────── helpers ─────────────────────────────────────────────────── #
 
-def download(url: str, dest: Path) -> None:
-    """Stream-download *url*→*dest*  with retries & progress bar."""
-    dest.parent.mkdir(parents=True, exist_ok=True)
-
-    for attempt in range(1, RETRY_MAX + 1):
-        try:
-            with requests.get(url, stream=True, timeout=3) as r:
-                r.raise_for_status()
-                total = int(r.headers.get("content-length", 0))
-                with dest.open("wb") as fh, tqdm(
-                    total=total,
-                    unit="B",
-                    unit_scale=True,
-                    unit_divisor=1024,
-                    desc=dest.name,
-                    leave=False,
-                ) as bar:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            fh.write(chunk)
-                            bar.update(len(chunk))
-            print(f"Downloaded: {url} → {dest}")
-            return
-        except Exception as exc:
-            if attempt == RETRY_MAX:
-                print(f"Failed to download {url} after {RETRY_MAX} attempts: {exc}")
-            else:
-                print(f"Retry {attempt}/{RETRY_MAX} for {url}: {exc}")
-                time.sleep(2 * attempt)
-
-
 async def remove_popups(page: Page) -> None:
     """Remove common modals/popups that block clicks."""
     selectors = [
@@ -75,7 +44,7 @@ async def remove_popups(page: Page) -> None:
 
 # ──────────────── main page-harvest logic ─────────────────────────────────── #
 
-async def harvest_articles_on_page(edition_page: Page, page_idx: int, date_seen: str, date_folder: Path) -> int:
+async def harvest_articles_on_page(edition_page: Page, downloader: AsyncDownloader, page_idx: int, date_seen: str, date_folder: Path) -> int:
     await edition_page.wait_for_selector("div.carousel-item.active", timeout=TIMEOUT)
     overlays = await edition_page.query_selector_all("div.carousel-item.active div.overlay")
     if not overlays:
@@ -119,7 +88,7 @@ async def harvest_articles_on_page(edition_page: Page, page_idx: int, date_seen:
             ext = Path(src).suffix
             filename = f"{PUBLICATION_NAME}_{date_seen}_{page_idx:02d}_article_{idx:02d}{ext}"
             dest = date_folder / filename
-            download(src, dest)
+            downloader.schedule(src, dest)
             saved += 1
 
         except PWError:
@@ -137,7 +106,8 @@ async def scrape_today() -> None:
     date_folder = SAVE_ROOT / PUBLICATION_NAME / EDITION_NAME
     date_folder.mkdir(parents=True, exist_ok=True)
 
-    async with async_playwright() as pw:
+    async with async_playwright() as pw, AsyncDownloader(
+            concurrency=DOWNLOAD_CONCURRENCY, retries=RETRY_MAX) as downloader:
         browser: Browser = await pw.chromium.launch(headless=HEADLESS)
         context = await browser.new_context(viewport={"width":1280,"height":900}, accept_downloads=False)
         page: Page = await context.new_page()
@@ -150,7 +120,7 @@ async def scrape_today() -> None:
         current_page = 1
 
         while True:
-            saved = await harvest_articles_on_page(page, current_page, date_seen, date_folder)
+            saved = await harvest_articles_on_page(page, downloader, current_page, date_seen, date_folder)
             total_saved += saved
 
             next_btn = page.locator("nav.pagination li.page-item button[aria-label=Next]").first
@@ -169,8 +139,10 @@ async def scrape_today() -> None:
             except PWError:
                 print(f"Could not confirm active page {current_page} (continuing anyway)")
 
-        print(f"Done – {total_saved} images downloaded.")
         await browser.close()
+        results = await downloader.drain()
+        downloaded = sum(1 for path in results if path)
+        print(f"Done – {downloaded}/{total_saved} images downloaded.")
 
 if __name__ == "__main__":
     try:
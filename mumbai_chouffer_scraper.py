@@ -2,7 +2,6 @@
 
 import os
 import asyncio
-import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from collections import defaultdict
@@ -10,24 +9,17 @@ from playwright.async_api import async_playwright
 import re
 from datetime import datetime
 
-def download_image(url, save_path):
-    try:
-        r = requests.get(url, stream=True, timeout=10)
-        if r.status_code == 200:
-            with open(save_path, 'wb') as f:
-                for chunk in r.iter_content(1024):
-                    f.write(chunk)
-    except Exception as e:
-        print(f"⚠️ Failed to download {url}: {e}")
+from async_download import AsyncDownloader
 
-def download_article_images(article_url, save_dir, publication_name, date_str, page_number, article_number):
+async def download_article_images(downloader, article_url, save_dir, publication_name, date_str, page_number, article_number):
     try:
-        res = requests.get(article_url, timeout=10)
-        if res.status_code != 200:
+        html = await downloader.fetch_text(article_url)
+        if html is None:
             return []
-        soup = BeautifulSoup(res.text, 'html.parser')
+        soup = BeautifulSoup(html, 'html.parser')
         img_tags = soup.find_all('img')
         saved_imgs = []
+        downloads = []
 
         skip_keywords = ['logo', 'punyanagari', 'yashobhumi', 'mumbaichoufernew', '12.png']
 
@@ -46,11 +38,12 @@ def download_article_images(article_url, save_dir, publication_name, date_str, p
             new_filename = f"({publication_name}{date_str}{page_number}{article_number}{image_count}).png"
             path = os.path.join(save_dir, new_filename)
 
-            download_image(img_url, path)
+            downloads.append(downloader.download(img_url, path))
             saved_imgs.append(path)
 
             image_count += 1
 
+        await asyncio.gather(*downloads)
         return saved_imgs
     except Exception as e:
         print(f"⚠️ Error processing article {article_url}: {e}")
@@ -61,7 +54,7 @@ async def scrape():
     base_url = "https://www.mumbaichoufer.com/view/842/mumbai-choufer"
     publication_name = "mumbaichoufer"
 
-    async with async_playwright() as p:
+    async with async_playwright() as p, AsyncDownloader() as downloader:
         browser = await p.chromium.launch(headless=True)
         page = await browser.new_page()
         await page.goto(base_url)
@@ -121,6 +114,7 @@ async def scrape():
                 break
 
         sorted_links = sorted(page_urls, key=lambda x: int(x.rstrip('/').split('/')[-1]))
+        article_tasks = []
 
         for page_url in sorted_links:
             page_num = page_url.rstrip('/').split('/')[-1]
@@ -145,23 +139,28 @@ async def scrape():
             page_dir = os.path.join(publication_name, date_str, f"page_{page_num}")
             os.makedirs(page_dir, exist_ok=True)
 
+            # Articles download in the background while the browser moves on
+            # to the next page.
             for idx, article_url in enumerate(article_links, start=1):
                 article_id = article_url.split('/')[-2]
                 print(f"  📰 Processing article {article_id} (Article #{idx})...")
-                images = download_article_images(
+                task = asyncio.ensure_future(download_article_images(
+                    downloader,
                     article_url,
                     page_dir,
                     publication_name,
                     date_str,
                     page_num,
                     idx
-                )
-
-                all_data[f"page_{page_num}"].append({
-                    "article_id": article_id,
-                    "article_url": article_url,
-                    "images": images
-                })
+                ))
+                article_tasks.append((f"page_{page_num}", article_id, article_url, task))
+
+        for page_key, article_id, article_url, task in article_tasks:
+            all_data[page_key].append({
+                "article_id": article_id,
+                "article_url": article_url,
+                "images": await task
+            })
 
         await browser.close()
         return all_data
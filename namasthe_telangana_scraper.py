@@ -1,5 +1,6 @@
 import os
 import time
+import argparse
 import json
 import logging
 import hashlib
@@ -16,6 +17,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from article_regions import EditionManifest, crop_regions, parse_style
+from image_validate import ImageValidator
+
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -30,8 +34,13 @@ session.mount('https://', HTTPAdapter(max_retries=retries))
 session.mount('http://', HTTPAdapter(max_retries=retries))
 
 
+# Size of the element the pagerectangle overlays are positioned in; checked
+# against the page image's aspect ratio before any local crop
+VIEW_SIZE_JS = "const p = arguments[0].offsetParent || arguments[0].parentElement; return [p.clientWidth, p.clientHeight];"
+
+
 class NewspaperDownloader:
-    def __init__(self):
+    def __init__(self, crop_locally=False):
         self.driver = self._initialize_driver()
         self.today = datetime.now().strftime("%d/%m/%Y")
         self.publication_name = "namasthe_telangana"
@@ -39,6 +48,14 @@ class NewspaperDownloader:
         self.base_dir = os.path.join(self.publication_name)
         self.articles_dir = os.path.join(self.base_dir, self.edition_name, "articles")
         self.action_chains = ActionChains(self.driver)
+        # Rejects stubs and error pages from the first chunk of the response
+        self.validator = ImageValidator(min_bytes=1024)
+        # Opt-in: cut articles out of the downloaded page instead of fetching
+        # each one (articles that cannot be cropped are still fetched)
+        self.crop_locally = crop_locally
+        self.manifest = EditionManifest(
+            os.path.join(self.base_dir, self.edition_name, "manifest.json"),
+            self.publication_name, self.edition_name, self.today)
 
     def _initialize_driver(self):
         chrome_options = Options()
@@ -74,18 +91,10 @@ class NewspaperDownloader:
                 'Referer': referer or 'https://epaper.ntnews.com/'
             }
 
-            response = session.get(url, headers=headers, stream=True, timeout=10, verify=False)
-
-            if not response.ok or 'image' not in response.headers.get('Content-Type', ''):
-                logger.warning(f"Bad response or not an image: {url}")
-                return False
-
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-
-            if os.path.getsize(filepath) < 1024:
-                os.remove(filepath)
-                logger.warning(f"Downloaded image too small: {filepath}")
+            verdict = self.validator.fetch(url, filepath, session=session, headers=headers,
+                                           timeout=10, verify=False)
+            if not verdict.ok:
+                logger.warning(f"Rejected {url}: {verdict.reason}")
                 return False
 
             logger.info(f"Downloaded image: {filepath}")
@@ -116,16 +125,16 @@ class NewspaperDownloader:
             elements = WebDriverWait(self.driver, 15).until(
                 EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.pagerectangle"))
             )
+            page_data['view_size'] = self.driver.execute_script(VIEW_SIZE_JS, elements[0]) if elements else None
             articles = []
             for el in elements:
-                style = el.get_attribute("style")
-                styles = [s.split(':')[-1].strip() for s in style.split(';') if ':' in s][:4]
+                style = parse_style(el.get_attribute("style"))
                 article = {
                     'storyid': el.get_attribute('storyid'),
                     'orgid': el.get_attribute('orgid'),
                     'pageid': page_data['pageid'],
                     'page_number': page_data['pgno'],
-                    'position': dict(zip(['top', 'left', 'width', 'height'], styles)),
+                    'position': {k: style[k] for k in ('top', 'left', 'width', 'height') if k in style},
                     'url': f"https://epaper.ntnews.com/Home/ShareArticle?OrgId={el.get_attribute('orgid')}&eid=1&imageview=1"
                 }
                 articles.append(article)
@@ -134,17 +143,17 @@ class NewspaperDownloader:
             logger.error(f"Error extracting articles: {e}")
             return []
 
+    def _article_path(self, article):
+        page_number = article['page_number']
+        return os.path.join(
+            self.articles_dir, f"page_{page_number}",
+            f"{self.publication_name}_{self.edition_name}_{page_number}_{article['storyid']}.jpg"
+        )
+
     def _download_article_image(self, article):
         try:
-            page_number = article['page_number']
-            article_number = article['storyid']
-            page_dir = os.path.join(self.articles_dir, f"page_{page_number}")
-            self._create_directory(page_dir)
-
-            filename = os.path.join(
-                page_dir,
-                f"{self.publication_name}_{self.edition_name}_{page_number}_{article_number}.jpg"
-            )
+            filename = self._article_path(article)
+            self._create_directory(os.path.dirname(filename))
 
             if os.path.exists(filename) and os.path.getsize(filename) > 1024:
                 logger.info(f"Article already downloaded: {filename}")
@@ -167,25 +176,48 @@ class NewspaperDownloader:
             logger.error(f"Error downloading article: {e}")
             return False
 
+    def _crop_articles(self, articles, fullpage_path, view_size):
+        """Crop the articles out of the page image; returns those not cropped."""
+        regions = [(a['position'], self._article_path(a)) for a in articles]
+        try:
+            saved = crop_regions(fullpage_path, regions, view_size)
+        except Exception as e:
+            logger.warning(f"Could not crop {fullpage_path}: {e}")
+            saved = {}
+        for article in articles:
+            box = saved.get(self._article_path(article))
+            if box:
+                article['box'] = list(box)
+                article['image'] = self._article_path(article)
+        logger.info(f"Cropped {len(saved)}/{len(articles)} articles from {fullpage_path}")
+        return [a for a in articles if 'box' not in a]
+
     def _process_page(self, page):
         try:
             edition_dir = os.path.join(self.base_dir, self.edition_name)
             self._create_directory(edition_dir)
 
+            fullpage_path = None
             img_url = page.get('xhighres') or page.get('highres')
             if img_url:
                 url_hash = hashlib.md5(img_url.encode()).hexdigest()[:8]
                 fullpage_path = os.path.join(edition_dir, f"page_{page['pgno']}_{url_hash}.jpg")
-                if not os.path.exists(fullpage_path):
-                    self._download_image(img_url, fullpage_path)
+                if not os.path.exists(fullpage_path) and not self._download_image(img_url, fullpage_path):
+                    fullpage_path = None
 
             self.driver.get(
                 f"https://epaper.ntnews.com/Home/FullPage?eid={page.get('eid')}&edate={self.today}&pgid={page['pageid']}")
             time.sleep(2)
 
             articles = self._extract_articles_from_page(page)
-            for article in articles:
-                self._download_article_image(article)
+            remaining = articles
+            if self.crop_locally and fullpage_path and page.get('view_size'):
+                remaining = self._crop_articles(articles, fullpage_path, page['view_size'])
+            # Articles that could not be cropped are fetched one by one
+            for article in remaining:
+                if self._download_article_image(article):
+                    article['image'] = self._article_path(article)
+            self.manifest.add_page(page['pgno'], fullpage_path, page.get('view_size'), articles)
 
         except Exception as e:
             logger.error(f"Error processing page: {e}")
@@ -200,6 +232,8 @@ class NewspaperDownloader:
             for page in pages:
                 page['eid'] = edition_id
                 self._process_page(page)
+            self.manifest.save()
+            logger.info(f"Saved edition manifest: {self.manifest.path}")
         except Exception as e:
             logger.error(f"Error processing edition {self.edition_name}: {e}")
 
@@ -224,5 +258,9 @@ class NewspaperDownloader:
 
 
 if __name__ == "__main__":
-    downloader = NewspaperDownloader()
+    parser = argparse.ArgumentParser(description='Namasthe Telangana Crawler')
+    parser.add_argument('--crop-locally', action='store_true',
+                        help='crop articles from the page image instead of downloading each clip')
+    args = parser.parse_args()
+    downloader = NewspaperDownloader(crop_locally=args.crop_locally)
     downloader.run()
@@ -6,9 +6,10 @@ import time
 import traceback
 from datetime import datetime
 
-from PIL import Image
 from playwright.sync_api import sync_playwright
 
+from image_crop import crop_images
+
 
 class NewspaperDownloader:
     def __init__(self):
@@ -19,7 +20,8 @@ class NewspaperDownloader:
         self.edition_name = "ahmedabad"
 
         self.pages_dir, self.output_dir = self.create_directories()
-        self.crop_box = (300, 360, 2680, 4100)  # Default crop coordinates
+        # None → detect the page area; a (left, top, right, bottom) box forces a fixed crop
+        self.crop_box = None
 
     @staticmethod
     def setup_logging():
@@ -178,19 +180,13 @@ class NewspaperDownloader:
         logging.info(f"✂️ Starting cropping of images in: {self.pages_dir}")
 
         try:
-            image_files = [f for f in os.listdir(self.pages_dir)
+            image_files = [os.path.join(self.pages_dir, f)
+                           for f in os.listdir(self.pages_dir)
                            if f.lower().endswith(('.png', '.jpg'))]
 
-            for image_file in image_files:
-                image_path = os.path.join(self.pages_dir, image_file)
-                try:
-                    with Image.open(image_path) as img:
-                        cropped = img.crop(self.crop_box)
-                        cropped.save(image_path)
-                        logging.info(f"✂️ Cropped and saved: {image_path}")
-                except Exception as crop_err:
-                    logging.error(
-                        f"❌ Failed to crop {image_file}: {crop_err}\n{traceback.format_exc()}")
+            results = crop_images(image_files, box=self.crop_box)
+            for image_path in results["failed"]:
+                logging.error(f"❌ Failed to crop {image_path}")
 
         except Exception as e:
             logging.error(
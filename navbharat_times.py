@@ -6,22 +6,31 @@ import img2pdf
 import requests
 from bs4 import BeautifulSoup
 
+from edition_pool import DEFAULT_CONCURRENCY, run_editions
+
 
 class NavBharatTimesCrawler:
     def __init__(
         self,
         base_url="https://epaper.navbharattimes.com/",
         output_dir="navbharat_times",
+        concurrency=DEFAULT_CONCURRENCY,
     ):
         self.base_url = base_url
         self.output_dir = os.path.join("downloads", output_dir)
-        self.session = requests.Session()
-        self.session.headers.update(
+        self.concurrency = concurrency
+        self.session = self.new_session()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    @staticmethod
+    def new_session():
+        session = requests.Session()
+        session.headers.update(
             {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
             }
         )
-        os.makedirs(self.output_dir, exist_ok=True)
+        return session
 
     def create_date_folder(self, state):
         folder_path = os.path.join(self.output_dir, state)
@@ -51,9 +60,10 @@ class NavBharatTimesCrawler:
 
         return state_map
 
-    def get_page_images(self, state, state_id, str_date):
+    def get_page_images(self, state, state_id, str_date, session=None):
+        session = session or self.session
         url = f"{self.base_url}{state}/{str_date}/{state_id}/page-1.html"
-        response = self.session.get(url)
+        response = session.get(url)
 
         if response.status_code != 200:
             print(f"Failed to fetch main page for {state}")
@@ -65,13 +75,15 @@ class NavBharatTimesCrawler:
 
         return img_urls
 
-    def download_and_save_pdf(self, img_urls, folder_path, state, date_str):
+    def download_and_save_pdf(self, img_urls, folder_path, state, date_str,
+                              session=None):
+        session = session or self.session
         pdf_path = os.path.join(folder_path, f"{state}_{date_str}.pdf")
         img_bytes = []
         for idx, img_url in enumerate(img_urls, start=1):
             try:
                 print(f"Downloading {state} page {idx}: {img_url}")
-                resp = self.session.get(img_url)
+                resp = session.get(img_url)
                 if resp.status_code == 200:
                     img_bytes.append(resp.content)
                 else:
@@ -83,8 +95,21 @@ class NavBharatTimesCrawler:
             with open(pdf_path, "wb") as f:
                 f.write(img2pdf.convert(img_bytes))
             print(f"Saved PDF: {pdf_path}")
-        else:
-            print(f"No images downloaded for {state}")
+            return len(img_bytes)
+        print(f"No images downloaded for {state}")
+        return False
+
+    def process_state(self, state, state_id, str_date, date_path):
+        # One session per state keeps connection pools independent across
+        # worker threads.
+        session = self.new_session()
+        folder_path = self.create_date_folder(state)
+        img_urls = self.get_page_images(state, state_id, str_date, session)
+        if not img_urls:
+            print(f"No pages found for {state} on {str_date}")
+            return False
+        return self.download_and_save_pdf(img_urls, folder_path, state,
+                                          date_path, session)
 
     def process_newspapers(self):
         # date_str = datetime.now().strftime("%Y-%m-%d")
@@ -98,13 +123,13 @@ class NavBharatTimesCrawler:
         str_date = today_date.strftime("%Y-%m-%d")
         date_path = datetime.now().strftime("%Y_%m_%d")
 
-        for state, state_id in states.items():
-            folder_path = self.create_date_folder(state)
-            img_urls = self.get_page_images(state, state_id, str_date)
-            if img_urls:
-                self.download_and_save_pdf(img_urls, folder_path, state, date_path)
-            else:
-                print(f"No pages found for {state} on {str_date}")
+        report = run_editions(
+            "navbharat_times", list(states.items()),
+            lambda state: self.process_state(*state, str_date, date_path),
+            concurrency=self.concurrency,
+            name=lambda state: state[0])
+        report.print_summary()
+        return report
 
 
 def main():
@@ -6,6 +6,8 @@ import img2pdf
 import requests
 from bs4 import BeautifulSoup
 
+from pdf_merge import StreamingPdfMerger
+
 
 class NavodayaTimesCrawler:
     def __init__(
@@ -56,12 +58,11 @@ class NavodayaTimesCrawler:
             return []
 
     def download_pdf_data(self, page_link_list, date_str, addition_name):
+        output_folder_page = self.create_folder( addition_name)
+        merger = StreamingPdfMerger(
+            os.path.join(output_folder_page, f"{addition_name}_{date_str}.pdf"),
+            order=range(len(page_link_list)))
         try:
-            # output_folder_paper = self.create_folder(
-            #     date_str, addition_name, self.news_paper
-            # )
-            output_folder_page = self.create_folder( addition_name)
-            # merger = PdfMerger()
             for page_number, page_link in enumerate(page_link_list):
                 print(f"Downloading {addition_name} page {page_number}: {page_link}")
                 filename = f"{addition_name}_{date_str}_{page_number+1}.pdf"
@@ -71,17 +72,16 @@ class NavodayaTimesCrawler:
                     f.write(img2pdf.convert(BytesIO(response.content)))
                 print(f"News page saved: {file_path}")
 
-                # merger.append(file_path)
+                # Appended to the edition PDF as soon as it is written
+                merger.page_ready(page_number, file_path)
 
-            # filename = f"{self.newspaper_name}-{addition_name}-{date_str}.pdf"
-            # file_path = os.path.join(output_folder_paper, filename)
-            # print(f"News paper saved: {file_path}")
-            # merger.write(file_path)
-            # merger.close()
             return True
         except Exception as e:
             print(f"Error downloading PDF: {str(e)}")
             return False
+        finally:
+            if merger.finish():
+                merger.report()
 
     def process_newspapers(self):
         date_str = datetime.now().strftime("%Y_%m_%d")
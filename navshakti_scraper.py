@@ -9,14 +9,17 @@ from typing import Optional, Dict
 import requests
 from playwright.sync_api import sync_playwright
 
+from edition_pool import DEFAULT_CONCURRENCY, run_editions
+
 
 class FreePressJournalCrawler:
     BASE_URL = "https://epaper.freepressjournal.in/"
 
     def __init__(self, output_dir="downloads/navshakti", max_editions=5,
-                 headless=False):
+                 headless=False, concurrency=DEFAULT_CONCURRENCY):
         self.output_dir = output_dir
         self.max_editions = max_editions
+        self.concurrency = concurrency
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -163,26 +166,47 @@ class FreePressJournalCrawler:
             print(f"Error scraping edition {index + 1}: {e}")
             return False
 
-    def run(self) -> None:
+    def count_editions(self, page) -> int:
+        holder = page.locator("div.epapers_holder").nth(1)
+        return holder.locator("div.card-box").count()
+
+    def open_landing_page(self, browser):
+        context = browser.new_context()
+        page = context.new_page()
+        page.goto(self.BASE_URL, timeout=60000)
+        page.wait_for_selector("div.epapers_holder")
+        return page
+
+    def scrape_edition_in_browser(self, index: int) -> bool:
+        # Sync Playwright is bound to its thread, so each edition worker
+        # drives its own browser instead of sharing the landing page.
+        print(f"Processing edition {index + 1}")
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=self.headless)
-            context = browser.new_context()
-            page = context.new_page()
-
-            page.goto(self.BASE_URL, timeout=60000)
-            page.wait_for_selector("div.epapers_holder")
-
-            for i in range(self.max_editions):
-                print(f"Processing edition {i + 1}")
-                success = self.scrape_edition(page, i)
-                if not success:
-                    print("Stopping further edition processing.")
-                    break
-                page.goto(self.BASE_URL, timeout=30000)
-                page.wait_for_selector("div.epapers_holder")
+            try:
+                page = self.open_landing_page(browser)
+                return self.scrape_edition(page, index)
+            finally:
+                browser.close()
 
+    def run(self):
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=self.headless)
+            page = self.open_landing_page(browser)
+            total_editions = self.count_editions(page)
             browser.close()
-            print("All done.")
+
+        edition_count = min(self.max_editions, total_editions)
+        print(f"Found {total_editions} editions, processing {edition_count}.")
+
+        report = run_editions(
+            "navshakti", list(range(edition_count)),
+            self.scrape_edition_in_browser,
+            concurrency=self.concurrency,
+            name=lambda index: f"edition {index + 1}")
+        report.print_summary()
+        print("All done.")
+        return report
 
 
 def main():
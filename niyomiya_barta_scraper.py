@@ -4,13 +4,15 @@ import os
 import re
 from datetime import datetime
 from urllib.parse import urljoin
-from PIL import Image
+
+from convert_pool import ConversionPool, gif_to_pdf
 
 
 class NiyomiyaBartaCrawler:
     def __init__(self):
         self.base_url = "https://niyomiyabarta.com/epaper/"
         self.newspaper_name = "niyomiya_barta"
+        self.pool = None
         # os.makedirs(self.newspaper_name, exist_ok=True)
 
     def create_date_folder(self):
@@ -30,12 +32,11 @@ class NiyomiyaBartaCrawler:
                         f.write(chunk)
                 print(f"Downloaded: {image_path}")
 
-                self.convert_gif_to_pdf(
-                    image_path, page_num, date_folder, formatted_date
-                )
-
-                os.remove(image_path)
-                print(f"Deleted original GIF: {image_path}")
+                # Converted (and the GIF deleted) in the background while the
+                # next page downloads
+                pdf_filename = (f"{self.newspaper_name}_{formatted_date}_page_{page_num}.pdf")
+                self.pool.submit("gif", gif_to_pdf, image_path,
+                                 os.path.join(date_folder, pdf_filename))
 
                 return True
             else:
@@ -47,19 +48,6 @@ class NiyomiyaBartaCrawler:
             print(f"Error downloading {img_url}: {str(e)}")
             return False
 
-    def convert_gif_to_pdf(self, image_path, page_num, date_folder, formatted_date):
-        try:
-            pdf_filename = (f"{self.newspaper_name}_{formatted_date}_page_{page_num}.pdf")
-            pdf_path = os.path.join(date_folder, pdf_filename)
-
-            img = Image.open(image_path).convert("RGB")
-            img.save(pdf_path)
-            print(f"Converted to PDF: {pdf_path}")
-            return pdf_path
-        except Exception as e:
-            print(f"Error converting GIF to PDF: {str(e)}")
-            return None
-
     def get_page_image_urls(self, page_url):
         try:
             response = requests.get(page_url)
@@ -124,6 +112,11 @@ class NiyomiyaBartaCrawler:
             print(f"No pages found date: {date}")
             return False
 
+        with ConversionPool() as self.pool:
+            self.download_pages(page_links, date)
+        return True
+
+    def download_pages(self, page_links, date):
         for i, page_url in enumerate(page_links, 1):
             print(f"Processing page {i}/{len(page_links)}: {page_url}")
 
@@ -146,7 +139,6 @@ class NiyomiyaBartaCrawler:
                 success = self.download_image(
                     img_url, page_num, date_folder, formatted_date
                 )
-        return True
 
 
 if __name__ == "__main__":
@@ -0,0 +1,219 @@
+"""
+Page-count discovery for e-paper viewers.
+
+Scrapers used hard-coded bounds (LAST_PAGE = 10, max_pages = 20,
+range(1, 50)) which either cut off large Sunday editions or burned retries
+and timeouts on pages that do not exist. The resolvers here read the count
+from the viewer itself (page dropdowns, "#pagecount-btn" style labels,
+thumbnail strips, pagination links) and fall back to cheap probing, so the
+whole page list can be planned before any page is downloaded.
+"""
+import time
+
+# Selector recipes per viewer platform. Each key is optional:
+#   count   - elements that exist once per page (thumbnail strip)
+#   label   - element whose text ends in the total, e.g. "3 / 24" or "of 24"
+#   options - page dropdown <select>, by exact id or name; its options are counted
+#   numbers - pagination links/buttons labelled with page numbers; only a
+#             lower bound when a "next"/ellipsis control follows the highest
+# Dropdown selectors are exact: substring matches like [id*='age'] also hit
+# language and image pickers.
+PLATFORMS = {
+    # epaper_main.aspx / asianage-epaper.aspx (Deccan Chronicle, Asian Age)
+    "aspx_thumbs": {
+        "count": "input[id^='DataList1_ImageButton1_']",
+    },
+    # "de" viewer with #de-page-container (Ahmedabad Mirror)
+    "de_viewer": {
+        "label": "#pagecount-btn",
+        "count": "#page-thumbs.pages a, #page-thumbs a.pagethumb",
+    },
+    # ImageContainerDiv viewer with #Next_Page (Sakshi)
+    "image_container": {
+        "options": "select#ddlPage, select#ddlPages, select[name='ddlPage'], select[name='page']",
+        "count": "#thumbnails img, .pagethumb",
+    },
+    # Angular viewer with per-page URLs (Gujarat Samachar)
+    "pagination": {
+        "numbers": ".pagination a, .pagination button, ul.pagination li",
+    },
+}
+
+GENERIC = {
+    "label": "#pagecount-btn, .pagecount, .page-count, label[for*='page_number']",
+    # Samaja, Pragativadi
+    "options": "select#tpgnumber, select#ddlistPage",
+    "numbers": ".pagination a, .pagination button",
+}
+
+# Runs in the browser: returns the count from the first strategy that finds
+# one (label, dropdown, thumbnails, pagination), or 0 when none match. A
+# windowed pagination ("1 2 3 … Next") only bounds the count from below and
+# comes back negated: -3 means "at least 3 pages".
+PAGE_COUNT_JS = """
+(recipe) => {
+    const numbersIn = (text) => (String(text || '').match(/\\d+/g) || []).map(Number);
+    if (recipe.label) {
+        for (const el of document.querySelectorAll(recipe.label)) {
+            const nums = numbersIn(el.innerText || el.textContent || el.value);
+            if (nums.length) return nums[nums.length - 1];
+        }
+    }
+    if (recipe.options) {
+        // One option per page; skip "Select page" style prompts
+        const select = document.querySelector(recipe.options);
+        if (select) {
+            const pages = new Set();
+            for (const option of select.options) {
+                const value = option.value.trim();
+                if (numbersIn(value).length || numbersIn(option.textContent).length) {
+                    pages.add(value || option.textContent.trim());
+                }
+            }
+            if (pages.size) return pages.size;
+        }
+    }
+    if (recipe.count) {
+        const count = document.querySelectorAll(recipe.count).length;
+        if (count) return count;
+    }
+    if (recipe.numbers) {
+        const controls = Array.from(document.querySelectorAll(recipe.numbers));
+        let last = 0, lastIndex = -1;
+        controls.forEach((el, index) => {
+            const text = (el.innerText || el.textContent || '').trim();
+            if (/^\\d+$/.test(text) && Number(text) > last) {
+                last = Number(text);
+                lastIndex = index;
+            }
+        });
+        const disabled = (el) => el.disabled || el.getAttribute('aria-disabled') === 'true'
+            || /disabled/.test(el.className || '')
+            || /disabled/.test((el.parentElement && el.parentElement.className) || '');
+        const more = controls.slice(lastIndex + 1).some((el) => {
+            const text = (el.innerText || el.textContent || '').trim();
+            const label = (el.getAttribute('aria-label') || '') + ' ' + (el.className || '');
+            return !disabled(el) && (/^(\u2026|\\.{2,}|>|>>|\u203a|\u00bb|\u2192)$/.test(text)
+                || /next|last/i.test(text + ' ' + label));
+        });
+        if (last) return more ? -last : last;
+    }
+    return 0;
+}
+"""
+
+# Selenium's execute_script takes a function body, not a function.
+_SELENIUM_JS = "return (" + PAGE_COUNT_JS + ")(arguments[0]);"
+
+
+def _recipes(platform):
+    recipes = [PLATFORMS[platform]] if platform else []
+    recipes.append(GENERIC)
+    return recipes
+
+
+def _accept(total, max_pages, probe=None):
+    """The page count for a PAGE_COUNT_JS result, or None."""
+    total = int(total or 0)
+    if total < 0:
+        # Windowed pagination: the highest visible label is only a floor
+        if probe is None or -total > max_pages:
+            return None
+        print(f"Pagination shows at least {-total} pages → probing the rest")
+        return probe_page_count(probe, max_pages, known=-total) or None
+    return total if 0 < total <= max_pages else None
+
+
+def resolve_page_count(page, platform=None, max_pages=500, probe=None):
+    """Read the page count from a Selenium driver or sync Playwright page.
+
+    Returns None when the viewer exposes no usable count, so callers can
+    fall back to probe_page_count or their previous stop condition. When
+    the pagination is windowed the count is found with ``probe`` (an
+    ``exists(page_number)`` check, see probe_page_count) from the highest
+    visible page on, or is None without one.
+    """
+    for recipe in _recipes(platform):
+        try:
+            if hasattr(page, "execute_script"):
+                total = page.execute_script(_SELENIUM_JS, recipe)
+            else:
+                total = page.evaluate(PAGE_COUNT_JS, recipe)
+        except Exception as e:
+            print(f"Page count lookup failed: {e}")
+            continue
+        total = _accept(total, max_pages, probe)
+        if total:
+            return total
+    return None
+
+
+async def async_resolve_page_count(page, platform=None, max_pages=500):
+    """Async Playwright counterpart of resolve_page_count."""
+    for recipe in _recipes(platform):
+        try:
+            total = await page.evaluate(PAGE_COUNT_JS, recipe)
+        except Exception as e:
+            print(f"Page count lookup failed: {e}")
+            continue
+        total = _accept(total, max_pages)
+        if total:
+            return total
+    return None
+
+
+def probe_page_count(exists, max_pages=200, known=1):
+    """Find the last page with exponential then binary search.
+
+    ``exists(page_number)`` must be a cheap check (a HEAD request, a status
+    code, a selector lookup). About 2*log2(N) probes are needed instead of
+    walking every page until one fails. ``known`` is a page already known to
+    exist (e.g. the highest one a windowed pagination shows).
+    """
+    if known <= 1:
+        if not exists(1):
+            return 0
+        known = 1
+    low, high = known, known * 2
+    while high <= max_pages and exists(high):
+        low, high = high, high * 2
+    high = min(high, max_pages + 1)
+    # Invariant: page ``low`` exists, page ``high`` does not (or is the cap).
+    while high - low > 1:
+        middle = (low + high) // 2
+        if exists(middle):
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+class PagePlan:
+    """The full list of pages for an edition, with progress reporting."""
+
+    def __init__(self, label, total):
+        self.label = label
+        self.pages = list(range(1, total + 1))
+        self.completed = 0
+        self.failed = []
+        self._started = time.perf_counter()
+
+    def __iter__(self):
+        return iter(self.pages)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def mark(self, page_number, ok=True):
+        self.completed += 1
+        if not ok:
+            self.failed.append(page_number)
+        elapsed = time.perf_counter() - self._started
+        print(f"[{self.label}] {self.completed}/{len(self.pages)} pages "
+              f"({elapsed:.1f}s elapsed)")
+
+    def summary(self):
+        elapsed = time.perf_counter() - self._started
+        print(f"[{self.label}] done: {self.completed - len(self.failed)}/"
+              f"{len(self.pages)} pages ok in {elapsed:.1f}s"
+              + (f", failed pages {self.failed}" if self.failed else ""))
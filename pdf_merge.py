@@ -0,0 +1,266 @@
+"""
+Streaming merge of per-page PDFs into one edition PDF.
+
+``PdfMerger`` keeps every input parsed in memory until ``write()``, so the
+edition PDF only starts once the last page is downloaded. StreamingPdfMerger
+appends each page PDF to the output file as soon as it lands: its objects
+are renumbered and copied with their streams still encoded, so content
+streams and images are never decoded. A page-order manifest lets pages
+arrive out of order (or not at all) while the output keeps edition order.
+The finished PDF gets a ``<name>.pdf.sources.json`` sidecar listing the page
+files it was merged from, so later stages can tell an edition PDF from the
+pages kept next to it.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject,
+                            EncodedStreamObject, IndirectObject, NameObject,
+                            StreamObject)
+
+from pdf_writer import IncrementalPdfWriter
+
+SOURCES_SUFFIX = ".sources.json"
+# Page attributes that may be inherited from the source page tree
+_INHERITABLE = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _page_reference(page):
+    return (getattr(page, "indirect_reference", None)
+            or getattr(page, "indirect_ref", None))
+
+
+def _flatten_page(page):
+    """Copy of a page dictionary with inherited attributes pulled in."""
+    flat = DictionaryObject()
+    for key, value in page.items():
+        if key != "/Parent":
+            flat[key] = value
+    parent = page.get("/Parent")
+    while parent is not None:
+        parent = parent.get_object()
+        for key in _INHERITABLE:
+            if key not in flat and key in parent:
+                flat[NameObject(key)] = parent.raw_get(key)
+        parent = parent.get("/Parent")
+    return flat
+
+
+def _copy_stream(obj):
+    """Empty stream of the same kind as ``obj`` holding its bytes as they are.
+
+    PyPDF2 3.0.1 has no public accessor for a stream's still-encoded bytes:
+    ``EncodedStreamObject.get_data`` decodes them and ``set_data`` raises. The
+    copy therefore goes through ``_data``, and requirements.txt pins that
+    exact version.
+    """
+    copy = (EncodedStreamObject() if isinstance(obj, EncodedStreamObject)
+            else DecodedStreamObject())
+    copy._data = obj._data
+    return copy
+
+
+def _translate(obj, ref):
+    """Copy ``obj`` with every indirect reference passed through ``ref``."""
+    if isinstance(obj, IndirectObject):
+        return ref(obj)
+    if isinstance(obj, StreamObject):
+        copy = _copy_stream(obj)
+        for key, value in obj.items():
+            copy[key] = _translate(value, ref)
+        return copy
+    if isinstance(obj, DictionaryObject):
+        copy = DictionaryObject()
+        for key, value in obj.items():
+            copy[key] = _translate(value, ref)
+        return copy
+    if isinstance(obj, ArrayObject):
+        return ArrayObject(_translate(value, ref) for value in obj)
+    return obj
+
+
+class StreamingPdfMerger(IncrementalPdfWriter):
+    """Concatenate PDFs into ``path`` one input at a time.
+
+    With ``order`` (the manifest of page keys, in edition order) pages are
+    handed over with ``page_ready(key, source)`` in any order and written as
+    soon as every earlier page is in; ``page_failed(key)`` lets the merge move
+    past a page that will never arrive. Without ``order`` pages are written
+    in arrival order. Safe to call from several threads.
+    """
+
+    def __init__(self, path, order=None):
+        super().__init__(path)
+        self.order = list(order) if order is not None else None
+        self.manifest = []
+        self._ready = {}
+        self._position = 0
+        self._lock = threading.Lock()
+        self._merge_started = time.perf_counter()
+
+    def _copy_object(self, obj_id, obj):
+        start = self._fh.tell()
+        self._offsets[obj_id] = start
+        self._write(f"{obj_id} 0 obj\n".encode())
+        obj.write_to_stream(self._fh, None)
+        self._write(b"\nendobj\n")
+        return self._fh.tell() - start
+
+    def add_pdf(self, source):
+        """Append every page of ``source``; returns the number of pages."""
+        started = time.perf_counter()
+        reader = PdfReader(str(source))
+        if reader.is_encrypted:
+            raise ValueError(f"{source} is encrypted")
+        pages = list(reader.pages)
+
+        mapping = {}
+        queue = []
+
+        def ref(indirect):
+            key = (indirect.idnum, indirect.generation)
+            if key not in mapping:
+                mapping[key] = self._alloc()
+                queue.append(indirect)
+            return IndirectObject(mapping[key], 0, None)
+
+        # Register the pages first so references to them (annotations,
+        # link destinations) point at the copies instead of the source tree.
+        page_ids = []
+        for page in pages:
+            page_id = self._alloc()
+            own = _page_reference(page)
+            if own is not None:
+                mapping[(own.idnum, own.generation)] = page_id
+            page_ids.append(page_id)
+
+        for page, page_id in zip(pages, page_ids):
+            size = 0
+            page_dict = _translate(_flatten_page(page), ref)
+            page_dict[NameObject("/Parent")] = IndirectObject(2, 0, None)
+            size += self._copy_object(page_id, page_dict)
+            while queue:
+                indirect = queue.pop()
+                size += self._copy_object(
+                    mapping[(indirect.idnum, indirect.generation)],
+                    _translate(indirect.get_object(), ref))
+            self._page_refs.append(page_id)
+            self.page_stats.append({
+                "page": len(self._page_refs),
+                "seconds": time.perf_counter() - started,
+                "bytes": size,
+            })
+            started = time.perf_counter()
+        return len(pages)
+
+    def _merge(self, key, source):
+        try:
+            pages = self.add_pdf(source)
+            print(f"📎 Merged {source} ({pages} pages)")
+        except Exception as e:
+            print(f"Error merging {source}: {str(e)}")
+            pages = 0
+        self.manifest.append({"key": key, "source": str(source), "pages": pages})
+
+    def _flush(self):
+        while self._position < len(self.order):
+            key = self.order[self._position]
+            if key not in self._ready:
+                break
+            source = self._ready.pop(key)
+            if source is None:
+                self.manifest.append({"key": key, "source": None, "pages": 0})
+            else:
+                self._merge(key, source)
+            self._position += 1
+
+    def page_ready(self, key, source):
+        """Hand over the PDF for page ``key`` once it is on disk."""
+        with self._lock:
+            if self.order is None:
+                self._merge(key, source)
+            else:
+                self._ready[key] = source
+                self._flush()
+
+    def page_failed(self, key):
+        """Record that page ``key`` will not arrive."""
+        with self._lock:
+            if self.order is not None:
+                self._ready[key] = None
+                self._flush()
+
+    def finish(self):
+        """Write pages still waiting on a missing page, then close.
+
+        Returns the output path, or None (and no file) if nothing merged.
+        """
+        with self._lock:
+            if self.order is not None:
+                for key in self.order[self._position:]:
+                    source = self._ready.pop(key, None)
+                    if source is None:
+                        self.manifest.append({"key": key, "source": None, "pages": 0})
+                    else:
+                        self._merge(key, source)
+                self._position = len(self.order)
+                # Pages handed over under keys missing from the manifest
+                for key, source in list(self._ready.items()):
+                    if source is not None:
+                        self._merge(key, source)
+                self._ready.clear()
+            if not len(self):
+                self.abort()
+                return None
+            path = self.close()
+            self._write_sources()
+            return path
+
+    def _write_sources(self):
+        sources = [os.path.abspath(entry["source"]) for entry in self.manifest
+                   if entry["source"] is not None]
+        try:
+            with open(f"{self.path}{SOURCES_SUFFIX}", "w", encoding="utf-8") as f:
+                json.dump({"output": os.path.abspath(str(self.path)), "sources": sources}, f,
+                          ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"Could not write the source list of {self.path}: {e}")
+
+    @property
+    def missing(self):
+        return [entry["key"] for entry in self.manifest if not entry["pages"]]
+
+    def report(self):
+        elapsed = time.perf_counter() - self._merge_started
+        size = sum(stat["bytes"] for stat in self.page_stats)
+        peak = peak_memory_mb()
+        print(f"📚 {self.path}: {len(self)} pages from "
+              f"{len(self.manifest) - len(self.missing)} files, "
+              f"{size / (1024 * 1024):.1f} MB, {elapsed:.1f}s since start"
+              + (f", peak memory {peak:.0f} MB" if peak is not None else ""))
+        if self.missing:
+            print(f"   missing pages: {self.missing}")
+
+
+def merge_pdfs(pdf_files, output_path):
+    """Merge ``pdf_files`` in order into ``output_path``; returns the path."""
+    merger = StreamingPdfMerger(output_path, order=range(len(pdf_files)))
+    for index, pdf in enumerate(pdf_files):
+        merger.page_ready(index, pdf)
+    path = merger.finish()
+    merger.report()
+    return path
@@ -0,0 +1,231 @@
+"""
+Incremental multi-page PDF writer.
+
+``first.save(path, save_all=True, append_images=rest)`` and FPDF both need
+every page in memory (or re-encoded into a temp dir) before the PDF is
+written. IncrementalPdfWriter instead writes each page's objects to disk as
+soon as the page is added, so memory stays bounded to the page being added.
+JPEG data is embedded as-is with /DCTDecode, without decoding or
+re-encoding; anything else goes through Pillow once and is stored with
+lossless /FlateDecode. Build time and size are recorded per page.
+"""
+import os
+import time
+import zlib
+
+A4 = (595.28, 841.89)
+
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_info(data):
+    """Return ``(width, height, components)`` from a JPEG header, else None."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        length = int.from_bytes(data[i + 2:i + 4], "big")
+        if marker in _SOF_MARKERS and i + 10 <= len(data):
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return width, height, data[i + 9]
+        if marker == 0xDA:
+            break
+        i += 2 + length
+    return None
+
+
+class IncrementalPdfWriter:
+    """Append image pages to a PDF one at a time.
+
+    ``dpi`` maps image pixels to PDF points. When ``page_size`` is given
+    (in points, e.g. A4) every image is scaled to fit and centred on a page
+    of that size instead. The file is written to ``<path>.part`` and
+    renamed into place by ``close()``.
+    """
+
+    def __init__(self, path, dpi=72, page_size=None, compress_level=6):
+        self.path = str(path)
+        self.dpi = dpi
+        self.page_size = page_size
+        self.compress_level = compress_level
+        self.page_stats = []
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._tmp_path = self.path + ".part"
+        self._fh = open(self._tmp_path, "wb")
+        self._offsets = {}
+        self._page_refs = []
+        self._next_id = 3  # 1 = catalog, 2 = page tree (written on close)
+        self._closed = False
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __len__(self):
+        return len(self._page_refs)
+
+    # ───────── low level ───────── #
+    def _write(self, data):
+        self._fh.write(data)
+
+    def _alloc(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _object(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._fh.tell()
+        self._write(f"{obj_id} 0 obj\n".encode())
+        self._write(body)
+        if stream is not None:
+            self._write(b"\nstream\n")
+            self._write(stream)
+            self._write(b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def _add_page(self, width, height, image_dict, data, started):
+        image_id, content_id, page_id = self._alloc(), self._alloc(), self._alloc()
+        self._object(
+            image_id,
+            (f"<< /Type /XObject /Subtype /Image /Width {width} "
+             f"/Height {height} {image_dict} /Length {len(data)} >>").encode(),
+            data,
+        )
+
+        if self.page_size:
+            page_w, page_h = self.page_size
+            scale = min(page_w / width, page_h / height)
+            draw_w, draw_h = width * scale, height * scale
+            x, y = (page_w - draw_w) / 2, (page_h - draw_h) / 2
+        else:
+            page_w = draw_w = width * 72.0 / self.dpi
+            page_h = draw_h = height * 72.0 / self.dpi
+            x = y = 0
+        content = (f"q {draw_w:.4f} 0 0 {draw_h:.4f} {x:.4f} {y:.4f} cm "
+                   f"/Im0 Do Q").encode()
+        self._object(content_id, f"<< /Length {len(content)} >>".encode(),
+                     content)
+        self._object(
+            page_id,
+            (f"<< /Type /Page /Parent 2 0 R "
+             f"/MediaBox [0 0 {page_w:.4f} {page_h:.4f}] "
+             f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+             f"/Contents {content_id} 0 R >>").encode(),
+        )
+        self._page_refs.append(page_id)
+        self.page_stats.append({
+            "page": len(self._page_refs),
+            "seconds": time.perf_counter() - started,
+            "bytes": len(data),
+        })
+
+    # ───────── public API ───────── #
+    def add_jpeg(self, data):
+        """Embed JPEG bytes as a page without decoding them."""
+        started = time.perf_counter()
+        info = jpeg_info(data)
+        if info is None:
+            raise ValueError("not a JPEG image")
+        width, height, components = info
+        if components == 1:
+            colour = "/ColorSpace /DeviceGray"
+        elif components == 4:
+            # Adobe CMYK JPEGs are stored inverted
+            colour = "/ColorSpace /DeviceCMYK /Decode [1 0 1 0 1 0 1 0]"
+        else:
+            colour = "/ColorSpace /DeviceRGB"
+        self._add_page(width, height,
+                       f"{colour} /BitsPerComponent 8 /Filter /DCTDecode",
+                       data, started)
+
+    def add_image(self, image):
+        """Embed a Pillow image losslessly with Flate compression."""
+        started = time.perf_counter()
+        if image.mode == "L":
+            colour = "/DeviceGray"
+        else:
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            colour = "/DeviceRGB"
+        width, height = image.size
+        data = zlib.compress(image.tobytes(), self.compress_level)
+        self._add_page(width, height,
+                       f"/ColorSpace {colour} /BitsPerComponent 8 "
+                       f"/Filter /FlateDecode",
+                       data, started)
+
+    def add_bytes(self, data):
+        """Add encoded image bytes, passing JPEG through untouched."""
+        if jpeg_info(data) is not None:
+            self.add_jpeg(data)
+            return
+        from io import BytesIO
+        from PIL import Image
+
+        with Image.open(BytesIO(data)) as image:
+            self.add_image(image)
+
+    def add_file(self, path):
+        with open(path, "rb") as f:
+            self.add_bytes(f.read())
+
+    def close(self):
+        if self._closed:
+            return self.path
+        kids = " ".join(f"{ref} 0 R" for ref in self._page_refs)
+        self._object(2, (f"<< /Type /Pages /Kids [{kids}] "
+                         f"/Count {len(self._page_refs)} >>").encode())
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self._fh.tell()
+        self._write(f"xref\n0 {self._next_id}\n".encode())
+        self._write(b"0000000000 65535 f \n")
+        for obj_id in range(1, self._next_id):
+            if obj_id in self._offsets:
+                self._write(f"{self._offsets[obj_id]:010d} 00000 n \n".encode())
+            else:  # allocated but never written, e.g. a merge that failed
+                self._write(b"0000000000 65535 f \n")
+        self._write((f"trailer\n<< /Size {self._next_id} /Root 1 0 R >>\n"
+                     f"startxref\n{xref_offset}\n%%EOF\n").encode())
+        self._fh.close()
+        os.replace(self._tmp_path, self.path)
+        self._closed = True
+        return self.path
+
+    def abort(self):
+        """Drop the partial file, e.g. after an error."""
+        if self._closed:
+            return
+        self._fh.close()
+        self._closed = True
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def report(self):
+        total = sum(stat["seconds"] for stat in self.page_stats)
+        size = sum(stat["bytes"] for stat in self.page_stats)
+        for stat in self.page_stats:
+            print(f"  page {stat['page']:>3}: {stat['seconds'] * 1000:7.1f} ms, "
+                  f"{stat['bytes'] / 1024:8.1f} KB")
+        print(f"📄 {len(self.page_stats)} pages, {size / (1024 * 1024):.1f} MB "
+              f"image data, {total:.2f}s building PDF")
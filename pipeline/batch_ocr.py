@@ -0,0 +1,515 @@
+"""
+Batch OCR over a day's scraper output.
+
+Walks ``downloads/<paper>/<edition>/`` (any depth below the edition), picks
+the Tesseract language for each paper and OCRs every page and clip image on
+a process pool sized to the machine. Each result is appended to a JSONL file
+as soon as it finishes, so an interrupted run resumes where it stopped.
+With ``--montage`` small clips are OCRed in batches through montage.py;
+with ``--pdf`` PDF editions are read from their text layer where it is
+usable (pdf_text.py) and OCRed page by page otherwise. ``--detect-lang``
+narrows each paper's language set from a few of its pages (lang_detect.py);
+``--two-pass`` reads pages with the fast models and re-reads only the
+low-confidence lines with the best ones (two_pass.py). Pages the scrapers'
+pHash index recorded as duplicates (image_hash.HashIndex) are not OCRed
+again: their record reuses the text of the earlier image.
+
+    python batch_ocr.py ../downloads --papers sakal gomantak --workers 8
+"""
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from ocr import BACKENDS, clean_ocr_text, run_ocr_on_image
+from lang_detect import PROFILE_SAMPLES, LanguageProfiles, detect_language
+from layout import blocks_text, run_layout_ocr
+from montage import MAX_MONTAGE_CLIPS, is_clip, run_montage_ocr
+from ocr_cache import DEFAULT_CACHE, OcrCache
+from pdf_text import OCR_DPI, ocr_pdf
+from preprocess import for_paper
+from two_pass import models_error, run_two_pass_ocr
+
+OUTPUT_DIR = "./output"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".tif", ".tiff")
+PDF_EXTENSIONS = (".pdf",)
+# Written by image_hash.HashIndex next to the paper folders
+DUPLICATES_FILE = "phash_duplicates.jsonl"
+# Sidecar pdf_merge.StreamingPdfMerger writes next to a merged edition PDF
+PDF_SOURCES_SUFFIX = ".sources.json"
+# Page PDFs kept next to their edition PDF: <edition stem>_<n> or _page_<n>
+PAGE_PDF = re.compile(r"^(?P<stem>.+?)_(?:page_)?\d+\.pdf$", re.IGNORECASE)
+
+# Tesseract language of each paper, keyed by its downloads/ folder name
+# (lower case, spaces as underscores). Papers not listed are read as English.
+PAPER_LANGS = {
+    "aadab_hyderabad": "urd",
+    "aaj_samaj": "hin",
+    "aapla_mahanagar": "mar",
+    "ahmedabad_express": "guj",
+    "ahmedabad_mirror": "eng",
+    "andhra_prabha": "tel",
+    "bombay_samachar": "guj",
+    "chardikala": "pan",
+    "daily_hindi_milap": "hin",
+    "daily_udaan": "hin",
+    "dainik_navjyoti": "hin",
+    "dainik_purvoday": "hin",
+    "dainik_sambad": "ben",
+    "dakshin_bharath": "hin",
+    "deshbandhu": "hin",
+    "dharitri": "ori",
+    "disha": "tel",
+    "gomantak": "mar",
+    "gujarat_mitra": "guj",
+    "gujarat_samachar": "guj",
+    "hamara_mahanagar": "hin",
+    "hamro_praja_shakti": "nep",
+    "himachal_dastak": "hin",
+    "jagat_kranti": "hin",
+    "jagmarg": "hin",
+    "jai_hind": "guj",
+    "janmbhoomi": "guj",
+    "kannada_prabha": "kan",
+    "mana_telangana": "tel",
+    "metro_vaartha": "mal",
+    "mumbaichoufer": "mar",
+    "namasthe_telangana": "tel",
+    "nav_gujarat_samay": "guj",
+    "nav_rashtra": "mar",
+    "nava_telangana": "tel",
+    "navakal": "mar",
+    "navbharat_times": "hin",
+    "navodaya_times": "hin",
+    "navshakti": "mar",
+    "niyomiya_barta": "asm",
+    "poknapham": "ben",
+    "pragativadi": "ori",
+    "prahar": "mar",
+    "prameya": "ori",
+    "pratahkal": "hin",
+    "punyanagari": "mar",
+    "rozana_spokesman": "pan",
+    "saamana": "mar",
+    "sakal": "mar",
+    "sakshi": "tel",
+    "samachar_jagat": "hin",
+    "samaja": "ori",
+    "sambad": "ori",
+    "sanaleibak": "ben",
+    "sangbad_pratidin": "ben",
+    "sanmarg": "hin",
+    "shah_times": "hin",
+    "suprabhatam": "mal",
+    "surya": "tel",
+    "suvarna_times_of_karnataka": "kan",
+    "vaartha": "tel",
+    "vartha_bharti": "kan",
+    "velugu": "tel",
+    "virat_vaibhav": "hin",
+    "vishwavani": "kan",
+    "western_times": "guj",
+}
+
+
+def paper_language(paper):
+    """Tesseract language string for a paper folder, e.g. "mar+eng"."""
+    slug = paper.strip().lower().replace(" ", "_").replace("-", "_")
+    lang = PAPER_LANGS.get(slug)
+    if lang is None:
+        # Folder names sometimes carry a suffix ("sakal_mumbai")
+        lang = next((code for name, code in PAPER_LANGS.items()
+                     if slug.startswith(name)), "eng")
+    return lang if lang == "eng" else f"{lang}+eng"
+
+
+def find_images(root, papers=None, extensions=IMAGE_EXTENSIONS):
+    """Yield ``(paper, edition, path)`` for every image under ``root``."""
+    wanted = {p.lower() for p in papers} if papers else None
+    for paper in sorted(os.listdir(root)):
+        paper_dir = os.path.join(root, paper)
+        if not os.path.isdir(paper_dir) or (wanted and paper.lower() not in wanted):
+            continue
+        for dirpath, dirnames, filenames in os.walk(paper_dir):
+            dirnames.sort()
+            relative = os.path.relpath(dirpath, paper_dir)
+            edition = "" if relative == "." else relative.split(os.sep)[0]
+            for name in sorted(filenames):
+                if name.lower().endswith(extensions):
+                    yield paper, edition, os.path.join(dirpath, name)
+
+
+def ocr_job(path, tess_lang, backend=None, paper=None, cache_path=None, layout=False,
+            two_pass=False, detect_lang=False):
+    """Worker: OCR one image; returns the text, timing and whether it was cached.
+
+    With ``detect_lang`` the language set is chosen for this image from
+    ``tess_lang`` first; ``lang`` is the one used.
+
+    With ``layout`` the page is segmented first and ``blocks`` holds the text
+    and bounding box of each block in reading order; ``bbox`` is
+    ``[x, y, width, height]`` in the source image's pixels. With ``two_pass``
+    ``stats`` says how much of the page needed the best-model pass.
+    """
+    started = time.perf_counter()
+    cache = OcrCache.shared(cache_path) if cache_path else None
+    hits = cache.hits if cache else 0
+    blocks = stats = None
+    if detect_lang:
+        tess_lang = detect_language(path, tess_lang, backend, for_paper(paper))
+    if layout:
+        # The process pool already uses every core: one block at a time
+        blocks = run_layout_ocr(path, tess_lang, backend=backend,
+                                preprocessor=for_paper(paper), cache=cache, workers=1)
+        text = blocks_text(blocks)
+    elif two_pass:
+        text, stats = run_two_pass_ocr(path, tess_lang, backend=backend,
+                                       preprocessor=for_paper(paper), cache=cache)
+    else:
+        text = clean_ocr_text(run_ocr_on_image(path, tess_lang, backend=backend,
+                                               preprocessor=for_paper(paper), cache=cache))
+    return {"text": text, "blocks": blocks, "stats": stats, "lang": tess_lang,
+            "seconds": time.perf_counter() - started,
+            "cached": bool(cache and cache.hits > hits)}
+
+
+def montage_job(paths, tess_lang, backend=None, paper=None, cache_path=None):
+    """Worker: OCR a batch of small clips together; returns one result per clip."""
+    started = time.perf_counter()
+    cache = OcrCache.shared(cache_path) if cache_path else None
+    hits = cache.hits if cache else 0
+    texts = run_montage_ocr(paths, tess_lang, backend=backend,
+                            preprocessor=for_paper(paper), cache=cache)
+    seconds = (time.perf_counter() - started) / len(paths)
+    # Hits are only counted per batch: an all-cached batch marks every clip
+    cached = bool(cache and cache.hits - hits == len(paths))
+    return [{"text": text, "blocks": None, "seconds": seconds, "cached": cached}
+            for text in texts]
+
+
+def pdf_job(path, tess_lang, backend=None, paper=None, cache_path=None):
+    """Worker: text of every page of a PDF; returns one result per page."""
+    cache = OcrCache.shared(cache_path) if cache_path else None
+    pages = ocr_pdf(path, tess_lang, backend=backend,
+                    preprocessor=for_paper(paper, source_dpi=OCR_DPI), cache=cache)
+    return [dict(page, blocks=None, cached=False) for page in pages]
+
+
+def is_edition_pdf(path, folder_files):
+    """True for a merged edition PDF whose page PDFs sit in the same folder.
+
+    Uses the merger's source list when there is one, else the naming the
+    scrapers use (``X_date.pdf`` next to ``X_date_3.pdf`` / ``X_date_page_3.pdf``).
+    """
+    sources_path = path + PDF_SOURCES_SUFFIX
+    if os.path.exists(sources_path):
+        try:
+            with open(sources_path, encoding="utf-8") as f:
+                sources = json.load(f).get("sources", [])
+        except ValueError:
+            sources = []
+        return any(os.path.exists(source) for source in sources)
+    stem = os.path.splitext(os.path.basename(path))[0].lower()
+    for name in folder_files:
+        match = PAGE_PDF.match(name)
+        if match and match.group("stem").lower() == stem:
+            return True
+    return False
+
+
+def drop_edition_pdfs(jobs):
+    """Jobs without merged edition PDFs whose pages are read on their own."""
+    listings = {}
+    kept, dropped = [], 0
+    for job in jobs:
+        path = job[2]
+        if path.lower().endswith(PDF_EXTENSIONS):
+            folder = os.path.dirname(path)
+            if folder not in listings:
+                listings[folder] = os.listdir(folder or ".")
+            if is_edition_pdf(path, listings[folder]):
+                dropped += 1
+                continue
+        kept.append(job)
+    if dropped:
+        print(f"📚 Skipping {dropped} merged edition PDFs; their page PDFs are read instead")
+    return kept
+
+
+def split_clips(jobs, batch_size=MAX_MONTAGE_CLIPS):
+    """Split jobs into (clip batches per paper, other jobs)."""
+    clips, singles = {}, []
+    for job in jobs:
+        try:
+            small = is_clip(job[2])
+        except Exception:
+            small = False
+        if small:
+            clips.setdefault((job[0], job[3]), []).append(job)
+        else:
+            singles.append(job)
+    batches = [group[i:i + batch_size] for group in clips.values()
+               for i in range(0, len(group), batch_size)]
+    return batches, singles
+
+
+def load_done(output_path):
+    """Paths already in an earlier (possibly interrupted) output file."""
+    done = set()
+    if os.path.exists(output_path):
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["path"])
+                except (ValueError, KeyError):
+                    continue
+    return done
+
+
+class Progress:
+    def __init__(self, total, every=25):
+        self.total = total
+        self.every = every
+        self.done = 0
+        self.failed = 0
+        self.cached = 0
+        self.chars = 0
+        self.started = time.perf_counter()
+
+    def update(self, chars, failed=False, cached=False):
+        self.done += 1
+        self.chars += chars
+        self.failed += failed
+        self.cached += cached
+        if self.done % self.every == 0 or self.done == self.total:
+            self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed else 0
+        eta = (self.total - self.done) / rate if rate else 0
+        print(f"🔠 {self.done}/{self.total} images, {rate:.2f} pages/s, "
+              f"{self.chars / elapsed if elapsed else 0:.0f} chars/s, "
+              f"{self.cached} from cache, {self.failed} failed, ETA {eta:.0f}s")
+
+
+def load_duplicates(path):
+    """``{absolute path: absolute path of the earlier image}`` from the pHash log."""
+    duplicates = {}
+    if not os.path.exists(path):
+        return duplicates
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("path") and entry.get("duplicate_path"):
+                duplicates[entry["path"]] = entry["duplicate_path"]
+    return duplicates
+
+
+def split_duplicates(jobs, duplicates, done):
+    """Split jobs into (jobs to OCR, ``{job: original path}`` to copy).
+
+    A duplicate is copied only when its original is OCRed in this run or
+    already is in the output file.
+    """
+    known = {os.path.abspath(path) for path in done}
+    copies = {}
+    for job in jobs:
+        original, seen = duplicates.get(os.path.abspath(job[2])), set()
+        while original in duplicates and original not in seen:  # chains of repeats
+            seen.add(original)
+            original = duplicates[original]
+        if original:
+            copies[job] = original
+    to_ocr = [job for job in jobs if job not in copies]
+    known |= {os.path.abspath(job[2]) for job in to_ocr}
+    copies = {job: original for job, original in copies.items() if original in known}
+    return [job for job in jobs if job not in copies], copies
+
+
+def load_texts(output_path, paths):
+    """Texts of ``paths`` (absolute) from an earlier output file."""
+    texts = {}
+    if paths and os.path.exists(output_path):
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                path = os.path.abspath(record.get("path", ""))
+                if path in paths and "page" not in record:
+                    texts[path] = record.get("text", "")
+    return texts
+
+
+def batch_ocr(root, output_path=None, papers=None, workers=None, backend=None,
+              cache_path=DEFAULT_CACHE, layout=False, montage=False, pdfs=False,
+              detect_lang=None, two_pass=False):
+    """OCR every image under ``root``; returns the output JSONL path.
+
+    ``detect_lang`` is "paper" (one cached language set per paper, see
+    LanguageProfiles) or "page" (chosen for every image separately).
+    """
+    if two_pass and models_error():
+        raise ValueError(models_error())
+    output_path = output_path or os.path.join(OUTPUT_DIR, f"ocr_{date.today().isoformat()}.jsonl")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    # One Tesseract thread per worker process; the pool provides the parallelism
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    done = load_done(output_path)
+    jobs = [(paper, edition, path, paper_language(paper))
+            for paper, edition, path in find_images(
+                root, papers, IMAGE_EXTENSIONS + PDF_EXTENSIONS if pdfs else IMAGE_EXTENSIONS)
+            if path not in done]
+    if pdfs:
+        jobs = drop_edition_pdfs(jobs)
+    print(f"📂 {len(jobs)} images to OCR under {root} ({len(done)} already done), "
+          f"{workers} workers")
+    if not jobs:
+        return output_path
+    if detect_lang == "paper":
+        profiles = LanguageProfiles()
+        langs = {}
+        for paper in sorted({job[0] for job in jobs}):
+            samples = [job[2] for job in jobs if job[0] == paper
+                       and not job[2].lower().endswith(PDF_EXTENSIONS)][:2 * PROFILE_SAMPLES]
+            langs[paper] = profiles.resolve(paper, samples, paper_language(paper),
+                                            backend, for_paper(paper))
+            print(f"🔤 {paper}: {langs[paper]}")
+        profiles.save()
+        jobs = [(paper, edition, path, langs[paper]) for paper, edition, path, _ in jobs]
+    jobs, copies = split_duplicates(jobs, load_duplicates(os.path.join(root, DUPLICATES_FILE)),
+                                    done)
+    originals = set(copies.values())
+    texts = load_texts(output_path, originals)
+    if copies:
+        print(f"♻️ {len(copies)} duplicate pages reuse the text of an earlier image")
+    if cache_path:
+        cache = OcrCache(cache_path)
+        removed = cache.evict()
+        if removed:
+            print(f"🗃️ Evicted {removed} old OCR cache entries")
+        cache.close()
+
+    progress = Progress(len(jobs) + len(copies))
+    sources = {"text": 0, "ocr": 0}
+    retried = {"lines": 0, "retried": 0, "area": 0.0, "pages": 0}
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        documents = [job for job in jobs if job[2].lower().endswith(PDF_EXTENSIONS)]
+        images = [job for job in jobs if not job[2].lower().endswith(PDF_EXTENSIONS)]
+        batches, singles = split_clips(images) if montage else ([], images)
+        if batches:
+            print(f"🧩 {sum(map(len, batches))} clips in {len(batches)} montage batches")
+        futures = {executor.submit(montage_job, [job[2] for job in batch], batch[0][3],
+                                   backend, batch[0][0], cache_path): batch
+                   for batch in batches}
+        futures.update({executor.submit(ocr_job, path, lang, backend, paper, cache_path, layout, two_pass,
+                                        detect_lang == "page"): [(paper, edition, path, lang)]
+                        for paper, edition, path, lang in singles})
+        futures.update({executor.submit(pdf_job, path, lang, backend, paper, cache_path): [(paper, edition, path, lang)]
+                        for paper, edition, path, lang in documents})
+        for future in as_completed(futures):
+            entries = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                for entry in entries:
+                    print(f"[ERROR] OCR failed for {entry[2]}: {e}")
+                    progress.update(0, failed=True)
+                continue
+            if isinstance(results, dict):
+                results = [results]
+            if not results:  # a PDF that could not be read
+                progress.update(0, failed=True)
+                continue
+            if len(entries) == 1 and len(results) != 1:
+                # A PDF: one result per page; count pages from here on
+                progress.total += len(results) - 1
+                entries = entries * len(results)
+            for (paper, edition, path, lang), result in zip(entries, results):
+                record = {"paper": paper, "edition": edition, "path": path,
+                          "lang": result.get("lang", lang), "chars": len(result["text"]),
+                          "seconds": round(result["seconds"], 3), "text": result["text"]}
+                if "page" in result:
+                    record.update(page=result["page"], source=result["source"],
+                                  reason=result["reason"])
+                    sources[result["source"]] += 1
+                if result["blocks"] is not None:
+                    record["blocks"] = result["blocks"]
+                if result.get("stats"):
+                    record["two_pass"] = result["stats"]
+                    retried["lines"] += result["stats"]["lines"]
+                    retried["retried"] += result["stats"]["retried"]
+                    retried["area"] += result["stats"]["area_share"]
+                    retried["pages"] += 1
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                progress.update(len(result["text"]), failed=not result["text"],
+                                cached=result["cached"])
+                if os.path.abspath(path) in originals and "page" not in result:
+                    texts[os.path.abspath(path)] = result["text"]
+            out.flush()
+        for (paper, edition, path, lang), original in copies.items():
+            text = texts.get(original, "")
+            record = {"paper": paper, "edition": edition, "path": path, "lang": lang,
+                      "chars": len(text), "seconds": 0.0, "text": text,
+                      "duplicate_of": original}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            progress.update(len(text), failed=not text, cached=True)
+        out.flush()
+    progress.report()
+    if any(sources.values()):
+        print(f"📄 {sources['text']} PDF pages read from the text layer, "
+              f"{sources['ocr']} rasterised and OCRed")
+    if retried["pages"]:
+        print(f"🔁 Best-model pass: {retried['retried']}/{retried['lines']} lines, "
+              f"{retried['area'] / retried['pages']:.0%} of the text area per page on average")
+    if cache_path:
+        cache = OcrCache(cache_path)
+        lookups = progress.total - progress.failed - sources["text"]
+        print(f"🗃️ {progress.cached}/{lookups} images served from the OCR cache")
+        cache.report()
+        cache.close()
+    print(f"✅ OCR results written to {output_path}")
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR a downloads/<paper>/<edition>/ tree")
+    parser.add_argument("root", nargs="?", default="../downloads")
+    parser.add_argument("--papers", nargs="*", help="paper folders to include (default: all)")
+    parser.add_argument("--output", help="JSONL output path")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--backend", choices=["auto", *BACKENDS], help="OCR engine")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="OCR cache database")
+    parser.add_argument("--no-cache", action="store_true", help="always run OCR")
+    parser.add_argument("--layout", action="store_true",
+                        help="segment pages into blocks and keep per-block text")
+    parser.add_argument("--montage", action="store_true",
+                        help="OCR small clips in batches packed into montages")
+    parser.add_argument("--pdf", action="store_true",
+                        help="also read PDFs, using their text layer where usable")
+    parser.add_argument("--detect-lang", nargs="?", const="paper", choices=["paper", "page"],
+                        help="pick the smallest language set per paper from sample pages "
+                             "(default), or for every page")
+    parser.add_argument("--two-pass", action="store_true",
+                        help="fast models first, best models only for low-confidence lines")
+    args = parser.parse_args()
+    if args.two_pass and models_error():
+        parser.error(models_error())
+    batch_ocr(args.root, args.output, args.papers, args.workers, args.backend,
+              None if args.no_cache else args.cache, args.layout, args.montage, args.pdf,
+              args.detect_lang, args.two_pass)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark montage batching against one OCR call per clip.
+
+    python benchmark_montage.py --backend pytesseract
+    python benchmark_montage.py clips/*.jpg --lang tel+eng
+
+Without clip images the sample pages in this folder are segmented with
+layout.segment and their blocks are used as clips. Both modes OCR the same
+preprocessed clips; the report gives clips/s for each and how closely the
+montage text matches the per-clip text.
+"""
+import argparse
+import difflib
+import statistics
+import time
+
+from PIL import Image
+
+from benchmark_ocr import SAMPLES, sample_lang
+from layout import segment
+from montage import MARGIN, MAX_MONTAGE_CLIPS, build_montages, ocr_montage
+from ocr import BACKENDS, CUSTOM_CONFIG, DEFAULT_PREPROCESSOR, clean_ocr_text, get_backend
+
+
+def sample_clips(limit):
+    """Blocks of the sample pages as ``(lang, clip)`` pairs."""
+    clips = []
+    for path in SAMPLES:
+        with Image.open(path) as image:
+            page = DEFAULT_PREPROCESSOR(image)
+        for block in segment(page):
+            clips.append((sample_lang(path), page.crop((block.x, block.y, block.x + block.width,
+                                                         block.y + block.height))))
+    return clips[:limit]
+
+
+def load_clips(paths, lang):
+    clips = []
+    for path in paths:
+        with Image.open(path) as image:
+            clips.append((lang, DEFAULT_PREPROCESSOR(image)))
+    return clips
+
+
+def per_clip(clips, backend):
+    return [clean_ocr_text(get_backend(backend).recognize(clip, lang, CUSTOM_CONFIG))
+            for lang, clip in clips]
+
+
+def batched(clips, backend, max_clips, margin):
+    texts = []
+    # A montage holds one language, so group runs of clips by language
+    start = 0
+    while start < len(clips):
+        lang = clips[start][0]
+        end = start
+        while end < len(clips) and clips[end][0] == lang:
+            end += 1
+        group = [clip for _, clip in clips[start:end]]
+        for montage, boxes in build_montages(group, margin, max_clips=max_clips):
+            texts += [clean_ocr_text(text)
+                      for text in ocr_montage(montage, boxes, lang, CUSTOM_CONFIG, backend)]
+        start = end
+    return texts
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark montage batching of clips")
+    parser.add_argument("clips", nargs="*", help="clip images (default: blocks of the samples)")
+    parser.add_argument("--lang", default="eng", help="Tesseract language of the clip images")
+    parser.add_argument("--backend", choices=["auto", *BACKENDS], default="auto")
+    parser.add_argument("--limit", type=int, default=60, help="clips cut from the samples")
+    parser.add_argument("--max-clips", type=int, default=MAX_MONTAGE_CLIPS)
+    parser.add_argument("--margin", type=int, default=MARGIN)
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips, args.lang) if args.clips else sample_clips(args.limit)
+    if not clips:
+        print("No clips to benchmark")
+        return
+    print(f"{len(clips)} clips, backend {get_backend(args.backend).name}")
+    # Warm up the engine so neither mode pays the first traineddata load
+    per_clip(clips[:1], args.backend)
+
+    single, single_time = timed(per_clip, clips, args.backend)
+    montage, montage_time = timed(batched, clips, args.backend, args.max_clips, args.margin)
+    print(f"one call per clip: {single_time:7.2f}s, {len(clips) / single_time:6.2f} clips/s")
+    print(f"montage batches:   {montage_time:7.2f}s, {len(clips) / montage_time:6.2f} clips/s "
+          f"({single_time / montage_time:.1f}x)")
+
+    ratios = [difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(single, montage)]
+    print(f"text agreement: mean {statistics.mean(ratios):.3f}, "
+          f"min {min(ratios):.3f}, {sum(r == 1 for r in ratios)}/{len(ratios)} identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare OCR backends on the sample images in this folder.
+
+    python benchmark_ocr.py --repeat 5
+
+Each sample is OCRed ``repeat`` times per backend; the first call includes
+engine start-up (for tesserocr, loading the traineddata once), later calls
+show the steady-state cost per image.
+"""
+import argparse
+import glob
+import os
+import time
+
+from PIL import Image
+
+from ocr import BACKENDS, CUSTOM_CONFIG, clean_ocr_text, tesserocr
+
+SAMPLES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*_img.*")))
+
+
+def sample_lang(path):
+    """``guj_Gujr_img.jpg`` -> ``guj+eng``, as in tesseract_ollama's __main__."""
+    return f"{os.path.basename(path).split('_')[0]}+eng"
+
+
+def load_sample(path):
+    with Image.open(path) as image:
+        return image.convert("L").point(lambda x: 0 if x < 180 else 255, '1')
+
+
+def benchmark(name, samples, repeat):
+    backend = BACKENDS[name]()
+    results = {}
+    try:
+        for path, image in samples:
+            lang = sample_lang(path)
+            timings = []
+            text = ""
+            for _ in range(repeat):
+                started = time.perf_counter()
+                text = backend.recognize(image, lang, CUSTOM_CONFIG)
+                timings.append(time.perf_counter() - started)
+            results[path] = (timings, clean_ocr_text(text))
+    finally:
+        backend.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR backends")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("images", nargs="*", default=SAMPLES)
+    args = parser.parse_args()
+
+    samples = [(path, load_sample(path)) for path in args.images]
+    names = [name for name in BACKENDS if name != "tesserocr" or tesserocr is not None]
+    if tesserocr is None:
+        print("tesserocr is not installed; benchmarking pytesseract only")
+
+    texts = {}
+    for name in names:
+        results = benchmark(name, samples, args.repeat)
+        print(f"\n=== {name} ===")
+        total = 0.0
+        for path, (timings, text) in results.items():
+            steady = timings[1:] or timings
+            total += sum(timings)
+            print(f"{os.path.basename(path):22} first {timings[0] * 1000:7.0f} ms, "
+                  f"then {sum(steady) / len(steady) * 1000:7.0f} ms/image, {len(text)} chars")
+            texts.setdefault(path, {})[name] = text
+        calls = len(samples) * args.repeat
+        print(f"{calls} calls in {total:.2f}s: {calls / total:.2f} images/s")
+
+    if len(names) > 1:
+        print("\nOutput agreement:")
+        for path, by_backend in texts.items():
+            same = len(set(by_backend.values())) == 1
+            print(f"  {os.path.basename(path)}: {'identical' if same else 'differs'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark preprocessing configurations on the sample images in this folder.
+
+    python benchmark_preprocess.py --repeat 3 --ocr
+
+Reports time per page (and per step) for each configuration. With ``--ocr``
+each result is also OCRed and the mean Tesseract word confidence and the
+number of recognised words are printed, to track quality alongside speed.
+"""
+import argparse
+import os
+import statistics
+import time
+
+import pytesseract
+from PIL import Image
+
+from benchmark_ocr import SAMPLES, sample_lang
+from ocr import CUSTOM_CONFIG
+from preprocess import TUNED, Preprocessor
+
+CONFIGS = {
+    "legacy": None,  # the old fixed threshold through a per-pixel lambda
+    "fixed": Preprocessor(),  # the default: same output as legacy
+    "otsu": Preprocessor(**TUNED),
+    "sauvola": Preprocessor(**dict(TUNED, threshold="sauvola")),
+}
+
+
+def legacy(image):
+    return image.convert("L").point(lambda x: 0 if x < 180 else 255, '1')
+
+
+def ocr_quality(page, lang):
+    data = pytesseract.image_to_data(page, lang=lang, config=CUSTOM_CONFIG,
+                                     output_type=pytesseract.Output.DICT)
+    confidences = [float(c) for c, word in zip(data["conf"], data["text"])
+                   if word.strip() and float(c) >= 0]
+    return (statistics.mean(confidences) if confidences else 0.0), len(confidences)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR preprocessing")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ocr", action="store_true", help="also measure OCR confidence")
+    parser.add_argument("images", nargs="*", default=SAMPLES)
+    args = parser.parse_args()
+
+    for path in args.images:
+        with Image.open(path) as source:
+            source.load()
+        megapixels = source.width * source.height / 1e6
+        print(f"\n=== {os.path.basename(path)} ({source.width}x{source.height}) ===")
+        for name, preprocessor in CONFIGS.items():
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                page = legacy(source) if preprocessor is None else preprocessor(source)
+                timings.append(time.perf_counter() - started)
+            seconds = statistics.median(timings)
+            line = (f"{name:8} {seconds * 1000:7.0f} ms/page, "
+                    f"{megapixels / seconds:6.1f} Mpx/s")
+            if preprocessor is not None:
+                steps = ", ".join(f"{step} {value * 1000:.0f}"
+                                  for step, value in preprocessor.last_timings.items()
+                                  if step != "total")
+                line += f"  [{steps} ms]"
+            if args.ocr:
+                confidence, words = ocr_quality(page, sample_lang(path))
+                line += f"  conf {confidence:5.1f}, {words} words"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
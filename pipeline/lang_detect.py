@@ -0,0 +1,168 @@
+"""
+Smallest Tesseract language set for a page.
+
+Every page used to be read with "<paper language>+eng", and recognition with
+two models is noticeably slower than with one. ``choose_languages`` looks at
+a cheap sample of the preprocessed page first: Tesseract's OSD names the
+dominant script (catching images filed under the wrong paper), then a quick
+first pass over the sample with the candidate languages is classified by
+Unicode block, and only languages whose script makes up a real share of the
+letters are kept. ``detect_language`` makes that choice for one image.
+``LanguageProfiles`` caches a per-paper choice so the detection runs on a
+few pages of a paper rather than on every page. Votes expire after
+``PROFILE_MAX_AGE``, so every paper is re-checked regularly, and a
+paper-wide choice never drops English: a few centre crops without English
+say little about the adverts and mastheads of every other page.
+"""
+import json
+import os
+import time
+from collections import Counter
+from io import BytesIO
+
+from PIL import Image
+
+from ocr import CUSTOM_CONFIG, DEFAULT_PREPROCESSOR, get_backend
+from scripts import LANG_SCRIPTS, SCRIPT_LANGS, script_counts
+
+DEFAULT_PROFILES = os.path.join("output", "lang_profiles.json")
+# Longest side, in pixels, of the centre crop used for detection
+SAMPLE_SIZE = 1200
+# A language is kept when its script has at least this share of the letters
+MIN_SCRIPT_SHARE = 0.08
+# OSD script confidence below which OSD is ignored
+MIN_OSD_CONF = 2.0
+# Fresh detections per paper before its profile is trusted
+PROFILE_SAMPLES = 3
+# Votes older than this (seconds) no longer count: the paper is re-checked
+PROFILE_MAX_AGE = 14 * 24 * 3600
+# Only the latest votes count, so a changed paper wins a new majority
+PROFILE_VOTES = 3 * PROFILE_SAMPLES
+
+
+def sample_region(page, size=SAMPLE_SIZE):
+    """Centre crop of at most ``size`` x ``size``; body text, not mastheads."""
+    width, height = page.size
+    w, h = min(width, size), min(height, size)
+    left, top = (width - w) // 2, (height - h) // 2
+    return page.crop((left, top, left + w, top + h))
+
+
+def osd_script(page, backend=None):
+    """``(script, confidence)`` from Tesseract OSD, ``(None, 0.0)`` if unavailable."""
+    try:
+        osd = get_backend(backend).detect_script(page)
+    except Exception:  # no osd.traineddata, or too little text
+        return None, 0.0
+    return osd["script"], osd["script_conf"]
+
+
+def choose_languages(page, candidates, backend=None, custom_config=CUSTOM_CONFIG):
+    """Smallest language string for a preprocessed page, e.g. "mar" or "mar+eng".
+
+    ``candidates`` is the paper's language string; it is returned unchanged
+    when the sample holds no recognisable text.
+    """
+    langs = candidates.split("+")
+    primary = [lang for lang in langs if lang != "eng"] or ["eng"]
+    sample = sample_region(page)
+
+    script, confidence = osd_script(sample, backend)
+    if script and confidence >= MIN_OSD_CONF:
+        own = [lang for lang in langs if LANG_SCRIPTS.get(lang) == script]
+        if own:
+            primary = own
+        elif script in SCRIPT_LANGS:
+            primary = [SCRIPT_LANGS[script]]
+
+    first_pass = list(dict.fromkeys(primary + ["eng"]))
+    text = get_backend(backend).recognize(sample, "+".join(first_pass), custom_config)
+    counts = script_counts(text)
+    counts.pop("Private", None)
+    letters = sum(counts.values())
+    if not letters:
+        return candidates
+    chosen = [lang for lang in first_pass
+              if counts[LANG_SCRIPTS.get(lang)] / letters >= MIN_SCRIPT_SHARE]
+    return "+".join(chosen) if chosen else candidates
+
+
+def detect_language(image_path, candidates, backend=None, preprocessor=None):
+    """``choose_languages`` for an image file (candidates on error)."""
+    preprocessor = preprocessor or DEFAULT_PREPROCESSOR
+    try:
+        with open(image_path, "rb") as f:
+            data = f.read()
+        with Image.open(BytesIO(data)) as image:
+            page = preprocessor(image)
+        return choose_languages(page, candidates, backend)
+    except Exception as e:
+        print(f"\n[ERROR] Could not detect the language of {image_path}: {e}")
+        return candidates
+
+
+def keep_english(lang, candidates):
+    """``lang`` with "eng" added back when the candidates had it."""
+    langs = lang.split("+")
+    if "eng" in candidates.split("+") and "eng" not in langs:
+        langs.append("eng")
+    return "+".join(langs)
+
+
+class LanguageProfiles:
+    """Per-paper language choices, saved as JSON between runs.
+
+    Each paper keeps its latest ``max_votes`` detections with their time;
+    votes older than ``max_age`` seconds are dropped, after which the
+    paper is detected again.
+    """
+
+    def __init__(self, path=DEFAULT_PROFILES, samples=PROFILE_SAMPLES,
+                 max_age=PROFILE_MAX_AGE, max_votes=PROFILE_VOTES):
+        self.path = path
+        self.samples = samples
+        self.max_age = max_age
+        self.max_votes = max_votes
+        self.profiles = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.profiles = json.load(f)
+
+    def _votes(self, paper):
+        """Fresh ``(lang, time)`` votes of a paper, oldest first."""
+        votes = self.profiles.get(paper, {}).get("votes", [])
+        if not isinstance(votes, list):  # old format: counts without times
+            return []
+        cutoff = time.time() - self.max_age
+        return [vote for vote in votes if vote["at"] >= cutoff][-self.max_votes:]
+
+    def get(self, paper):
+        """The paper's language once ``samples`` fresh votes exist, else None."""
+        votes = self._votes(paper)
+        if len(votes) < self.samples:
+            return None
+        return Counter(vote["lang"] for vote in votes).most_common(1)[0][0]
+
+    def record(self, paper, lang):
+        votes = self._votes(paper) + [{"lang": lang, "at": time.time()}]
+        self.profiles[paper] = {"votes": votes[-self.max_votes:]}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.profiles, f, ensure_ascii=False, indent=2)
+
+    def resolve(self, paper, image_paths, candidates, backend=None, preprocessor=None):
+        """The paper's profile language, detecting on ``image_paths`` as needed.
+
+        English is kept whenever ``candidates`` includes it.
+        """
+        lang = self.get(paper)
+        if lang is None:
+            for path in image_paths:
+                self.record(paper, detect_language(path, candidates, backend, preprocessor))
+                if self.get(paper) is not None:
+                    break
+            votes = Counter(vote["lang"] for vote in self._votes(paper))
+            lang = votes.most_common(1)[0][0] if votes else candidates
+        return keep_english(lang, candidates)
@@ -0,0 +1,377 @@
+"""
+Layout segmentation for multi-column newspaper pages.
+
+Handing a whole broadsheet to Tesseract as one column is slow and interleaves
+neighbouring columns. ``segment`` splits the binarised page into text blocks
+with a recursive XY-cut over NumPy projection profiles: at each level the
+region is trimmed to its ink, cut across at blank horizontal bands (article
+and paragraph breaks), or else down at blank or ruled gutters (columns).
+Regions with no straight gutter (a headline over two of three columns) are
+split into connected components instead, ordered column-wise. The
+recursion order is the reading order. ``ocr_blocks`` then OCRs the
+blocks concurrently and returns per-block text with bounding boxes.
+``run_layout_ocr`` maps those boxes back through the preprocessing (DPI
+resample, deskew) so they are in the source image's pixel coordinates.
+"""
+import json
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from ocr import CUSTOM_CONFIG, DEFAULT_PREPROCESSOR, clean_ocr_text, get_backend
+from ocr_cache import cache_key
+from preprocess import source_box
+
+# Bump when segmentation or the cached block format changes
+LAYOUT_VERSION = 2
+
+Block = namedtuple("Block", "x y width height")
+
+# Gaps and sizes as fractions of the page width, so they hold at any DPI,
+# with pixel floors (at ~300 DPI) so word and line spacing never qualify
+MIN_COLUMN_GAP = 0.005, 24
+MIN_ROW_GAP = 0.008, 30
+MIN_BLOCK = 0.005, 16
+# Blocks thinner than MIN_BLOCK this close to the page edge are scan borders
+EDGE_ZONE = 0.02, 48
+# Narrower images are clips: one block, no segmentation
+MIN_LAYOUT_WIDTH = 1200
+# A line of the profile this full of ink is a printed rule, i.e. a separator
+RULE_FILL = 0.85
+MAX_DEPTH = 12
+# Straight ink runs longer than this fraction of the page are rules or scan
+# borders; they are left out of the profiles so they do not bridge gutters
+MIN_LINE = 0.1
+
+
+def _runs(mask):
+    """``(starts, ends)`` of the True runs in a 1-D bool array."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return edges[::2], edges[1::2]
+
+
+def _gaps(profile, extent, min_gap):
+    """``(start, end)`` of interior blank runs at least ``min_gap`` long."""
+    noise = 2 + extent // 500
+    blank = profile <= noise
+    if extent >= 10 * min_gap:  # shorter lines are glyph strokes, not rules
+        # Thin, nearly solid lines are printed rules: treat them as gutter
+        starts, ends = _runs(profile >= RULE_FILL * extent)
+        for start, end in zip(starts, ends):
+            if end - start <= max(2, min_gap // 4):
+                blank[start:end] = True
+    starts, ends = _runs(blank)
+    keep = (ends - starts >= min_gap) & (starts > 0) & (ends < len(profile))
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+
+def _long_runs(ink, length, axis):
+    """Pixels on a straight run of at least ``length`` ink pixels along ``axis``."""
+    ink = np.moveaxis(ink, axis, 0)
+    counts = np.cumsum(ink, axis=0, dtype=np.int32)
+    counts = np.concatenate([np.zeros_like(counts[:1]), counts])
+    full = (counts[length:] - counts[:-length]) == length  # windows of pure ink
+    starts = np.cumsum(np.concatenate([np.zeros_like(full[:1], dtype=np.int32),
+                                       full.astype(np.int32)]), axis=0)
+    # pixel i lies in a full window starting anywhere in [i - length + 1, i]
+    index = np.arange(ink.shape[0])
+    hi = np.minimum(index + 1, full.shape[0])
+    lo = np.clip(index - length + 1, 0, full.shape[0])
+    covered = (starts[hi] - starts[lo]) > 0
+    return np.moveaxis(covered, 0, axis)
+
+
+def _spread(mask, reach, axis):
+    """``mask`` dilated by ``reach`` pixels both ways along ``axis``."""
+    spread = mask.copy()
+    for shift in range(1, reach + 1):
+        for step in (shift, -shift):
+            spread |= np.roll(mask, step, axis=axis)
+    return spread
+
+
+def strip_lines(ink, wobble=2):
+    """Ink mask without long horizontal and vertical lines.
+
+    Scanned rules and page borders are rarely perfectly straight, so lines
+    may drift up to ``wobble`` pixels sideways.
+    """
+    height, width = ink.shape
+    lines = np.zeros_like(ink)
+    for axis, extent in ((1, width), (0, height)):
+        length = max(100, round(MIN_LINE * extent))
+        if ink.shape[axis] > length:
+            across = 1 - axis
+            runs = _long_runs(_spread(ink, wobble, across), length, axis)
+            lines |= _spread(runs, wobble, across)
+    return ink & ~lines
+
+
+def _close(mask, gap, axis):
+    """Fill blank runs of fewer than ``gap`` cells between ink along ``axis``."""
+    mask = np.moveaxis(mask, axis, -1)
+    n = mask.shape[-1]
+    index = np.arange(n)
+    before = np.maximum.accumulate(np.where(mask, index, -1), axis=-1)
+    after = np.flip(np.minimum.accumulate(np.flip(np.where(mask, index, n), -1), axis=-1), -1)
+    filled = mask | ((before >= 0) & (after < n) & (after - before <= gap))
+    return np.moveaxis(filled, -1, axis)
+
+
+def _label(mask):
+    """4-connected component labels (0 = background) of a small bool grid."""
+    height, width = mask.shape
+    background = height * width + 1
+    labels = np.where(mask, np.arange(1, height * width + 1).reshape(mask.shape), background)
+    while True:
+        spread = labels.copy()
+        spread[1:] = np.minimum(spread[1:], labels[:-1])
+        spread[:-1] = np.minimum(spread[:-1], labels[1:])
+        spread[:, 1:] = np.minimum(spread[:, 1:], labels[:, :-1])
+        spread[:, :-1] = np.minimum(spread[:, :-1], labels[:, 1:])
+        spread = np.where(mask, spread, background)
+        # Jump to the label of the cell a label points at (same component)
+        flat = np.append(spread.ravel(), background)
+        spread = np.where(mask, flat[np.minimum(spread, background) - 1], background)
+        if np.array_equal(spread, labels):
+            return np.where(mask, labels, 0)
+        labels = spread
+
+
+def _components(ink, sizes):
+    """Split a region that has no straight gutter into connected blocks.
+
+    Ink is pooled into cells, gaps narrower than the row/column gaps are
+    closed and the cells labelled; returns ``(x0, y0, x1, y1, mask)`` per
+    component, with ``mask`` the region's ink belonging to it.
+    """
+    row_gap, column_gap, _ = sizes
+    cell = max(2, column_gap // 3)
+    height, width = ink.shape
+    rows, cols = -(-height // cell), -(-width // cell)
+    padded = np.zeros((rows * cell, cols * cell), dtype=bool)
+    padded[:height, :width] = ink
+    grid = padded.reshape(rows, cell, cols, cell).any(axis=(1, 3))
+    grid = _close(grid, column_gap // cell, axis=1)
+    grid = _close(grid, row_gap // cell, axis=0)
+    labels = _label(grid)
+
+    # Cell boxes per label; words of a large headline are further apart than
+    # a column gap, so boxes on the same line closer than their height merge
+    found = np.unique(labels[labels > 0])
+    boxes = {}
+    for label in found:
+        ys, xs = np.nonzero(labels == label)
+        boxes[label] = [ys.min(), ys.max() + 1, xs.min(), xs.max() + 1]
+    parent = {label: label for label in found}
+    line_cells = 8 * row_gap // cell  # taller than this is a column, not a line
+
+    def root(label):
+        while parent[label] != label:
+            label = parent[label]
+        return label
+
+    merged = True
+    while merged:
+        merged = False
+        for a in found:
+            for b in found:
+                ra, rb = root(a), root(b)
+                if ra == rb:
+                    continue
+                ar0, ar1, ac0, ac1 = boxes[ra]
+                br0, br1, bc0, bc1 = boxes[rb]
+                overlap = min(ar1, br1) - max(ar0, br0)
+                shorter = min(ar1 - ar0, br1 - br0)
+                gap = max(ac0, bc0) - min(ac1, bc1)
+                taller = max(ar1 - ar0, br1 - br0)
+                if (taller <= line_cells and taller < 1.5 * shorter
+                        and overlap >= 0.6 * shorter and gap < shorter * 0.8):
+                    parent[rb] = ra
+                    boxes[ra] = [min(ar0, br0), max(ar1, br1), min(ac0, bc0), max(ac1, bc1)]
+                    merged = True
+
+    groups = {}
+    for label in found:
+        groups.setdefault(root(label), []).append(label)
+    components = []
+    for group_root, members in groups.items():
+        r0, r1, c0, c1 = boxes[group_root]
+        own = np.isin(labels[r0:r1, c0:c1], members).repeat(cell, 0).repeat(cell, 1)
+        y0, y1 = r0 * cell, min(height, r1 * cell)
+        x0, x1 = c0 * cell, min(width, c1 * cell)
+        components.append((int(x0), int(y0), int(x1), int(y1),
+                           ink[y0:y1, x0:x1] & own[:y1 - y0, :x1 - x0]))
+    return components
+
+
+def reading_order(boxes):
+    """Indices of ``(x0, y0, x1, y1, ...)`` boxes in reading order.
+
+    A box comes before another that it sits above (sharing columns) or to
+    the left of (sharing rows); otherwise the higher box goes first.
+    """
+    count = len(boxes)
+    after = [set() for _ in range(count)]
+    waiting = [0] * count
+    for a in range(count):
+        ax0, ay0, ax1, ay1 = boxes[a][:4]
+        for b in range(count):
+            if a == b:
+                continue
+            bx0, by0, bx1, by1 = boxes[b][:4]
+            share_x = min(ax1, bx1) > max(ax0, bx0)
+            share_y = min(ay1, by1) > max(ay0, by0)
+            if (share_x and ay1 <= by0) or (share_y and ax1 <= bx0):
+                after[a].add(b)
+                waiting[b] += 1
+    order, done = [], set()
+    while len(order) < count:
+        ready = [i for i in range(count) if i not in done and waiting[i] == 0]
+        if not ready:  # overlapping boxes can form a cycle: break it
+            ready = [i for i in range(count) if i not in done]
+        pick = min(ready, key=lambda i: (boxes[i][1], boxes[i][0]))
+        order.append(pick)
+        done.add(pick)
+        for b in after[pick]:
+            waiting[b] -= 1
+    return order
+
+
+def _cut(ink, x0, y0, sizes, blocks, depth):
+    rows = np.flatnonzero(ink.any(axis=1))
+    if not len(rows):
+        return
+    cols = np.flatnonzero(ink.any(axis=0))
+    ink = ink[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+    x0, y0 = x0 + int(cols[0]), y0 + int(rows[0])
+    height, width = ink.shape
+    row_gap, column_gap, min_block = sizes
+
+    if depth < MAX_DEPTH:
+        # axis 1: one sum per row -> horizontal cuts; axis 0: vertical cuts
+        # A region no taller than a few lines is a line of (maybe large) type:
+        # only a gap wider than half its height separates columns there
+        if height <= 8 * row_gap:
+            column_gap = max(column_gap, height // 2)
+        for axis, min_gap in ((1, row_gap), (0, column_gap)):
+            gaps = _gaps(ink.sum(axis=axis), ink.shape[axis], min_gap)
+            if not gaps:
+                continue
+            bounds = [0] + [edge for gap in gaps for edge in gap] + [ink.shape[1 - axis]]
+            for start, end in zip(bounds[::2], bounds[1::2]):
+                if axis == 1:
+                    _cut(ink[start:end], x0, y0 + start, sizes, blocks, depth + 1)
+                else:
+                    _cut(ink[:, start:end], x0 + start, y0, sizes, blocks, depth + 1)
+            return
+
+        components = _components(ink, sizes)
+        if len(components) > 1:
+            for index in reading_order(components):
+                cx0, cy0, _, _, own = components[index]
+                _cut(own, x0 + cx0, y0 + cy0, sizes, blocks, depth + 1)
+            return
+
+    # Drop specks and slivers left over from scan borders
+    if max(width, height) >= min_block and min(width, height) >= min_block // 2:
+        blocks.append(Block(x0, y0, width, height))
+
+
+def segment(page):
+    """Text blocks of a binarised page (ink = 0) in reading order."""
+    ink = strip_lines(np.asarray(page.convert("L")) < 128)
+    page_width = ink.shape[1]
+    sizes = tuple(max(floor, round(fraction * page_width))
+                  for fraction, floor in (MIN_ROW_GAP, MIN_COLUMN_GAP, MIN_BLOCK))
+    blocks = []
+    _cut(ink, 0, 0, sizes, blocks, 0 if page_width >= MIN_LAYOUT_WIDTH else MAX_DEPTH)
+    zone = max(EDGE_ZONE[1], round(EDGE_ZONE[0] * page_width))
+    return [block for block in blocks
+            if not _edge_sliver(block, ink.shape, sizes[2], zone)]
+
+
+def _edge_sliver(block, shape, min_block, zone):
+    """True for a thin block within ``zone`` pixels of the page edge."""
+    if min(block.width, block.height) >= min_block:
+        return False
+    height, width = shape
+    return (block.x < zone or block.y < zone
+            or width - (block.x + block.width) < zone
+            or height - (block.y + block.height) < zone)
+
+
+# Long-lived block pools, one per size: get_backend keeps one engine per
+# thread, so reusing the threads keeps the engines loaded across pages
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _block_pool(workers):
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ThreadPoolExecutor(max_workers=workers,
+                                                 thread_name_prefix="ocr-blocks")
+        return _pools[workers]
+
+
+def ocr_blocks(page, blocks, tess_lang, custom_config=CUSTOM_CONFIG, backend=None,
+               workers=4, margin=8):
+    """OCR ``blocks`` of ``page`` concurrently; returns dicts in reading order.
+
+    ``bbox`` is ``[x, y, width, height]`` on ``page`` itself. With
+    ``workers == 1`` the blocks are read inline on the calling thread.
+    """
+    def recognize(block):
+        box = (max(0, block.x - margin), max(0, block.y - margin),
+               min(page.width, block.x + block.width + margin),
+               min(page.height, block.y + block.height + margin))
+        return get_backend(backend).recognize(page.crop(box), tess_lang, custom_config)
+
+    if workers <= 1:
+        texts = [recognize(block) for block in blocks]
+    else:
+        texts = list(_block_pool(workers).map(recognize, blocks))
+    return [{"order": index, "bbox": list(block), "text": clean_ocr_text(text)}
+            for index, (block, text) in enumerate(zip(blocks, texts))
+            if text.strip()]
+
+
+def run_layout_ocr(image_path, tess_lang, custom_config=CUSTOM_CONFIG, backend=None,
+                   preprocessor=None, cache=None, workers=4):
+    """Segment and OCR one image; returns the per-block list (empty on error).
+
+    ``bbox`` is in the source image's pixels: the enclosing upright box when
+    the page was deskewed.
+    """
+    preprocessor = preprocessor or DEFAULT_PREPROCESSOR
+    try:
+        with open(image_path, "rb") as f:
+            data = f.read()
+        key = None
+        if cache is not None:
+            key = cache_key(data, tess_lang, custom_config,
+                            f"{preprocessor.key()}:layout-v{LAYOUT_VERSION}")
+            cached = cache.get(key)
+            if cached is not None:
+                return json.loads(cached)
+        with Image.open(BytesIO(data)) as image:
+            page, transform = preprocessor.process(image)
+        blocks = ocr_blocks(page, segment(page), tess_lang, custom_config, backend, workers)
+        for block in blocks:
+            block["bbox"] = source_box(block["bbox"], transform)
+        if cache is not None:
+            cache.put(key, json.dumps(blocks, ensure_ascii=False))
+        return blocks
+    except Exception as e:
+        print(f"\n[ERROR] Could not segment image {image_path}: {e}")
+        return []
+
+
+def blocks_text(blocks):
+    """Page text in reading order, one paragraph per block."""
+    return "\n\n".join(block["text"] for block in blocks)
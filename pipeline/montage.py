@@ -0,0 +1,145 @@
+"""
+Montage batching for small clip images.
+
+Carousel, areamapper and pagerectangle scrapers leave hundreds of article
+clips per edition. For a 300x400 clip the fixed cost of one OCR call (process
+start, traineddata load, page analysis set-up) is larger than the recognition
+itself. ``run_montage_ocr`` stacks many preprocessed clips top to bottom on
+one white canvas with blank separator bands, OCRs each montage once through
+``recognize_data`` and hands every recognised word back to the clip whose
+box contains its centre.
+"""
+import bisect
+from io import BytesIO
+
+from PIL import Image
+
+from ocr import CUSTOM_CONFIG, DEFAULT_PREPROCESSOR, clean_ocr_text, get_backend
+from ocr_cache import cache_key
+
+# Bump when packing or text reassembly changes, so cached texts are not reused
+MONTAGE_VERSION = 1
+# Larger images are pages, not clips, and are OCRed alone
+MAX_CLIP_PIXELS = 1_500_000
+# Blank rows between clips; well above a line gap so no line spans two clips
+MARGIN = 48
+MAX_MONTAGE_HEIGHT = 12000
+MAX_MONTAGE_CLIPS = 40
+
+
+def is_clip(path):
+    """True for images small enough to batch (only the header is read)."""
+    with Image.open(path) as image:
+        width, height = image.size
+    return width * height <= MAX_CLIP_PIXELS
+
+
+def build_montages(clips, margin=MARGIN, max_height=MAX_MONTAGE_HEIGHT,
+                   max_clips=MAX_MONTAGE_CLIPS):
+    """Stack ``clips`` (L images, ink = 0) into montages.
+
+    Yields ``(montage, boxes)``; ``boxes[i]`` is ``(x, y, width, height)`` of
+    the i-th clip of that montage, in the order the clips were given.
+    """
+    group, height = [], margin
+    for clip in clips:
+        needed = clip.height + margin
+        if group and (height + needed > max_height or len(group) == max_clips):
+            yield _paste(group, margin)
+            group, height = [], margin
+        group.append(clip)
+        height += needed
+    if group:
+        yield _paste(group, margin)
+
+
+def _paste(clips, margin):
+    width = max(clip.width for clip in clips) + 2 * margin
+    height = sum(clip.height + margin for clip in clips) + margin
+    montage = Image.new("L", (width, height), 255)
+    boxes, y = [], margin
+    for clip in clips:
+        montage.paste(clip.convert("L"), (margin, y))
+        boxes.append((margin, y, clip.width, clip.height))
+        y += clip.height + margin
+    return montage, boxes
+
+
+def assign_words(rows, boxes):
+    """Word rows of TSV ``rows`` per box, by the box containing their centre."""
+    tops = [box[1] for box in boxes]
+    assigned = [[] for _ in boxes]
+    for row in rows:
+        if row["level"] != 5 or not row.get("text", "").strip():
+            continue
+        cx = row["left"] + row["width"] / 2
+        cy = row["top"] + row["height"] / 2
+        index = bisect.bisect_right(tops, cy) - 1
+        if index < 0:
+            continue
+        x, y, width, height = boxes[index]
+        if x <= cx < x + width and y <= cy < y + height:
+            assigned[index].append(row)  # else noise in a separator band
+    return assigned
+
+
+def split_words(rows, boxes):
+    """Text of each box from TSV ``rows``: words grouped by Tesseract line."""
+    texts = []
+    for words in assign_words(rows, boxes):
+        lines = {}
+        for row in words:
+            key = (row["block_num"], row["par_num"], row["line_num"])
+            lines.setdefault(key, []).append(row["text"].strip())
+        texts.append("\n".join(" ".join(line) for line in lines.values()))
+    return texts
+
+
+def ocr_montage(montage, boxes, tess_lang, custom_config=CUSTOM_CONFIG, backend=None):
+    """OCR one montage; returns the raw text of each clip box."""
+    rows = get_backend(backend).recognize_data(montage, tess_lang, custom_config)
+    return split_words(rows, boxes)
+
+
+def run_montage_ocr(image_paths, tess_lang, custom_config=CUSTOM_CONFIG, backend=None,
+                    preprocessor=None, cache=None, margin=MARGIN,
+                    max_height=MAX_MONTAGE_HEIGHT, max_clips=MAX_MONTAGE_CLIPS):
+    """OCR many clips through montages; returns cleaned texts in input order.
+
+    Failed clips come back as "", like ``run_ocr_on_image``.
+    """
+    preprocessor = preprocessor or DEFAULT_PREPROCESSOR
+    texts = [""] * len(image_paths)
+    keys = [None] * len(image_paths)
+    pending, clips = [], []
+    for index, path in enumerate(image_paths):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            if cache is not None:
+                keys[index] = cache_key(data, tess_lang, custom_config,
+                                        f"{preprocessor.key()}:montage-v{MONTAGE_VERSION}")
+                text = cache.get(keys[index])
+                if text is not None:
+                    texts[index] = text
+                    continue
+            with Image.open(BytesIO(data)) as image:
+                clips.append(preprocessor(image))
+            pending.append(index)
+        except Exception as e:
+            print(f"\n[ERROR] Could not process image {path}: {e}")
+
+    start = 0
+    for montage, boxes in build_montages(clips, margin, max_height, max_clips):
+        indexes = pending[start:start + len(boxes)]
+        start += len(boxes)
+        try:
+            results = ocr_montage(montage, boxes, tess_lang, custom_config, backend)
+        except Exception as e:
+            print(f"\n[ERROR] Could not OCR montage of {len(boxes)} clips: {e}")
+            continue
+        for index, text in zip(indexes, results):
+            texts[index] = clean_ocr_text(text)
+            if cache is not None:
+                cache.put(keys[index], texts[index])
+    return texts
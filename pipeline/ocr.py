@@ -0,0 +1,231 @@
+"""
+OCR backends for the pipeline.
+
+``PytesseractBackend`` shells out to the ``tesseract`` binary: every call
+spawns a process, writes a temp image and reloads the traineddata.
+``TesserocrBackend`` keeps one in-process Tesseract API handle per language
+alive and reuses it across images, which matters for thousands of small
+clips. ``get_backend`` hands out one backend per thread, so pool workers each
+keep their own engines. ``recognize_data`` returns Tesseract's TSV rows
+(boxes and confidences) parsed by ``parse_tsv``; ``detect_script`` runs
+orientation and script detection (needs osd.traineddata).
+"""
+import os
+import re
+import shlex
+import threading
+from io import BytesIO
+
+import pytesseract
+from PIL import Image
+
+from ocr_cache import cache_key
+from preprocess import Preprocessor
+
+try:
+    import tesserocr
+except ImportError:  # optional: fall back to the tesseract binary
+    tesserocr = None
+
+CUSTOM_CONFIG = (
+    "--oem 1 "
+    "--psm 4 "
+    "-c preserve_interword_spaces=1 "
+    "-c load_system_dawg=false "
+    "-c load_freq_dawg=false "
+    "-c tessedit_do_invert=0 "
+    "-c textonly_pdf=1 "
+    "-c char_blacklist=_{}[]<>|~^` "
+)
+# "auto" uses tesserocr when it is installed
+DEFAULT_BACKEND = os.environ.get("OCR_BACKEND", "auto")
+DEFAULT_PREPROCESSOR = Preprocessor()
+
+
+def clean_ocr_text(text):
+    text = re.sub(r"[|_]+", "", text)  # Remove pipes, underscores
+    text = re.sub(r"(?<=\S)-\n(?=\S)", "", text)  # Join hyphenated words broken by newline
+    text = re.sub(r"\n+", "\n", text)  # Collapse multiple newlines
+    text = re.sub(r"\s{2,}", " ", text)  # Collapse extra spaces
+    return text.strip()
+
+
+def parse_config(config):
+    """Split a tesseract command-line config into ``(oem, psm, variables)``."""
+    oem, psm, variables = None, None, {}
+    tokens = shlex.split(config, posix=False)
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if token == "--oem":
+            oem, index = int(tokens[index + 1]), index + 1
+        elif token == "--psm":
+            psm, index = int(tokens[index + 1]), index + 1
+        elif token == "--tessdata-dir":
+            index += 1  # see tessdata_dir
+        elif token == "-c":
+            key, _, value = tokens[index + 1].partition("=")
+            variables[key] = value
+            index += 1
+        index += 1
+    return oem, psm, variables
+
+
+def tessdata_dir(config):
+    """The ``--tessdata-dir`` of a config string (e.g. tessdata_best), or None."""
+    match = re.search(r'--tessdata-dir\s+("[^"]+"|\S+)', config)
+    return match.group(1).strip('"') if match else None
+
+
+TSV_INTS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+            "left", "top", "width", "height")
+
+
+def parse_tsv(tsv):
+    """Rows of Tesseract's TSV output as dicts; ``conf`` is -1 for non-words."""
+    lines = tsv.splitlines()
+    if not lines:
+        return []
+    header = lines[0].split("\t")
+    rows = []
+    for line in lines[1:]:
+        values = line.split("\t")
+        if len(values) < len(header):
+            values += [""] * (len(header) - len(values))
+        row = dict(zip(header, values))
+        try:
+            for key in TSV_INTS:
+                row[key] = int(row[key])
+            row["conf"] = float(row["conf"])
+        except (KeyError, ValueError):
+            continue
+        rows.append(row)
+    return rows
+
+
+class PytesseractBackend:
+    """One ``tesseract`` subprocess per image."""
+
+    name = "pytesseract"
+
+    def recognize(self, image, tess_lang, config=CUSTOM_CONFIG):
+        return pytesseract.image_to_string(image, lang=tess_lang, config=config)
+
+    def recognize_data(self, image, tess_lang, config=CUSTOM_CONFIG):
+        return parse_tsv(pytesseract.image_to_data(image, lang=tess_lang, config=config))
+
+    def detect_script(self, image):
+        osd = pytesseract.image_to_osd(image, config="--psm 0",
+                                       output_type=pytesseract.Output.DICT)
+        return {"script": osd["script"], "script_conf": float(osd["script_conf"]),
+                "rotate": int(osd["rotate"])}
+
+    def close(self):
+        pass
+
+
+class TesserocrBackend:
+    """In-process Tesseract, one API handle per (language, config) kept alive."""
+
+    name = "tesserocr"
+
+    def __init__(self, tessdata=None):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self.tessdata = tessdata or os.environ.get("TESSDATA_PREFIX") or tesserocr.get_languages()[0]
+        self._apis = {}
+        self._osd = None
+
+    def api(self, tess_lang, config=CUSTOM_CONFIG):
+        key = (tess_lang, config)
+        if key not in self._apis:
+            oem, psm, variables = parse_config(config)
+            # Dictionary switches only take effect when passed at init time
+            self._apis[key] = tesserocr.PyTessBaseAPI(
+                path=tessdata_dir(config) or self.tessdata, lang=tess_lang,
+                oem=tesserocr.OEM(oem if oem is not None else tesserocr.OEM.DEFAULT),
+                psm=tesserocr.PSM(psm if psm is not None else tesserocr.PSM.AUTO),
+                variables=variables)
+        return self._apis[key]
+
+    def recognize(self, image, tess_lang, config=CUSTOM_CONFIG):
+        api = self.api(tess_lang, config)
+        api.SetImage(image.convert("L") if image.mode == "1" else image)
+        try:
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+    def recognize_data(self, image, tess_lang, config=CUSTOM_CONFIG):
+        api = self.api(tess_lang, config)
+        api.SetImage(image.convert("L") if image.mode == "1" else image)
+        try:
+            # GetTSVText has no header row
+            header = "\t".join(TSV_INTS + ("conf", "text"))
+            return parse_tsv(header + "\n" + api.GetTSVText(0))
+        finally:
+            api.Clear()
+
+    def detect_script(self, image):
+        if self._osd is None:
+            self._osd = tesserocr.PyTessBaseAPI(path=self.tessdata, lang="osd",
+                                                psm=tesserocr.PSM.OSD_ONLY)
+        self._osd.SetImage(image.convert("L") if image.mode == "1" else image)
+        try:
+            osd = self._osd.DetectOrientationScript()
+        finally:
+            self._osd.Clear()
+        if not osd:
+            raise RuntimeError("orientation and script detection failed")
+        return {"script": osd["script_name"], "script_conf": osd["script_conf"],
+                "rotate": (360 - osd["orient_deg"]) % 360}
+
+    def close(self):
+        for api in self._apis.values():
+            api.End()
+        self._apis.clear()
+        if self._osd is not None:
+            self._osd.End()
+            self._osd = None
+
+
+BACKENDS = {"pytesseract": PytesseractBackend, "tesserocr": TesserocrBackend}
+_local = threading.local()
+
+
+def get_backend(name=None):
+    """This thread's backend instance for ``name`` ("auto", "tesserocr", ...)."""
+    name = name or DEFAULT_BACKEND
+    if name == "auto":
+        name = "tesserocr" if tesserocr is not None else "pytesseract"
+    backends = getattr(_local, "backends", None)
+    if backends is None:
+        backends = _local.backends = {}
+    if name not in backends:
+        backends[name] = BACKENDS[name]()
+    return backends[name]
+
+
+def run_ocr_on_image(image_path, tess_lang, custom_config=CUSTOM_CONFIG, backend=None,
+                     preprocessor=None, cache=None):
+    """OCR one image file; ``cache`` is an optional ocr_cache.OcrCache."""
+    preprocessor = preprocessor or DEFAULT_PREPROCESSOR
+    try:
+        with open(image_path, "rb") as f:
+            data = f.read()
+        key = None
+        if cache is not None:
+            key = cache_key(data, tess_lang, custom_config, preprocessor.key())
+            text = cache.get(key)
+            if text is not None:
+                return text
+        # Preprocessing happens in memory; the source file is never modified
+        with Image.open(BytesIO(data)) as image:
+            page = preprocessor(image)
+        text = get_backend(backend).recognize(page, tess_lang, custom_config)
+        if cache is not None:
+            cache.put(key, text)
+        return text
+    except Exception as e:
+        print(f"\n[ERROR] Could not process image {image_path}: {e}")
+        return ""
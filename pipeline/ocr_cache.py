@@ -0,0 +1,154 @@
+"""
+Persistent OCR result cache.
+
+OCR of a full page costs seconds to tens of seconds of CPU, so results are
+stored in SQLite keyed by the image content plus everything that influences
+the text: Tesseract language, config string and preprocessing configuration
+(which includes preprocess.VERSION). Entries are evicted by age and, least
+recently used first, when the cache grows past ``max_bytes``; eviction runs
+on demand and every ``EVICT_EVERY`` insertions. Hits do not write: their
+``used`` times are buffered and stored in one transaction per
+``TOUCH_BATCH`` hits (and on every put, evict and close, and when a pool
+worker exits), so a pool of workers reading the cache does not serialise on
+commits. Times still buffered when a worker is killed are lost, which only
+blurs the LRU order.
+"""
+import hashlib
+import os
+from multiprocessing import util
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE = os.path.join("output", "ocr_cache.sqlite")
+# Hits whose ``used`` time is buffered before it is written
+TOUCH_BATCH = 64
+# Insertions (per process) between automatic evictions
+EVICT_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL
+)
+"""
+
+
+def cache_key(image_bytes, tess_lang, config, preprocess_key):
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    params = hashlib.sha256(f"{tess_lang}\0{config}\0{preprocess_key}".encode()).hexdigest()
+    return f"{digest}:{params[:16]}"
+
+
+class OcrCache:
+    """SQLite-backed text cache; safe to share between threads and processes."""
+
+    _shared = {}
+
+    def __init__(self, path=DEFAULT_CACHE, max_bytes=512 * 1024 * 1024, max_age_days=90):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._touched = {}
+        self._puts = 0
+        self._finalizer = None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+
+    @classmethod
+    def shared(cls, path=DEFAULT_CACHE):
+        """One cache per path per process (e.g. for pool workers)."""
+        if path not in cls._shared:
+            cache = cls._shared[path] = cls(path)
+            # Runs when a multiprocessing worker exits normally
+            cache._finalizer = util.Finalize(cache, cache.flush, exitpriority=10)
+        return cls._shared[path]
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT text FROM ocr WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._flush_touched()
+                self._db.commit()
+            return row[0]
+
+    def _flush_touched(self):
+        """Write the buffered ``used`` times (caller holds the lock and commits)."""
+        if self._touched:
+            self._db.executemany("UPDATE ocr SET used = ? WHERE key = ?",
+                                 [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def flush(self):
+        """Write the buffered ``used`` times now."""
+        with self._lock:
+            self._flush_touched()
+            self._db.commit()
+
+    def put(self, key, text):
+        now = time.time()
+        with self._lock:
+            self._flush_touched()
+            self._db.execute("INSERT OR REPLACE INTO ocr VALUES (?, ?, ?, ?, ?)",
+                             (key, text, len(text.encode("utf-8")) + len(key), now, now))
+            self._db.commit()
+            self._puts += 1
+            due = self._puts % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones over max_bytes."""
+        with self._lock:
+            self._flush_touched()
+            cutoff = time.time() - self.max_age_days * 86400
+            removed = self._db.execute("DELETE FROM ocr WHERE used < ?", (cutoff,)).rowcount
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM ocr").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                for key, size in self._db.execute(
+                        "SELECT key, size FROM ocr ORDER BY used").fetchall():
+                    if excess <= 0:
+                        break
+                    self._db.execute("DELETE FROM ocr WHERE key = ?", (key,))
+                    excess -= size
+                    removed += 1
+            self._db.commit()
+        return removed
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr").fetchone()
+        return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+    def report(self):
+        stats = self.stats()
+        lookups = stats["hits"] + stats["misses"]
+        rate = stats["hits"] / lookups * 100 if lookups else 0
+        print(f"🗃️ OCR cache {self.path}: {stats['entries']} entries, "
+              f"{stats['bytes'] / (1024 * 1024):.1f} MB"
+              + (f", {stats['hits']}/{lookups} hits ({rate:.0f}%)" if lookups else ""))
+
+    def close(self):
+        if self._finalizer is not None:
+            self._finalizer.cancel()
+        with self._lock:
+            self._flush_touched()
+            self._db.commit()
+            self._db.close()
+        OcrCache._shared.pop(self.path, None)
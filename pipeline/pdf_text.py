@@ -0,0 +1,122 @@
+"""
+Text-layer fast path for PDF editions.
+
+Jai Hind, Sanaleibak, Herald, Samyukta Karnataka, Echo of India and Western
+Times arrive as PDFs, and some of those carry an embedded text layer.
+``ocr_pdf`` extracts every page's text with poppler's ``pdftotext`` (one
+process per file) and keeps it when ``text_quality`` finds real Unicode text
+in the paper's script. Only image-only pages, and pages set in legacy fonts
+whose text layer is Latin or private-use garbage, are rasterised with
+``pdftoppm`` and OCRed.
+"""
+import re
+import subprocess
+import time
+
+try:
+    from pdf2image import convert_from_path
+except ImportError:  # only needed for pages without a usable text layer
+    convert_from_path = None
+
+from ocr import CUSTOM_CONFIG, DEFAULT_PREPROCESSOR, clean_ocr_text, get_backend
+from ocr_cache import cache_key
+from scripts import lang_scripts, script_counts
+
+OCR_DPI = 300
+# Fewer letters than this: an image-only page (or only a folio line)
+MIN_TEXT_CHARS = 200
+# Share of the letters that must be in the paper's own script
+MIN_SCRIPT_SHARE = 0.5
+# Share of unmapped glyphs (private use area, U+FFFD) a usable layer may have
+MAX_PRIVATE_SHARE = 0.02
+# English layers: share of words that must contain a vowel
+MIN_VOWEL_WORDS = 0.75
+_WORD = re.compile(r"[A-Za-z]{2,}")
+
+
+def extract_pages(pdf_path, timeout=120):
+    """Text layer of every page, as a list (one string per page)."""
+    result = subprocess.run(["pdftotext", "-enc", "UTF-8", str(pdf_path), "-"],
+                            capture_output=True, timeout=timeout, check=True)
+    pages = result.stdout.decode("utf-8", errors="replace").split("\f")
+    # pdftotext ends the last page with a form feed too
+    return pages[:-1] if len(pages) > 1 and not pages[-1].strip() else pages
+
+
+def text_quality(text, tess_lang):
+    """``(usable, reason)`` for one page's text layer in a paper's language."""
+    counts = script_counts(text)
+    private = counts.pop("Private", 0)
+    letters = sum(counts.values())
+    if letters < MIN_TEXT_CHARS:
+        return False, f"no text layer ({letters} letters)"
+    if private > MAX_PRIVATE_SHARE * (letters + private):
+        return False, f"unmapped glyphs ({private} private-use characters)"
+    scripts = lang_scripts(tess_lang)
+    own = scripts - {"Latin"} or {"Latin"}
+    share = sum(counts[script] for script in own) / letters
+    if share < MIN_SCRIPT_SHARE:
+        # Legacy (non-Unicode) Indic fonts extract as Latin letters and symbols
+        return False, f"legacy font ({share:.0%} {'/'.join(sorted(own))})"
+    if own == {"Latin"}:
+        words = _WORD.findall(text)
+        voweled = sum(bool(re.search("[aeiouyAEIOUY]", word)) for word in words)
+        if words and voweled / len(words) < MIN_VOWEL_WORDS:
+            return False, f"legacy font ({voweled}/{len(words)} words with vowels)"
+    return True, "text layer"
+
+
+def ocr_pdf_page(pdf_path, page, data, tess_lang, custom_config=CUSTOM_CONFIG,
+                 backend=None, preprocessor=None, cache=None, dpi=OCR_DPI):
+    """Rasterise one page in memory and OCR it; ``data`` is the PDF's bytes."""
+    if convert_from_path is None:
+        raise RuntimeError("pdf2image is not installed")
+    preprocessor = preprocessor or DEFAULT_PREPROCESSOR
+    key = None
+    if cache is not None:
+        key = cache_key(data, tess_lang, custom_config,
+                        f"{preprocessor.key()}:pdf-page{page}@{dpi}")
+        text = cache.get(key)
+        if text is not None:
+            return text
+    image = convert_from_path(str(pdf_path), dpi=dpi, first_page=page,
+                              last_page=page, grayscale=True)[0]
+    text = get_backend(backend).recognize(preprocessor(image), tess_lang, custom_config)
+    if cache is not None:
+        cache.put(key, text)
+    return text
+
+
+def ocr_pdf(pdf_path, tess_lang, custom_config=CUSTOM_CONFIG, backend=None,
+            preprocessor=None, cache=None, dpi=OCR_DPI):
+    """Text of every page of a PDF; OCR only where the text layer is unusable.
+
+    Returns one dict per page with ``page``, ``source`` ("text" or "ocr"),
+    ``reason``, ``text`` and ``seconds``.
+    """
+    with open(pdf_path, "rb") as f:
+        data = f.read()
+    try:
+        layers = extract_pages(pdf_path)
+    except Exception as e:
+        print(f"\n[ERROR] Could not read the text layer of {pdf_path}: {e}")
+        return []
+
+    results = []
+    for page, layer in enumerate(layers, start=1):
+        started = time.perf_counter()
+        usable, reason = text_quality(layer, tess_lang)
+        if usable:
+            text, source = clean_ocr_text(layer), "text"
+        else:
+            source = "ocr"
+            try:
+                text = clean_ocr_text(ocr_pdf_page(pdf_path, page, data, tess_lang,
+                                                   custom_config, backend, preprocessor,
+                                                   cache, dpi))
+            except Exception as e:
+                print(f"\n[ERROR] Could not OCR page {page} of {pdf_path}: {e}")
+                text = ""
+        results.append({"page": page, "source": source, "reason": reason, "text": text,
+                        "seconds": time.perf_counter() - started})
+    return results
@@ -0,0 +1,256 @@
+"""
+In-memory image preprocessing for OCR.
+
+Everything works on NumPy arrays of the grayscale page, without Python-level
+per-pixel callbacks and without writing back to the source file:
+
+* DPI normalisation (resample to the resolution Tesseract is tuned for)
+* thresholding: fixed, Otsu (global) or Sauvola (local, via integral images)
+* deskew by projection-profile search on a downscaled copy
+* despeckle by dropping isolated dark pixels
+
+``Preprocessor`` bundles one configuration; ``for_paper`` returns the
+configuration tuned for a paper (see PAPER_PREPROCESS). The defaults
+reproduce the old fixed 180 threshold; Otsu/Sauvola, despeckle, deskew and
+DPI normalisation are opt-in (``TUNED``) until ``benchmark_preprocess.py
+--ocr`` shows they read better than the old threshold.
+"""
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+# Bump when the output of a given configuration changes (cache keys use it)
+VERSION = 2
+
+DEFAULTS = {
+    "threshold": "fixed",     # "fixed", "otsu", "sauvola" or None (keep gray)
+    "fixed_level": 180,
+    "sauvola_window": 31,
+    "sauvola_k": 0.2,
+    "deskew": False,
+    "max_skew": 5.0,          # degrees searched either way
+    "despeckle": False,
+    "target_dpi": None,       # None: keep the source resolution
+    "source_dpi": None,       # None: trust the image's DPI tag if plausible
+}
+# The full pipeline, for papers and benchmarks that opt in
+TUNED = {"threshold": "otsu", "deskew": True, "despeckle": True, "target_dpi": 300}
+# DPI tags below this are usually a default (72/96) rather than the scan's
+MIN_TRUSTED_DPI = 100
+# A skew is only corrected when its profile score beats the level page's by
+# this relative margin; blank pages, photos and straight pages stay as they are
+MIN_SKEW_GAIN = 0.25
+
+# How a preprocessed page relates to its source image: the page was resized
+# by ``scale_x``/``scale_y`` to ``width`` x ``height`` and then rotated by
+# ``angle`` degrees (counter-clockwise, canvas expanded). See ``source_box``.
+Transform = namedtuple("Transform", "scale_x scale_y angle width height")
+
+# Per-paper overrides of DEFAULTS, keyed like batch_ocr.PAPER_LANGS
+PAPER_PREPROCESS = {
+    # Screenshots of zoomed viewers: already large, evenly lit
+    "ahmedabad_mirror": {"source_dpi": 300, "target_dpi": 300},
+    "disha": {"source_dpi": 300, "target_dpi": 300},
+    # Tile-stitched scans with uneven paper tone
+    "sakal": {"threshold": "sauvola"},
+    "gomantak": {"threshold": "sauvola"},
+    # Small article clips: skew search is wasted on them
+    "namasthe_telangana": {"deskew": False},
+}
+
+
+def to_gray(image):
+    return np.asarray(image.convert("L"), dtype=np.uint8)
+
+
+def normalize_dpi(gray, source_dpi, target_dpi):
+    if not source_dpi or not target_dpi or abs(source_dpi - target_dpi) < 1:
+        return gray
+    scale = target_dpi / source_dpi
+    height, width = gray.shape
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    resample = Image.LANCZOS if scale < 1 else Image.BICUBIC
+    return np.asarray(Image.fromarray(gray).resize(size, resample))
+
+
+def otsu_level(gray):
+    """Threshold maximising the between-class variance of the histogram."""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weight = np.cumsum(hist)
+    mean = np.cumsum(hist * np.arange(256))
+    total = weight[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mean[-1] * weight - mean * total) ** 2 / (weight * (total - weight))
+    return int(np.argmax(np.nan_to_num(between)))
+
+
+def _window_sums(values, window):
+    """Sum of every ``window`` x ``window`` neighbourhood (edge-padded)."""
+    pad = window // 2
+    padded = np.pad(values, pad, mode="edge")
+    integral = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1))
+    integral[1:, 1:] = padded.cumsum(0).cumsum(1)
+    h, w = values.shape
+    return (integral[window:window + h, window:window + w]
+            - integral[:h, window:window + w]
+            - integral[window:window + h, :w]
+            + integral[:h, :w])
+
+
+def sauvola(gray, window=31, k=0.2, dynamic_range=128.0):
+    """Local threshold ``mean * (1 + k * (std / R - 1))``; returns a bool mask of ink."""
+    window |= 1  # odd, so the window is centred
+    values = gray.astype(np.float64)
+    area = window * window
+    mean = _window_sums(values, window) / area
+    sq_mean = _window_sums(values * values, window) / area
+    std = np.sqrt(np.maximum(sq_mean - mean * mean, 0))
+    return values <= mean * (1 + k * (std / dynamic_range - 1))
+
+
+def binarize(gray, method, fixed_level=180, window=31, k=0.2):
+    """Bool mask of ink pixels."""
+    if method == "fixed":
+        return gray < fixed_level
+    if method == "otsu":
+        return gray <= otsu_level(gray)
+    if method == "sauvola":
+        return sauvola(gray, window, k)
+    raise ValueError(f"Unknown threshold method: {method}")
+
+
+def skew_angle(ink, max_skew=5.0, step=0.25, sample_width=1000):
+    """Rotation (degrees) that makes text rows horizontal.
+
+    Rows of text give a spiky horizontal projection profile when level; the
+    angle whose profile has the highest variance wins. A 1-degree sweep is
+    refined around its best angle in ``step`` increments. Returns 0.0 for an
+    empty mask and when no angle beats level by ``MIN_SKEW_GAIN``.
+    """
+    if not ink.any():
+        return 0.0
+    height, width = ink.shape
+    scale = min(1.0, sample_width / width)
+    small = Image.fromarray((ink * 255).astype(np.uint8)).resize(
+        (max(1, int(width * scale)), max(1, int(height * scale))), Image.NEAREST)
+
+    def score(angle):
+        profile = np.asarray(small.rotate(angle, Image.NEAREST), dtype=np.float64).sum(axis=1)
+        return np.diff(profile).var()
+
+    level = score(0.0)
+    coarse = max(np.arange(-max_skew, max_skew + 0.5, 1.0), key=score)
+    fine = np.arange(coarse - 1 + step, coarse + 1, step)
+    best = max(fine[np.abs(fine) <= max_skew], key=score)
+    if score(best) <= level * (1 + MIN_SKEW_GAIN):
+        return 0.0
+    return float(best)
+
+
+def despeckle(ink, max_neighbours=1):
+    """Drop ink pixels with at most ``max_neighbours`` ink pixels around them."""
+    padded = np.pad(ink, 1).astype(np.uint8)
+    h, w = ink.shape
+    neighbours = sum(padded[dy:dy + h, dx:dx + w]
+                     for dy in range(3) for dx in range(3)) - ink
+    return ink & (neighbours > max_neighbours)
+
+
+class Preprocessor:
+    """One preprocessing configuration; call it on a Pillow image."""
+
+    def __init__(self, **options):
+        unknown = set(options) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown preprocessing options: {sorted(unknown)}")
+        self.options = dict(DEFAULTS, **options)
+        self.last_timings = {}
+
+    def key(self):
+        """Stable description of the configuration, for cache keys."""
+        settings = ",".join(f"{name}={self.options[name]}" for name in sorted(self.options))
+        return f"v{VERSION}:{settings}"
+
+    def __call__(self, image):
+        """Return the preprocessed page as an 8-bit Pillow image (ink = 0)."""
+        return self.process(image)[0]
+
+    def process(self, image):
+        """``(page, transform)``: the preprocessed page and its ``Transform``."""
+        o = self.options
+        timings = {}
+        started = time.perf_counter()
+
+        gray = to_gray(image)
+        dpi = o["source_dpi"]
+        if dpi is None:
+            tagged = (image.info.get("dpi") or (0,))[0]
+            dpi = tagged if tagged >= MIN_TRUSTED_DPI else None
+        gray = normalize_dpi(gray, dpi, o["target_dpi"])
+        timings["scale"] = time.perf_counter() - started
+        height, width = gray.shape
+        transform = Transform(width / image.width, height / image.height, 0.0, width, height)
+
+        if o["threshold"] is None:
+            timings["total"] = timings["scale"]
+            self.last_timings = timings
+            return Image.fromarray(gray), transform
+
+        mark = time.perf_counter()
+        ink = binarize(gray, o["threshold"], o["fixed_level"],
+                       o["sauvola_window"], o["sauvola_k"])
+        timings["threshold"] = time.perf_counter() - mark
+
+        if o["despeckle"]:
+            mark = time.perf_counter()
+            ink = despeckle(ink)
+            timings["despeckle"] = time.perf_counter() - mark
+
+        page = Image.fromarray(np.where(ink, 0, 255).astype(np.uint8))
+        if o["deskew"]:
+            mark = time.perf_counter()
+            angle = skew_angle(ink, o["max_skew"])
+            if angle:
+                page = page.rotate(angle, Image.BILINEAR, expand=True, fillcolor=255)
+                page = page.point(lambda x: 0 if x < 128 else 255)  # LUT, not per pixel
+                transform = transform._replace(angle=angle)
+            timings["deskew"] = time.perf_counter() - mark
+
+        timings["total"] = time.perf_counter() - started
+        self.last_timings = timings
+        return page, transform
+
+
+def source_box(box, transform):
+    """``[x, y, width, height]`` on a preprocessed page -> the source image.
+
+    The corners are rotated back about the page centre and unscaled; a box
+    on a deskewed page becomes the upright box enclosing it in the source.
+    """
+    x, y, width, height = box
+    scale_x, scale_y, angle, pre_width, pre_height = transform
+    corners = [(x, y), (x + width, y), (x, y + height), (x + width, y + height)]
+    if angle:
+        radians = math.radians(angle)
+        cos, sin = math.cos(radians), math.sin(radians)
+        # Size of the expanded canvas, as Image.rotate computes it
+        page_width = abs(pre_width * cos) + abs(pre_height * sin)
+        page_height = abs(pre_width * sin) + abs(pre_height * cos)
+        corners = [((px - page_width / 2) * cos - (py - page_height / 2) * sin + pre_width / 2,
+                    (px - page_width / 2) * sin + (py - page_height / 2) * cos + pre_height / 2)
+                   for px, py in corners]
+    xs = [min(max(px, 0), pre_width) / scale_x for px, _ in corners]
+    ys = [min(max(py, 0), pre_height) / scale_y for _, py in corners]
+    left, top = math.floor(min(xs)), math.floor(min(ys))
+    return [left, top, math.ceil(max(xs)) - left, math.ceil(max(ys)) - top]
+
+
+def for_paper(paper=None, **overrides):
+    """Preprocessor configured for ``paper`` (folder name), plus overrides."""
+    slug = (paper or "").strip().lower().replace(" ", "_").replace("-", "_")
+    options = next((opts for name, opts in PAPER_PREPROCESS.items()
+                    if slug.startswith(name)), {})
+    return Preprocessor(**dict(options, **overrides))
@@ -0,0 +1,92 @@
+"""
+Unicode script of the text the pipeline handles.
+
+Maps code points to the scripts of the papers' languages, and Tesseract
+language codes to the script they are written in, so extracted or
+recognised text can be checked against the script a paper is expected in.
+Script names match those reported by Tesseract's OSD.
+"""
+import bisect
+from collections import Counter
+
+# (first, last, script) code point ranges, sorted
+SCRIPT_RANGES = [
+    (0x0041, 0x005A, "Latin"),
+    (0x0061, 0x007A, "Latin"),
+    (0x00C0, 0x024F, "Latin"),
+    (0x0600, 0x06FF, "Arabic"),
+    (0x0750, 0x077F, "Arabic"),
+    (0x0900, 0x097F, "Devanagari"),
+    (0x0980, 0x09FF, "Bengali"),
+    (0x0A00, 0x0A7F, "Gurmukhi"),
+    (0x0A80, 0x0AFF, "Gujarati"),
+    (0x0B00, 0x0B7F, "Oriya"),
+    (0x0B80, 0x0BFF, "Tamil"),
+    (0x0C00, 0x0C7F, "Telugu"),
+    (0x0C80, 0x0CFF, "Kannada"),
+    (0x0D00, 0x0D7F, "Malayalam"),
+    (0xA8E0, 0xA8FF, "Devanagari"),
+    (0xABC0, 0xABFF, "Meetei Mayek"),
+    (0xE000, 0xF8FF, "Private"),  # unmapped glyphs of legacy fonts
+    (0xFB50, 0xFDFF, "Arabic"),
+    (0xFE70, 0xFEFF, "Arabic"),
+    (0xFFFD, 0xFFFD, "Private"),  # replacement character
+]
+_STARTS = [first for first, _, _ in SCRIPT_RANGES]
+
+LANG_SCRIPTS = {
+    "asm": "Bengali",
+    "ben": "Bengali",
+    "eng": "Latin",
+    "guj": "Gujarati",
+    "hin": "Devanagari",
+    "kan": "Kannada",
+    "mal": "Malayalam",
+    "mar": "Devanagari",
+    "mni": "Meetei Mayek",
+    "nep": "Devanagari",
+    "ori": "Oriya",
+    "pan": "Gurmukhi",
+    "tam": "Tamil",
+    "tel": "Telugu",
+    "urd": "Arabic",
+}
+# Language read for a script when the paper's own languages do not use it
+SCRIPT_LANGS = {
+    "Arabic": "urd",
+    "Bengali": "ben",
+    "Devanagari": "hin",
+    "Gujarati": "guj",
+    "Gurmukhi": "pan",
+    "Kannada": "kan",
+    "Latin": "eng",
+    "Malayalam": "mal",
+    "Meetei Mayek": "mni",
+    "Oriya": "ori",
+    "Tamil": "tam",
+    "Telugu": "tel",
+}
+
+
+def script_of(char):
+    """Script name of one character, or None (digits, punctuation, ...)."""
+    code = ord(char)
+    index = bisect.bisect_right(_STARTS, code) - 1
+    if index >= 0 and code <= SCRIPT_RANGES[index][1]:
+        return SCRIPT_RANGES[index][2]
+    return None
+
+
+def script_counts(text):
+    """Counter of script names over the characters of ``text``."""
+    counts = Counter()
+    for char in text:
+        script = script_of(char)
+        if script:
+            counts[script] += 1
+    return counts
+
+
+def lang_scripts(tess_lang):
+    """Scripts of a Tesseract language string: "mar+eng" -> {"Devanagari", "Latin"}."""
+    return {LANG_SCRIPTS[code] for code in tess_lang.split("+") if code in LANG_SCRIPTS}
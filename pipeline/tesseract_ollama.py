@@ -1,50 +1,17 @@
 import os
 import torch
-import pytesseract
-from PIL import Image
 from ollama import Client
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 from IndicTransToolkit.processor import IndicProcessor
-import re
 
-def clean_ocr_text(text):
-    text = re.sub(r"[|_]+", "", text)  # Remove pipes, underscores
-    text = re.sub(r"(?<=\S)-\n(?=\S)", "", text)  # Join hyphenated words broken by newline
-    text = re.sub(r"\n+", "\n", text)  # Collapse multiple newlines
-    text = re.sub(r"\s{2,}", " ", text)  # Collapse extra spaces
-    return text.strip()
+from lang_detect import detect_language
+from layout import blocks_text, run_layout_ocr
 
 
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 OLLAMA_URL = "http://localhost:11434"
 OUTPUT_DIR = "./output"
 
-def img_grayscale(IMAGE_FILE):
-    img = Image.open(IMAGE_FILE)
-    bw = img.convert("L")
-    bw.save(IMAGE_FILE)
-    print(f"Converted {IMAGE_FILE} to grayscale")
-
-def run_ocr_on_image(image_path, tess_lang):
-    custom_config = (
-        "--oem 1 "
-        "--psm 4 "
-        "-c preserve_interword_spaces=1 "
-        "-c load_system_dawg=false "
-        "-c load_freq_dawg=false "
-        "-c tessedit_do_invert=0 "
-        "-c textonly_pdf=1 "
-        "-c char_blacklist=_{}[]<>|~^` "
-    )
-    try:
-        image = Image.open(image_path)
-        image = image.convert("L").point(lambda x: 0 if x < 180 else 255, '1')  # Binary threshold
-        text = pytesseract.image_to_string(image, lang=tess_lang, config=custom_config)
-        return text
-    except Exception as e:
-        print(f"\n[ERROR] Could not process image {image_path}: {e}")
-        return ""
-
 
 class IndicTranslator:
     ISO2_TO_TAG = {
@@ -120,11 +87,11 @@ def save_output_files(src, ocr_text, translated_text, ollama_response):
 if __name__ == "__main__":
     src = "guj_Gujr"
     IMAGE_FILE = "guj_Gujr_img.jpg"
-    TESS_LANG = f"{src.split('_')[0]}+eng"
-    print("Turning into black and white... \n")
-    img_grayscale(IMAGE_FILE)
-    ocr_text = run_ocr_on_image(IMAGE_FILE, TESS_LANG)
-    ocr_text=clean_ocr_text(ocr_text)
+    # The smallest language set the page needs ("guj" rather than "guj+eng")
+    TESS_LANG = detect_language(IMAGE_FILE, f"{src.split('_')[0]}+eng")
+    print("Tesseract language:", TESS_LANG)
+    # Columns are OCRed separately and joined in reading order
+    ocr_text = blocks_text(run_layout_ocr(IMAGE_FILE, TESS_LANG))
     print("OCR:\n", ocr_text)
     translator = IndicTranslator()
     translated_text = translator.translate(ocr_text, src, "eng_Latn")
@@ -0,0 +1,165 @@
+"""
+Two-pass OCR: re-read only the lines the fast pass is unsure about.
+
+The first pass reads the whole page with the fast models (``TESSDATA_FAST``,
+the tessdata_fast directory, when set) and keeps Tesseract's word
+confidences from ``recognize_data``. Lines whose mean confidence is below
+``MIN_LINE_CONF`` are cut out, upscaled, stacked into montages (montage.py)
+and read again with the best models (``TESSDATA_BEST``) in one call per
+montage; the second reading of a line replaces the first only when it is
+more confident. When most of the page is doubtful the page is simply re-read
+once with the best models. The returned stats say how much of the page
+needed the expensive pass. Both model directories must be set, otherwise
+the "best" pass would re-read lines with the same model.
+"""
+import json
+import os
+from io import BytesIO
+
+from PIL import Image
+
+from montage import assign_words, build_montages
+from ocr import CUSTOM_CONFIG, DEFAULT_PREPROCESSOR, clean_ocr_text, get_backend
+from ocr_cache import cache_key
+
+FAST_TESSDATA = os.environ.get("TESSDATA_FAST")
+BEST_TESSDATA = os.environ.get("TESSDATA_BEST")
+# Lines with a lower mean word confidence (0-100) are read again
+MIN_LINE_CONF = 70
+# Past this share of doubtful lines one best-model pass over the page is cheaper
+MAX_RETRY_SHARE = 0.5
+# Second-pass line images: upscaled, with a white border
+RETRY_SCALE = 2
+MARGIN = 6
+
+
+def with_tessdata(config, path):
+    return f'--tessdata-dir "{path}" {config}' if path else config
+
+
+FAST_CONFIG = with_tessdata(CUSTOM_CONFIG, FAST_TESSDATA)
+BEST_CONFIG = with_tessdata(CUSTOM_CONFIG, BEST_TESSDATA)
+
+
+def models_error(fast_config=FAST_CONFIG, best_config=BEST_CONFIG):
+    """Why the two configs cannot make a two-pass run, or None when they can."""
+    if fast_config == best_config:
+        return ("two-pass OCR needs different fast and best models: set TESSDATA_FAST "
+                "and TESSDATA_BEST to the tessdata_fast and tessdata_best directories")
+    return None
+
+
+def group_lines(rows):
+    """Words of TSV ``rows`` grouped by line, in reading order.
+
+    Each line is ``{"box": [left, top, right, bottom], "words": [...],
+    "confs": [...]}``.
+    """
+    lines = {}
+    for row in rows:
+        word = row.get("text", "").strip()
+        if row["level"] != 5 or not word:
+            continue
+        key = (row["page_num"], row["block_num"], row["par_num"], row["line_num"])
+        right, bottom = row["left"] + row["width"], row["top"] + row["height"]
+        line = lines.get(key)
+        if line is None:
+            line = lines[key] = {"box": [row["left"], row["top"], right, bottom],
+                                 "words": [], "confs": []}
+        else:
+            box = line["box"]
+            line["box"] = [min(box[0], row["left"]), min(box[1], row["top"]),
+                           max(box[2], right), max(box[3], bottom)]
+        line["words"].append(word)
+        line["confs"].append(row["conf"])
+    return list(lines.values())
+
+
+def line_conf(line):
+    confs = [conf for conf in line["confs"] if conf >= 0]
+    return sum(confs) / len(confs) if confs else 0.0
+
+
+def _area(box):
+    return max(0, box[2] - box[0]) * max(0, box[3] - box[1])
+
+
+def retry_image(page, box, scale=RETRY_SCALE, margin=MARGIN):
+    """One line of ``page`` (ink = 0), upscaled for the second pass."""
+    crop = page.crop((max(0, box[0] - margin), max(0, box[1] - margin),
+                      min(page.width, box[2] + margin), min(page.height, box[3] + margin)))
+    crop = crop.resize((crop.width * scale, crop.height * scale), Image.BICUBIC)
+    crop = crop.point(lambda x: 0 if x < 128 else 255)  # LUT, not per pixel
+    framed = Image.new("L", (crop.width + 2 * margin * scale, crop.height + 2 * margin * scale), 255)
+    framed.paste(crop, (margin * scale, margin * scale))
+    return framed
+
+
+def two_pass_ocr(page, tess_lang, fast_config=FAST_CONFIG, best_config=BEST_CONFIG,
+                 min_conf=MIN_LINE_CONF, backend=None):
+    """OCR a preprocessed page; returns ``(text, stats)``."""
+    error = models_error(fast_config, best_config)
+    if error:
+        raise ValueError(error)
+    engine = get_backend(backend)
+    lines = group_lines(engine.recognize_data(page, tess_lang, fast_config))
+    doubtful = [line for line in lines if line_conf(line) < min_conf]
+    total_area = sum(_area(line["box"]) for line in lines)
+    stats = {
+        "lines": len(lines),
+        "retried": len(doubtful),
+        "area_share": (sum(_area(line["box"]) for line in doubtful) / total_area
+                       if total_area else 0.0),
+        "fast_conf": (sum(map(line_conf, lines)) / len(lines)) if lines else 0.0,
+        "mode": "lines",
+    }
+
+    if lines and len(doubtful) / len(lines) > MAX_RETRY_SHARE:
+        stats["mode"] = "page"
+        stats["retried"], stats["area_share"] = len(lines), 1.0
+        best = group_lines(engine.recognize_data(page, tess_lang, best_config))
+        if best:
+            lines = best
+    else:
+        # All doubtful lines go through the best models in as few calls as
+        # possible: one per montage, not one process and model load per line
+        clips = [retry_image(page, line["box"]) for line in doubtful]
+        start = 0
+        for montage, boxes in build_montages(clips):
+            rows = engine.recognize_data(montage, tess_lang, best_config)
+            for line, words in zip(doubtful[start:start + len(boxes)],
+                                   assign_words(rows, boxes)):
+                retry = {"words": [row["text"].strip() for row in words],
+                         "confs": [row["conf"] for row in words]}
+                if retry["words"] and line_conf(retry) > line_conf(line):
+                    line["words"], line["confs"] = retry["words"], retry["confs"]
+            start += len(boxes)
+    stats["final_conf"] = (sum(map(line_conf, lines)) / len(lines)) if lines else 0.0
+    return "\n".join(" ".join(line["words"]) for line in lines), stats
+
+
+def run_two_pass_ocr(image_path, tess_lang, fast_config=FAST_CONFIG, best_config=BEST_CONFIG,
+                     min_conf=MIN_LINE_CONF, backend=None, preprocessor=None, cache=None):
+    """``two_pass_ocr`` for an image file; returns ``(text, stats)`` (``("", {})`` on error)."""
+    preprocessor = preprocessor or DEFAULT_PREPROCESSOR
+    try:
+        with open(image_path, "rb") as f:
+            data = f.read()
+        key = None
+        if cache is not None:
+            key = cache_key(data, tess_lang, f"{fast_config}\0{best_config}",
+                            f"{preprocessor.key()}:two-pass@{min_conf}")
+            cached = cache.get(key)
+            if cached is not None:
+                result = json.loads(cached)
+                return result["text"], result["stats"]
+        with Image.open(BytesIO(data)) as image:
+            page = preprocessor(image)
+        text, stats = two_pass_ocr(page, tess_lang, fast_config, best_config, min_conf, backend)
+        text = clean_ocr_text(text)
+        if cache is not None:
+            cache.put(key, json.dumps({"text": text, "stats": stats}, ensure_ascii=False))
+        return text, stats
+    except Exception as e:
+        print(f"\n[ERROR] Could not process image {image_path}: {e}")
+        return "", {}
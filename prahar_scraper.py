@@ -1,20 +1,31 @@
+import argparse
 import json
-from io import BytesIO
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import img2pdf
 import requests
 from bs4 import BeautifulSoup
 import os
 import re
 from datetime import datetime
 from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+
+from convert_pool import ConversionPool, image_to_pdf
+from image_output import sniff_format
 
 
 class PraharCrawler:
-    def __init__(self):
+    def __init__(self, fetch_workers=16, pdf_workers=None):
         self.base_url = "https://epaper.prahaar.in/"
         self.newspaper_name = "prahar"
+        self.fetch_workers = fetch_workers
+        self.pdf_workers = pdf_workers or os.cpu_count() or 1
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=fetch_workers,
+                              pool_maxsize=fetch_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.news_page = "news_page"
         self.news_clip = "news_clip"
         self.output_dir =os.path.join("downloads",self.newspaper_name)
@@ -25,16 +36,20 @@ class PraharCrawler:
         os.makedirs(new_folder, exist_ok=True)
         return new_folder
 
-    def download_image(self, url, file_path):
+    def fetch_story(self, item):
+        response = self.session.get(item["url"], timeout=60)
+        response.raise_for_status()
+        return response.content
+
+    def story_size(self, item):
         try:
-            response = requests.get(url)
-            with open(file_path, "wb") as f:
-                f.write(img2pdf.convert(BytesIO(response.content)))
-            print(f"Image saved: {file_path}")
-            return True
+            response = self.session.head(item["url"], allow_redirects=True,
+                                         timeout=30)
+            length = response.headers.get("Content-Length")
+            return int(length) if length else None
         except Exception as e:
-            print(f"Error downloading {url}: {str(e)}")
-            return False
+            print(f"Error sizing {item['url']}: {str(e)}")
+            return None
 
     def get_edition_dict(self, date):
         try:
@@ -76,25 +91,25 @@ class PraharCrawler:
         clip_page_dir,
         path_date,
     ):
-        try:
-            print(
-                f"Processing story: {edition_name} | Page: {page_number} | Story: {story_number}"
-            )
-            url = urljoin(self.base_url, story_data["Image"])
-            file_path = os.path.join(
-                clip_page_dir,
-                f"{edition_name}_{path_date}_page_{page_number}_article"
-                f"_{story_number}.pdf",
-            )
-            self.download_image(url, file_path)
-        except Exception as e:
-            print(f"Error in process_page for {edition_name}: {str(e)}")
+        """Return the work item for one story clip."""
+        url = urljoin(self.base_url, story_data["Image"])
+        file_path = os.path.join(
+            clip_page_dir,
+            f"{edition_name}_{path_date}_page_{page_number}_article"
+            f"_{story_number}.pdf",
+        )
+        return {
+            "edition": edition_name,
+            "page": page_number,
+            "story": story_number,
+            "url": url,
+            "file_path": file_path,
+        }
 
     def process_page(
         self, edition_name, page_number, page_info, edition_dir, path_date
     ):
         try:
-            print(f"Processing page: {edition_name} | Page: {page_number}")
             url = urljoin(self.base_url, page_info["Image"])
             # page_dir = self.create_folder(edition_dir, self.news_page)
             # file_path = os.path.join(
@@ -104,13 +119,13 @@ class PraharCrawler:
             # self.download_image(url, file_path)
             if "Stories" not in page_info:
                 print(f"Page {page_number} has no stories")
-                return True
+                return []
             print(f"Found {len(page_info['Stories'])} stories in page {page_number}")
             # clip_dir = self.create_folder(edition_dir, self.news_clip)
             # clip_page_dir = self.create_folder(
             #     clip_dir, f"Page {str(page_number).zfill(2)}"
             # )
-            for story_number, story_data in page_info["Stories"].items():
+            return [
                 self.process_story(
                     edition_name,
                     page_number,
@@ -119,9 +134,11 @@ class PraharCrawler:
                     edition_dir,
                     path_date,
                 )
-            return True
+                for story_number, story_data in page_info["Stories"].items()
+            ]
         except Exception as e:
             print(f"Error in process_page for {edition_name}: {str(e)}")
+            return []
 
     def process_edition(self, edition_name, edition_data, path_date):
         try:
@@ -129,21 +146,67 @@ class PraharCrawler:
             page_info = edition_data.get("Main", {}).get("Pages", {})
             if not page_info:
                 print(f"No page info found: {edition_name}")
-                return False
+                return []
             print(f"Found {len(page_info)} pages")
             edition_name = "_".join(edition_name.split()).lower()
             edition_dir = os.path.join(self.output_dir, edition_name)
             os.makedirs(edition_dir, exist_ok=True)
+            items = []
             for page_number, page_data in page_info.items():
-                self.process_page(
+                items.extend(self.process_page(
                     edition_name, int(page_number), page_data, edition_dir, path_date
-                )
-            return True
+                ))
+            return items
         except Exception as e:
-            print(f"Error in process_edition")
-            return False
+            print(f"Error in process_edition for {edition_name}: {str(e)}")
+            return []
+
+    def list_work(self, items):
+        """Print every planned story with its remote size (dry run)."""
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            sizes = list(executor.map(self.story_size, items))
+        total = 0
+        for item, size in zip(items, sizes):
+            total += size or 0
+            size_text = f"{size / 1024:.1f} KB" if size is not None else "? KB"
+            print(f"{item['edition']} | Page: {item['page']} | "
+                  f"Story: {item['story']} | {size_text} | {item['url']}")
+        print(f"{len(items)} stories, {total / (1024 * 1024):.1f} MB total")
+        return True
 
-    def crawl_newspaper(self):
+    def download_stories(self, items):
+        """Fetch all stories concurrently and wrap them in PDFs in a process pool.
+
+        A story is handed to the PDF pool as soon as its download finishes, so
+        network and PDF wrapping overlap and an edition completes in the
+        time of its slowest story.
+        """
+        started = time.perf_counter()
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetchers, \
+                ConversionPool(workers=self.pdf_workers) as wrappers:
+            fetches = {fetchers.submit(self.fetch_story, item): item
+                       for item in items}
+            for future in as_completed(fetches):
+                item = fetches[future]
+                try:
+                    content = future.result()
+                except Exception as e:
+                    print(f"Error downloading {item['url']}: {str(e)}")
+                    failed += 1
+                    continue
+                wrappers.submit(sniff_format(content) or "image", image_to_pdf,
+                                content, item["file_path"])
+
+            results = wrappers.wait()
+        saved = sum(1 for result in results if result)
+        failed += len(results) - saved
+
+        elapsed = time.perf_counter() - started
+        print(f"Saved {saved} stories ({failed} failed) in {elapsed:.1f}s")
+        return failed == 0
+
+    def crawl_newspaper(self, dry_run=False):
         date = datetime.now().date()
 
         edition_dict = self.get_edition_dict(date)
@@ -155,14 +218,26 @@ class PraharCrawler:
         print(f"Found {len(edition_data_dict)} editions for {date}")
         path_date = date.strftime("%Y_%m_%d")
         # date_dir = self.create_folder(self.newspaper_name, path_date)
+        items = []
         for edition_name, edition_data in edition_data_dict.items():
-            self.process_edition(edition_name, edition_data, path_date)
+            items.extend(self.process_edition(edition_name, edition_data, path_date))
+        print(f"Planned {len(items)} stories across all editions")
+        if dry_run:
+            return self.list_work(items)
+        self.download_stories(items)
         return True
 
 
 if __name__ == "__main__":
-    crawler = PraharCrawler()
-    status = crawler.crawl_newspaper()
+    parser = argparse.ArgumentParser(description='Prahar Crawler')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='List story downloads with their sizes without fetching them')
+    parser.add_argument('--workers', type=int, default=16,
+                        help='Concurrent story downloads')
+    args = parser.parse_args()
+
+    crawler = PraharCrawler(fetch_workers=args.workers)
+    status = crawler.crawl_newspaper(dry_run=args.dry_run)
     if status:
         print("Process Complete")
     else:
@@ -3,15 +3,17 @@
 import os
 import requests
 import datetime
-from PIL import Image
-from io import BytesIO
 from pathlib import Path
 
+from image_output import OutputCodec
+from tile_stitch import TiledPage, fetch_tiles
+
 # === CONFIG ===
 PAPER = "Sakal"
 EDITION = "Mumbai"
 SECTION = "Main"
 EDITION_CODE = "DA"  # from HTML: DA, not MP
+OUTPUT_FORMAT = "png"  # tiles are JPEG already, so "jpeg" is smaller still
 
 today = datetime.datetime.now().date()
 date_str = today.strftime("%Y-%m-%d")
@@ -29,47 +31,51 @@ TILE_URL_PATTERN = (
 )
 
 def download_tile(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return Image.open(BytesIO(response.content)).convert("RGB")
-    except Exception:
-        print(f"❌ Failed: {url}")
+    """Tile bytes, or None when the tile does not exist (end of the page)."""
+    response = requests.get(url, timeout=30)
+    # S3 answers 403 rather than 404 for a missing key when listing is denied
+    if response.status_code in (403, 404):
         return None
-
-def stitch_tiles(tiles):
-    width, height = tiles[0].size
-    stitched = Image.new("RGB", (width * 3, height * 3))
-    for row in range(3):
-        for col in range(3):
-            idx = row * 3 + col
-            stitched.paste(tiles[idx], (col * width, row * height))
-    return stitched
+    response.raise_for_status()
+    print(f"➡️ Downloaded: {url}")
+    return response.content
 
 def download_page(page_number):
-    tiles = []
-    for i in range(9):
-        url = TILE_URL_PATTERN.format(page=page_number, tile=i)
-        print(f"➡️ Downloading: {url}")
-        img = download_tile(url)
-        if img is None:
-            return None
-        tiles.append(img)
-    return stitch_tiles(tiles)
+    """Stitch a page from however many tiles it has; None if it has none."""
+    try:
+        tiles = fetch_tiles(lambda i: download_tile(
+            TILE_URL_PATTERN.format(page=page_number, tile=i)))
+    except ValueError as e:
+        print(f"❌ Cannot download page {page_number}: {e}")
+        return None
+    if not tiles:
+        print(f"❌ No tiles for page {page_number}")
+        return None
+    try:
+        return TiledPage(tiles, workdir=BASE_FOLDER)
+    except ValueError as e:
+        print(f"❌ Cannot stitch page {page_number}: {e}")
+        return None
 
 def main():
-    pages = []
+    codec = OutputCodec(OUTPUT_FORMAT)
+    # Encode straight to the output format so the codec passes it through
+    encode_as = "png" if codec.fmt == "original" else codec.fmt
     page_num = 1
     while True:
         print(f"📄 Processing page {page_num}")
-        image = download_page(page_num)
-        if image is None:
+        page = download_page(page_num)
+        if page is None:
             break
         filename = f"{PAPER.lower()}{date_str.replace('-', '')}{page_num:02d}.png"
         img_path = BASE_FOLDER / filename
-        image.save(img_path)
-        pages.append(image)
+        with page:
+            print(f"🧩 {page.cols}x{page.rows} tiles, {page.width}x{page.height}px")
+            data = page.encode(encode_as, quality=codec.quality,
+                               compress_level=codec.png_compress_level)
+        print(f"💾 Saved {codec.save_bytes(data, img_path)}")
         page_num += 1
+    codec.report("pages")
 
     # if pages:
     #     print("🖨️ Creating PDF...")
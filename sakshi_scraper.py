@@ -1,10 +1,13 @@
 import asyncio
 from pathlib import Path
-import requests
-from PIL import Image
+from urllib.parse import urljoin
 from playwright.async_api import async_playwright
 import datetime
 
+from image_validate import ImageValidator
+from page_count import PagePlan, async_resolve_page_count
+from pdf_writer import IncrementalPdfWriter
+
 # === CONFIG ===
 publication_name = "sakshi"
 edition_name = "Hyderabad"
@@ -12,32 +15,81 @@ today = datetime.datetime.now()
 date_str = today.strftime("%Y-%m-%d")
 date_url_str = today.strftime("%d/%m/%Y")
 
-START_URL = (
-    f"https://epaper.sakshi.com/Hyderabad_Main"
-    f"?eid=123&edate={date_url_str}"
-)
+def edition_url(date_url):
+    return f"https://epaper.sakshi.com/Hyderabad_Main?eid=123&edate={date_url}"
+
+START_URL = edition_url(date_url_str)
+# Assumed (not verified against the live viewer): a date without an edition
+# shows the "page not available" image in #imgmain1
+PLACEHOLDER_DATE = "01/01/2000"
 
 # === PATH SETUP ===
 BASE_DIR = Path(f"downloads/{publication_name}/{edition_name.lower()}")
 BASE_DIR.mkdir(parents=True, exist_ok=True)
 PDF_PATH = BASE_DIR / f"{publication_name}_{date_str}.pdf"
+MAX_PAGES = 60  # only used when the viewer exposes no page count
+
+# Placeholder dHashes are learned at start-up by learn_placeholder(); when
+# that fails only the size checks below guard against placeholder pages
+VALIDATOR = ImageValidator(min_bytes=10 * 1024, min_width=300, min_height=300)
+
+def placeholder_check_off(reason):
+    print(f"⚠️ Placeholder check is OFF for this run ({reason}); "
+          f"only the size checks will reject 'page not available' images")
+    return False
+
+async def learn_placeholder(browser):
+    """Teach VALIDATOR the viewer's "page not available" image.
+
+    Tries the viewer on PLACEHOLDER_DATE, where no edition is expected, and
+    learns the dHash of the image it shows. Returns False (with a warning)
+    when the viewer does not behave that way.
+    """
+    page = await browser.new_page()
+    try:
+        await page.goto(edition_url(PLACEHOLDER_DATE), wait_until="load")
+        await page.wait_for_selector("#imgmain1", timeout=10000)
+        src = await page.evaluate("document.querySelector('#imgmain1')?.getAttribute('src')")
+        if not src:
+            return placeholder_check_off("no #imgmain1 image on the sample date")
+        # Through the browser context: no blocking request in the event loop
+        response = await page.request.get(urljoin(page.url, src), timeout=30000)
+        data = await response.body()
+        # Real pages are far larger; never learn one by mistake
+        if not response.ok or len(data) > VALIDATOR.placeholder_max_bytes:
+            return placeholder_check_off(
+                f"sample is HTTP {response.status}, {len(data)} bytes, not a placeholder")
+        VALIDATOR.add_placeholder(data)
+        print(f"🧩 Learned placeholder image ({len(data)} bytes)")
+        return True
+    except Exception as e:
+        return placeholder_check_off(f"could not fetch a sample: {e}")
+    finally:
+        await page.close()
 
 def download_image(img_url, save_path):
-    r = requests.get(img_url, stream=True)
-    r.raise_for_status()
-    with open(save_path, "wb") as f:
-        for chunk in r.iter_content(1024):
-            f.write(chunk)
-    print(f"✅ Downloaded: {save_path.name}")
+    verdict = VALIDATOR.fetch(img_url, save_path)
+    if verdict.ok:
+        print(f"✅ Downloaded: {save_path.name}")
+    else:
+        print(f"⚠️ Rejected {img_url}: {verdict.reason}")
+    return verdict.ok
 
 def convert_to_pdf(image_paths, pdf_path):
-    images = [Image.open(p).convert("RGB") for p in image_paths]
-    images[0].save(pdf_path, save_all=True, append_images=images[1:])
+    if not image_paths:
+        print("❌ No pages downloaded, no PDF written.")
+        return None
+    with IncrementalPdfWriter(pdf_path) as writer:
+        for p in image_paths:
+            writer.add_file(p)
+    writer.report()
     print(f"📄 PDF created: {pdf_path}")
+    return pdf_path
 
 async def main():
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
+        await learn_placeholder(browser)
         page = await browser.new_page()
         await page.goto(START_URL, wait_until="load")
 
@@ -50,7 +102,12 @@ async def main():
         image_paths = []
         seen_urls = set()
 
-        for page_num in range(1, 50):
+        await page.wait_for_selector("#ImageContainerDiv", timeout=10000)
+        total_pages = await async_resolve_page_count(page, "image_container")
+        print(f"📑 Pages: {total_pages or f'unknown (max {MAX_PAGES})'}")
+        plan = PagePlan(publication_name, total_pages or MAX_PAGES)
+
+        for page_num in plan:
             try:
                 # Wait for image container to appear
                 await page.wait_for_selector("#ImageContainerDiv", timeout=10000)
@@ -66,8 +123,14 @@ async def main():
                 filename = f"{publication_name}{date_str.replace('-', '')}{page_num:02}.png"
                 
                 img_path = BASE_DIR / filename
-                download_image(img_url, img_path)
+                if not download_image(img_url, img_path):
+                    # Stubs and placeholders mark the end of the edition
+                    print("✅ Done: page not available.")
+                    break
                 image_paths.append(img_path)
+                plan.mark(page_num)
+                if page_num == len(plan):
+                    break
 
                 # Go to next page
                 await page.click("#Next_Page")
@@ -78,6 +141,7 @@ async def main():
                 await page.screenshot(path=f"error_page_{page_num}.png", full_page=True)
                 break
 
+        plan.summary()
         await browser.close()
 
         # if image_paths:
@@ -1,13 +1,14 @@
 import os
 from datetime import datetime
+from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-import requests
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 import time
 
+from article_fetch import extract_image_urls, fetch_articles, session_from_driver
+
 main_url = "https://sambadepaper.com/"
 save_dir = "downloads/sambad"
 paper_name = "sambad"
@@ -71,6 +72,61 @@ str_date = datetime.now().strftime("%Y-%m-%d")
 #         return False
 
 
+def resolve_popup_urls(driver, map_element):
+    """Return ``(area_index, url)`` for every show_pop area of a page map.
+
+    The onclick handlers are run with ``window.open`` stubbed out so the
+    popup target is recorded without opening a window.
+    """
+    targets = driver.execute_script(
+        """
+        const map = arguments[0];
+        const targets = [];
+        const originalOpen = window.open;
+        let current = -1;
+        window.open = function (url) {
+            if (url) targets.push([current, String(url)]);
+            return null;
+        };
+        try {
+            map.querySelectorAll('area').forEach(function (area, index) {
+                const onclick = area.getAttribute('onclick');
+                if (!onclick || onclick.indexOf('show_pop') === -1) return;
+                current = index;
+                try { new Function(onclick).call(area); } catch (e) {}
+            });
+        } finally {
+            window.open = originalOpen;
+        }
+        return targets;
+        """,
+        map_element,
+    )
+    return [(index, urljoin(driver.current_url, url)) for index, url in targets or []]
+
+
+def save_article_image(session, html, page_url, download_dir, page_num, index):
+    """Save the epaper image of one article detail page."""
+    img_urls = extract_image_urls(html, page_url, keep=lambda url: "epaperimages" in url)
+    if not img_urls:
+        print(f"No valid epaper image URL found on {page_url}")
+        return None
+
+    img_url = img_urls[0]
+    print(f"Image URL: {img_url}")
+    response = session.get(img_url, timeout=30)
+    if response.status_code != 200:
+        print(f"Failed to download image: HTTP {response.status_code}")
+        return None
+
+    filename = f"{paper_name}_{str_date}_article_{page_num}_{index}.jpg"
+    filepath = os.path.join(download_dir, filename)
+    with open(filepath, "wb") as f:
+        f.write(response.content)
+    print(f"Image saved: {filepath}")
+    return filepath
+
+
 def download_epaper_images(base_url, edition_name):
     # Create base directory if it doesn't exist
     if not os.path.exists(save_dir):
@@ -101,8 +157,8 @@ def download_epaper_images(base_url, edition_name):
         driver = webdriver.Chrome(options=chrome_options)
         driver.get(base_url)
         time.sleep(5)
+        session = session_from_driver(driver, referer=main_url)
 
-        processed_areas = set()  # Keep track of processed areas
         page_images = {}  # Keep track of images for each page
 
         # Get total number of pages
@@ -138,116 +194,24 @@ def download_epaper_images(base_url, edition_name):
 
                         print(f"Found map for page {page_num}")
 
-                        areas = map_element.find_elements(By.TAG_NAME, "area")
-                        print(f"Found {len(areas)} areas in map")
-
-                        # Process all areas in the map
-                        for index, area in enumerate(areas):
-                            coords = area.get_attribute("coords")
-                            if coords in processed_areas:
-                                continue
-
-                            onclick = area.get_attribute("onclick")
-                            if onclick and "show_pop" in onclick:
-                                print(f"\nProcessing area with coords: {coords}")
-                                print(f"Onclick JS: {onclick}")
-
-                                # Store the current window handle
-                                main_window = driver.current_window_handle
-
-                                # Execute the onclick JS directly
-                                driver.execute_script(onclick)
-                                time.sleep(5)
-
-                                # Switch to the new tab
-                                new_window = [
-                                    window
-                                    for window in driver.window_handles
-                                    if window != main_window
-                                ]
-                                if new_window:
-                                    driver.switch_to.window(new_window[0])
-                                    print(f"Switched to new tab: {driver.current_url}")
-
-                                    # Parse the page using BeautifulSoup
-                                    soup = BeautifulSoup(
-                                        driver.page_source, "html.parser"
-                                    )
-
-                                    # Try to find the image tag
-                                    img_tag = None
-
-                                    # Method 1: Find in rDivImgouterBox
-                                    img_div = soup.find("div", class_="rDivImgouterBox")
-                                    if img_div:
-                                        img_tag = img_div.find("img")
-
-                                    # Method 2: Find by onclick
-                                    if not img_tag:
-                                        img_tag = soup.find(
-                                            "img", {"onclick": "zoomin(this.id);"}
-                                        )
-
-                                    # Method 3: Find any image with epaperimages
-                                    if not img_tag:
-                                        img_tag = soup.find(
-                                            "img",
-                                            src=lambda x: x and "epaperimages" in x,
-                                        )
-
-                                    if img_tag:
-                                        img_url = img_tag.get("src") or img_tag.get(
-                                            "data-src"
-                                        )
-                                        if (
-                                            img_url and "epaperimages" in img_url
-                                        ):  # Only process epaper images
-                                            print(f"Image URL: {img_url}")
-
-                                            # Create temporary directory for this page
-                                            download_dir = os.path.join(save_dir,edition_name.lower())
-                                            os.makedirs(download_dir, exist_ok=True)
-                                            response = requests.get(
-                                                img_url,
-                                                headers={
-                                                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-                                                    "Referer": main_url,
-                                                },
-                                            )
-
-                                            if response.status_code == 200:
-                                                filename = f"{paper_name}_{str_date}_article_{page_num}_{index}.jpg"
-                                                filepath = os.path.join(
-                                                    download_dir, filename
-                                                )
-                                                with open(filepath, "wb") as f:
-                                                    f.write(response.content)
-                                                print(f"Image saved: {filepath}")
-                                                # processed_areas.add(
-                                                #     coords
-                                                # )  # Mark this area as processed
-                                                # page_images[page_num].append(
-                                                #     filepath
-                                                # )  # Add to page's images
-                                            else:
-                                                print(
-                                                    f"Failed to download image: HTTP {response.status_code}"
-                                                )
-                                        else:
-                                            print(
-                                                "No valid epaper image URL found in tag."
-                                            )
-                                    else:
-                                        print(
-                                            "Image tag not found using BeautifulSoup."
-                                        )
-
-                                    # Close the current tab and switch back to main window
-                                    driver.close()
-                                    driver.switch_to.window(main_window)
-                                    time.sleep(2)
-                                else:
-                                    print("No new tab was opened")
+                        # Resolve every popup target from the map in one pass
+                        # and fetch the detail pages over HTTP, instead of
+                        # opening and switching to a tab per article.
+                        popups = resolve_popup_urls(driver, map_element)
+                        print(f"Found {len(popups)} article popups in map")
+
+                        download_dir = os.path.join(save_dir,edition_name.lower())
+                        os.makedirs(download_dir, exist_ok=True)
+                        saved = fetch_articles(
+                            session,
+                            popups,
+                            lambda index, url, html, page_num=page_num: save_article_image(
+                                session, html, url, download_dir, page_num, index
+                            ),
+                        )
+                        print(
+                            f"Saved {sum(1 for path in saved if path)} article images for page {page_num}"
+                        )
 
                         # After processing all areas, create PDF for this page
                         # if page_images[page_num]:
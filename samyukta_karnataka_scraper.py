@@ -3,15 +3,20 @@ import re
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from playwright.sync_api import sync_playwright, Page
 
+from edition_pool import DEFAULT_CONCURRENCY, run_editions
+from pdf_merge import StreamingPdfMerger
+
 
 class SamyuktaKarnatakaCrawler:
-    def __init__(self, base_url: str, output_dir: str = "downloads/samyukta_karnataka"):
+    def __init__(self, base_url: str, output_dir: str = "downloads/samyukta_karnataka",
+                 concurrency: int = DEFAULT_CONCURRENCY):
         self.base_url = base_url
         self.output_dir = Path(output_dir)
+        self.concurrency = concurrency
         self._setup_logging()
         self._create_output_dir()
 
@@ -132,8 +137,8 @@ class SamyuktaKarnatakaCrawler:
         return 1
 
     def download_pdf(self, page: Page, page_number: int,
-                     edition_folder: Path, date_str) -> bool:
-        """Download PDF for a specific page"""
+                     edition_folder: Path, date_str) -> Optional[Path]:
+        """Download PDF for a specific page; returns its path"""
         try:
             date_obj = datetime.strptime(date_str, '%B %d, %Y')
             formatted_date = date_obj.strftime('%Y-%m-%d')
@@ -145,7 +150,7 @@ class SamyuktaKarnatakaCrawler:
             if not download_icon:
                 self.logger.warning(
                     f"Download icon not found on page {page_number}")
-                return False
+                return None
 
             with page.expect_download() as download_info:
                 download_icon.click()
@@ -157,13 +162,13 @@ class SamyuktaKarnatakaCrawler:
             download.save_as(str(save_path))
 
             self.logger.info(f"Page {page_number} PDF saved: {save_path}")
-            return True
+            return save_path
 
 
         except Exception as e:
             self.logger.error(
                 f"Error downloading PDF for page {page_number}: {e}")
-            return False
+            return None
 
     def download_clips(self, page: Page, page_number: int,
                        edition_folder: Path, date_str) -> int:
@@ -298,44 +303,68 @@ class SamyuktaKarnatakaCrawler:
             None:
         """Process all pages for an edition"""
         total_pages = self.get_total_pages(page)
+        formatted_date = datetime.strptime(date_str, '%B %d, %Y').strftime('%Y-%m-%d')
 
-        for page_number in range(1, total_pages + 1):
-            # Navigate to the specific page first
-            if not self._navigate_to_page(page, page_number):
-                self.logger.warning(
-                    f"Skipping page {page_number} - navigation failed")
-                continue
-
-            pdf_success = self.download_pdf(page, page_number,
-                                            edition_folder, date_str)
-            clips_count = 0
-
-            if download_clips:
-                clips_count = self.download_clips(page, page_number,
-                                                  edition_folder, date_str)
-
-            if pdf_success:
-                self.logger.info(
-                    f"Page {page_number}: PDF downloaded with {clips_count} clips")
-            else:
-                self.logger.warning(f"Page {page_number}: PDF download failed")
-
-    def _process_editions(self, page: Page, editions: List[Dict],
-                          edition_type: str,
-                          date_str: str, download_clips: bool = True) -> None:
-        """Process a list of editions"""
-        for edition in editions:
-            edition_name = edition['name']
-            self.logger.info(
-                f"Processing {edition_type.lower()} edition: {edition_name}")
+        # Page PDFs are appended to the edition PDF as they are downloaded
+        merger = StreamingPdfMerger(
+            edition_folder / f"samyukta_karnataka_{formatted_date}.pdf",
+            order=range(1, total_pages + 1))
+        try:
+            for page_number in range(1, total_pages + 1):
+                # Navigate to the specific page first
+                if not self._navigate_to_page(page, page_number):
+                    self.logger.warning(
+                        f"Skipping page {page_number} - navigation failed")
+                    merger.page_failed(page_number)
+                    continue
+
+                pdf_path = self.download_pdf(page, page_number,
+                                             edition_folder, date_str)
+                if pdf_path:
+                    merger.page_ready(page_number, pdf_path)
+                else:
+                    merger.page_failed(page_number)
+                clips_count = 0
+
+                if download_clips:
+                    clips_count = self.download_clips(page, page_number,
+                                                      edition_folder, date_str)
+
+                if pdf_path:
+                    self.logger.info(
+                        f"Page {page_number}: PDF downloaded with {clips_count} clips")
+                else:
+                    self.logger.warning(f"Page {page_number}: PDF download failed")
+        finally:
+            if merger.finish():
+                merger.report()
+
+    def _process_edition(self, edition: Dict, edition_type: str,
+                         date_str: str, download_clips: bool = True) -> bool:
+        """Process one edition in its own browser.
+
+        Sync Playwright objects are bound to the thread that created them, so
+        every worker thread starts its own Playwright instance.
+        """
+        edition_name = edition['name']
+        self.logger.info(
+            f"Processing {edition_type.lower()} edition: {edition_name}")
 
-            page.goto(edition['url'])
-            time.sleep(2)
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch(headless=True)
+            try:
+                context = browser.new_context(accept_downloads=True)
+                page = context.new_page()
+                page.goto(edition['url'])
+                time.sleep(2)
 
-            edition_folder = self._create_edition_folder(
-                                                         edition_name)
-            self._process_edition_pages(date_str, page, edition_folder,
-                                        download_clips)
+                edition_folder = self._create_edition_folder(
+                                                             edition_name)
+                self._process_edition_pages(date_str, page, edition_folder,
+                                            download_clips)
+                return True
+            finally:
+                browser.close()
 
     def run(self):
         """Main crawler execution"""
@@ -353,26 +382,32 @@ class SamyuktaKarnatakaCrawler:
                 date_str = self.extract_date(page)
                 editions = self.get_editions(page)
 
-                if not editions['main'] and not editions['sub']:
-                    self.logger.error("No editions found, exiting...")
-                    return
-
-                # Process main editions (with clips)
-                self._process_editions(page, editions['main'], "Main Edition",
-                                       date_str, True)
-
-                # Process sub editions (without clips as per original code)
-                self._process_editions(page, editions['sub'], "Sub Edition",
-                                       date_str, False)
-
-                self.logger.info("Crawler completed successfully")
-
             except Exception as e:
                 self.logger.error(f"Critical error: {e}")
+                return
 
             finally:
                 browser.close()
 
+        if not editions['main'] and not editions['sub']:
+            self.logger.error("No editions found, exiting...")
+            return
+
+        # Main editions are processed with clips, sub editions without clips
+        # as per original code.
+        jobs = ([(edition, "Main Edition", True) for edition in editions['main']] +
+                [(edition, "Sub Edition", False) for edition in editions['sub']])
+
+        report = run_editions(
+            "samyukta_karnataka", jobs,
+            lambda job: self._process_edition(job[0], job[1], date_str, job[2]),
+            concurrency=self.concurrency,
+            name=lambda job: job[0]['name'])
+        report.print_summary()
+
+        self.logger.info("Crawler completed successfully")
+        return report
+
 
 def main():
     base_url = "https://epaper.samyukthakarnataka.com/"
@@ -39,11 +39,8 @@ def download_pdfs(base_url_pattern, publication_name, date, base_dir,
             break
 
     print("Download process finished.")
-    
-    # Convert PDFs to images and cleanup like epaperset2.py
-    if downloaded_files:
-        process_pdfs_to_images(downloaded_files, publication_name, date)
-    
+
+    # Rasterization happens in main() through universal_pdf_processor
     return downloaded_files
 
 
@@ -134,64 +131,6 @@ def main():
             print(f"Error notifying gateway: {e}")
 
 
-def process_pdfs_to_images(pdf_files, publication_name, date):
-    """Convert PDFs to images and delete originals, following epaperset2.py pattern"""
-    try:
-        # Import the PDF to image conversion function
-        import sys
-        import os
-        sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-        from pdf_to_image import convert_pdf_pages_to_images
-        
-        # Create common storage directory for images (same as epaperset2.py)
-        is_docker = os.path.exists('/.dockerenv') or os.environ.get('DOCKER_CONTAINER')
-        
-        if is_docker:
-            common_storage_dir = "/app/newspaper_images"
-        else:
-            common_storage_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "newspaper_images")
-            
-        os.makedirs(common_storage_dir, exist_ok=True)
-        
-        # Convert date format for images (YYYY-MM-DD)
-        try:
-            date_obj = datetime.strptime(date, "%d-%m-%Y")
-            formatted_date = date_obj.strftime("%Y-%m-%d")
-        except ValueError:
-            formatted_date = datetime.today().strftime("%Y-%m-%d")
-        
-        print(f"Converting {len(pdf_files)} PDFs to images in {common_storage_dir}")
-        
-        for pdf_path in pdf_files:
-            try:
-                # Convert PDF to images
-                image_paths = convert_pdf_pages_to_images(
-                    pdf_path,
-                    common_storage_dir,
-                    publication_name.lower(),  # edition_name
-                    formatted_date,
-                    "imphal"  # edition_city
-                )
-                
-                if image_paths:
-                    print(f"Successfully converted {pdf_path} to {len(image_paths)} images")
-                    
-                    # Delete the original PDF file after conversion
-                    try:
-                        os.remove(pdf_path)
-                        print(f"Deleted original PDF file: {pdf_path}")
-                    except Exception as e:
-                        print(f"Failed to delete original PDF file {pdf_path}: {e}")
-                else:
-                    print(f"Failed to convert {pdf_path} to images")
-                    
-            except Exception as e:
-                print(f"Error converting PDF {pdf_path} to images: {e}")
-                
-    except Exception as e:
-        print(f"Error in process_pdfs_to_images: {e}")
-
-
 if __name__ == "__main__":
     main()
 
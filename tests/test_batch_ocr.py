@@ -0,0 +1,83 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "pipeline"))
+
+from batch_ocr import (PDF_SOURCES_SUFFIX, drop_edition_pdfs, is_edition_pdf,  # noqa: E402
+                       load_texts, split_duplicates)
+
+
+def touch(path):
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+    return str(path)
+
+
+def test_edition_pdf_by_sidecar(tmp_path):
+    page = touch(tmp_path / "p1.pdf")
+    edition = touch(tmp_path / "herald.pdf")
+    with open(edition + PDF_SOURCES_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump({"output": edition, "sources": [page]}, f)
+    assert is_edition_pdf(edition, os.listdir(tmp_path))
+    # Page files deleted after the merge: the edition is the only copy
+    os.remove(page)
+    assert not is_edition_pdf(edition, os.listdir(tmp_path))
+
+
+def test_sidecar_wins_over_naming(tmp_path):
+    touch(tmp_path / "herald_2026_3.pdf")
+    edition = touch(tmp_path / "herald_2026.pdf")
+    with open(edition + PDF_SOURCES_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump({"output": edition, "sources": [str(tmp_path / "gone.pdf")]}, f)
+    assert not is_edition_pdf(edition, os.listdir(tmp_path))
+
+
+def test_edition_pdf_by_naming(tmp_path):
+    names = ["herald_2026-10-19.pdf", "herald_2026-10-19_1.pdf",
+             "skarnataka_2026-10-19.pdf", "skarnataka_2026-10-19_page_12.pdf",
+             "jaihind_2026-10-19.pdf"]
+    assert is_edition_pdf(str(tmp_path / names[0]), names)
+    assert is_edition_pdf(str(tmp_path / names[2]), names)
+    # No page files next to it, and page files are never editions themselves
+    assert not is_edition_pdf(str(tmp_path / names[4]), names)
+    assert not is_edition_pdf(str(tmp_path / names[1]), names)
+
+
+def test_drop_edition_pdfs_keeps_pages_and_images(tmp_path):
+    edition = touch(tmp_path / "herald_2026.pdf")
+    page = touch(tmp_path / "herald_2026_1.pdf")
+    image = str(tmp_path / "page_01.jpg")
+    jobs = [("herald", "goa", path, "eng") for path in (edition, page, image)]
+    assert [job[2] for job in drop_edition_pdfs(jobs)] == [page, image]
+
+
+def job(path):
+    return ("paper", "edition", path, "eng")
+
+
+def test_split_duplicates_copies_only_known_originals(tmp_path):
+    a, b, c, d = (str(tmp_path / f"{name}.jpg") for name in "abcd")
+    orphan = str(tmp_path / "orphan.jpg")
+    duplicates = {b: a, c: b, d: orphan}  # c repeats b, which repeats a
+    to_ocr, copies = split_duplicates([job(a), job(b), job(c), job(d)], duplicates, set())
+    assert to_ocr == [job(a), job(d)]
+    assert copies == {job(b): a, job(c): a}
+
+
+def test_split_duplicates_uses_earlier_output(tmp_path):
+    a, b = str(tmp_path / "a.jpg"), str(tmp_path / "b.jpg")
+    to_ocr, copies = split_duplicates([job(b)], {b: a}, {a})
+    assert to_ocr == [] and copies == {job(b): a}
+
+
+def test_load_texts_skips_pdf_pages_and_bad_lines(tmp_path):
+    a, b = str(tmp_path / "a.jpg"), str(tmp_path / "b.pdf")
+    output = tmp_path / "out.jsonl"
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"path": a, "text": "page a"}) + "\n")
+        f.write("{not json\n")
+        f.write(json.dumps({"path": b, "page": 1, "text": "pdf page"}) + "\n")
+    assert load_texts(str(output), {a, b}) == {a: "page a"}
+    assert load_texts(str(output), set()) == {}
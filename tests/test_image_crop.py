@@ -0,0 +1,71 @@
+import os
+import sys
+
+from PIL import Image, ImageDraw, JpegImagePlugin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_crop import crop_image  # noqa: E402
+
+
+def make_page(path, **save_options):
+    """400x300 grey viewer margin around a 300x240 white page with text."""
+    image = Image.new("RGB", (400, 300), (128, 128, 128))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((50, 30, 349, 269), fill="white")
+    for y in range(60, 240, 20):
+        draw.rectangle((80, y, 320, y + 8), fill="black")
+    image.save(path, **save_options)
+    return image
+
+
+def test_crop_twice_keeps_page(tmp_path):
+    path = str(tmp_path / "page.png")
+    make_page(path)
+    assert crop_image(path) == (path, "cropped")
+    with Image.open(path) as image:
+        assert image.size == (300, 240)
+    assert crop_image(path) == (path, "unchanged")
+    assert crop_image(path) == (path, "unchanged")
+    with Image.open(path) as image:
+        assert image.size == (300, 240)
+
+
+def test_content_to_every_edge_has_no_margin(tmp_path):
+    path = str(tmp_path / "full.png")
+    image = Image.new("RGB", (200, 100), "white")
+    draw = ImageDraw.Draw(image)
+    for x in range(0, 200, 6):
+        draw.line((x, 0, x, 99), fill="black")
+    image.save(path)
+    assert crop_image(path) == (path, "no_margin")
+
+
+def test_toolbar_is_reported_not_unchanged(tmp_path):
+    path = str(tmp_path / "toolbar.png")
+    image = make_page(path)
+    # A dark toolbar across the top gives the corners two colours
+    ImageDraw.Draw(image).rectangle((0, 0, 399, 19), fill=(20, 40, 90))
+    for x in range(10, 390, 30):
+        ImageDraw.Draw(image).rectangle((x, 5, x + 12, 14), fill="white")
+    image.save(path)
+    assert crop_image(path) == (path, "no_margin")
+    with Image.open(path) as result:
+        assert result.size == (400, 300)
+
+
+def test_jpeg_keeps_quantization_and_subsampling(tmp_path):
+    path = str(tmp_path / "page.jpg")
+    make_page(path, quality=95, subsampling=0)
+    with Image.open(path) as image:
+        tables = image.quantization
+    assert crop_image(path) == (path, "cropped")
+    with Image.open(path) as image:
+        assert image.quantization == tables
+        assert JpegImagePlugin.get_sampling(image) == 0
+
+
+def test_uniform_image_is_blank(tmp_path):
+    path = str(tmp_path / "blank.png")
+    Image.new("RGB", (50, 50), "white").save(path)
+    assert crop_image(path) == (path, "blank")
@@ -0,0 +1,78 @@
+import os
+import sys
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "pipeline"))
+
+from montage import assign_words, build_montages, split_words  # noqa: E402
+from two_pass import group_lines, line_conf  # noqa: E402
+
+
+def word(text, left, top, width=40, height=20, line=1, block=1, par=1, conf=90.0, page=1):
+    return {"level": 5, "page_num": page, "block_num": block, "par_num": par,
+            "line_num": line, "left": left, "top": top, "width": width,
+            "height": height, "conf": conf, "text": text}
+
+
+def clips():
+    # Different widths: the narrow clip's box ends well before the montage edge
+    return [Image.new("L", (300, 100), 255), Image.new("L", (120, 60), 255),
+            Image.new("L", (200, 80), 255)]
+
+
+def test_build_montages_stacks_clips_with_margins():
+    (montage, boxes), = build_montages(clips(), margin=48)
+    assert boxes == [(48, 48, 300, 100), (48, 196, 120, 60), (48, 304, 200, 80)]
+    assert montage.size == (300 + 2 * 48, 48 + 100 + 48 + 60 + 48 + 80 + 48)
+
+
+def test_build_montages_splits_on_clip_count():
+    groups = list(build_montages(clips(), margin=10, max_clips=2))
+    assert [len(boxes) for _, boxes in groups] == [2, 1]
+    assert groups[1][1] == [(10, 10, 200, 80)]
+
+
+def test_words_go_to_the_clip_containing_their_centre():
+    _, boxes = next(build_montages(clips(), margin=48))
+    rows = [
+        word("one", 60, 60), word("two", 120, 60),
+        word("three", 60, 210, line=2),
+        word("four", 60, 320, line=3), word("five", 60, 350, line=4),
+        word("band", 60, 160, line=5),      # in the separator band between clips
+        word("beyond", 200, 210, line=6),   # right of the narrow second clip
+        word("", 60, 320, line=3),          # empty word
+        dict(word("block", 48, 48, 300, 100), level=2),  # not a word row
+    ]
+    assigned = assign_words(rows, boxes)
+    assert [[row["text"] for row in words] for words in assigned] == [
+        ["one", "two"], ["three"], ["four", "five"]]
+    assert split_words(rows, boxes) == ["one two", "three", "four\nfive"]
+
+
+def test_words_above_the_first_clip_are_dropped():
+    _, boxes = next(build_montages(clips(), margin=48))
+    assert assign_words([word("top", 60, 5)], boxes) == [[], [], []]
+
+
+def test_group_lines_merges_boxes_and_keeps_order():
+    rows = [
+        word("Hello", 10, 12, 50, 18, line=1, conf=95.0),
+        word("world", 70, 10, 60, 22, line=1, conf=85.0),
+        word("next", 10, 40, 40, 20, line=2, conf=-1.0),
+        word("para", 10, 80, 40, 20, line=1, par=2, conf=60.0),
+        word("  ", 10, 110, line=3),
+        dict(word("line", 10, 10, 120, 22), level=4),
+    ]
+    lines = group_lines(rows)
+    assert [line["words"] for line in lines] == [["Hello", "world"], ["next"], ["para"]]
+    assert lines[0]["box"] == [10, 10, 130, 32]
+    assert line_conf(lines[0]) == 90.0
+    assert line_conf(lines[1]) == 0.0  # only "no confidence" words
+    assert line_conf(lines[2]) == 60.0
+
+
+def test_group_lines_keeps_pages_apart():
+    rows = [word("a", 0, 0, page=1), word("b", 0, 0, page=2)]
+    assert [line["words"] for line in group_lines(rows)] == [["a"], ["b"]]
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "pipeline"))
+
+import ocr_cache  # noqa: E402
+from ocr_cache import OcrCache, cache_key  # noqa: E402
+
+
+def used(cache, key):
+    return cache._db.execute("SELECT used FROM ocr WHERE key = ?", (key,)).fetchone()[0]
+
+
+def set_used(cache, key, when):
+    cache._db.execute("UPDATE ocr SET used = ? WHERE key = ?", (when, key))
+    cache._db.commit()
+
+
+def test_key_depends_on_every_input():
+    base = cache_key(b"image", "hin+eng", "--oem 1", "v2:fixed")
+    assert base == cache_key(b"image", "hin+eng", "--oem 1", "v2:fixed")
+    assert base != cache_key(b"other", "hin+eng", "--oem 1", "v2:fixed")
+    assert base != cache_key(b"image", "hin", "--oem 1", "v2:fixed")
+    assert base != cache_key(b"image", "hin+eng", "--oem 1 --psm 4", "v2:fixed")
+    assert base != cache_key(b"image", "hin+eng", "--oem 1", "v2:otsu")
+
+
+def test_get_put_and_counts(tmp_path):
+    cache = OcrCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("k") is None
+    cache.put("k", "text")
+    assert cache.get("k") == "text"
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+def test_age_eviction(tmp_path):
+    cache = OcrCache(str(tmp_path / "cache.sqlite"), max_age_days=1)
+    cache.put("old", "a")
+    cache.put("new", "b")
+    set_used(cache, "old", time.time() - 2 * 86400)
+    assert cache.evict() == 1
+    assert cache.get("old") is None and cache.get("new") == "b"
+    cache.close()
+
+
+def test_lru_eviction_keeps_recently_read(tmp_path):
+    entry = len("x" * 100) + len("k0")
+    cache = OcrCache(str(tmp_path / "cache.sqlite"), max_bytes=2 * entry)
+    for index in range(3):
+        cache.put(f"k{index}", "x" * 100)
+        set_used(cache, f"k{index}", time.time() - 100 + index)
+    cache.get("k0")  # now the most recently used
+    assert cache.evict() == 1  # evict flushes the buffered hit first
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None and cache.get("k2") is not None
+    cache.close()
+
+
+def test_hits_are_written_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr_cache, "TOUCH_BATCH", 3)
+    cache = OcrCache(str(tmp_path / "cache.sqlite"))
+    for index in range(3):
+        cache.put(f"k{index}", "text")
+        set_used(cache, f"k{index}", 1.0)
+    cache.get("k0")
+    cache.get("k1")
+    assert used(cache, "k0") == 1.0  # buffered, not written yet
+    cache.get("k2")
+    assert min(used(cache, f"k{index}") for index in range(3)) > 1.0
+    cache.close()
+
+
+def test_close_writes_buffered_hits(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = OcrCache(path)
+    cache.put("k", "text")
+    set_used(cache, "k", 1.0)
+    cache.get("k")
+    cache.close()
+    reopened = OcrCache(path)
+    assert used(reopened, "k") > 1.0
+    reopened.close()
+
+
+def test_put_evicts_periodically(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr_cache, "EVICT_EVERY", 2)
+    cache = OcrCache(str(tmp_path / "cache.sqlite"), max_age_days=1)
+    cache.put("old", "a")
+    set_used(cache, "old", 0.0)
+    cache.put("new", "b")  # second insertion triggers an eviction
+    assert cache.stats()["entries"] == 1
+    cache.close()
@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "pipeline"))
+
+from pdf_text import text_quality  # noqa: E402
+
+HINDI = "भारत सरकार ने आज नई शिक्षा नीति की घोषणा की और राज्यों से सहयोग मांगा। " * 6
+ENGLISH = "The state government announced a new education policy on Monday. " * 6
+
+
+def test_unicode_text_layer_is_used():
+    assert text_quality(HINDI, "hin+eng") == (True, "text layer")
+    assert text_quality(ENGLISH, "eng") == (True, "text layer")
+
+
+def test_short_layer_is_ocred():
+    usable, reason = text_quality("Page 3  Monday", "hin+eng")
+    assert not usable and reason.startswith("no text layer")
+
+
+def test_legacy_indic_font_is_ocred():
+    # Kruti Dev style fonts extract Hindi as Latin letters and symbols
+    legacy = "Hkkjr ljdkj us vkt ubZ f'k{kk uhfr dh ?kks\"k.kk dh vkSj jkT;ksa ls lg;ksx ekaxkA " * 6
+    usable, reason = text_quality(legacy, "hin+eng")
+    assert not usable and reason.startswith("legacy font")
+
+
+def test_vowelless_latin_is_a_legacy_font_for_english():
+    garbage = "Thk sntc gvrnmnt nncd nw dctn plcy n Mndy strng wrds lk ths. " * 6
+    usable, reason = text_quality(garbage, "eng")
+    assert not usable and reason.startswith("legacy font")
+
+
+def test_private_use_glyphs_are_ocred():
+    mixed = HINDI + "\ue000\ue001\ue002\ue003\ue004" * 4
+    usable, reason = text_quality(mixed, "hin+eng")
+    assert not usable and reason.startswith("unmapped glyphs")
@@ -23,6 +23,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
+from page_count import PagePlan, resolve_page_count
+
 # ============= CONFIG =============
 EDITION_URL = "http://onlineepaper.asianage.com/asianage-epaper.aspx#page2839139"
 PUBLICATION = "the_asian_age"
@@ -71,11 +73,14 @@ def scrape():
         # how many pages?
         wait.until(EC.presence_of_all_elements_located(
             (By.CSS_SELECTOR, "input[id^='DataList1_ImageButton1_']")))
-        inputs = drv.find_elements(By.CSS_SELECTOR, "input[id^='DataList1_ImageButton1_']")
-        total = len(inputs)
+        total = LAST_PAGE or resolve_page_count(drv, "aspx_thumbs")
+        if not total:
+            print("could not determine page count")
+            return
+        plan = PagePlan(PUBLICATION, total)
         print("pages:", total)
 
-        for p in range(1, total + 1):
+        for p in plan:
             # click page selector
             drv.find_element(By.CSS_SELECTOR, f"input[title='{p}']").click()
             wait_page_border(drv, p)
@@ -85,6 +90,7 @@ def scrape():
                 By.CSS_SELECTOR, "a[href*='articledetailpage.aspx?id=']")
             if not overlays:
                 print(f"page {p:02d}: no article overlays")
+                plan.mark(p)
                 continue
 
             print(f"page {p:02d}: {len(overlays)} articles")
@@ -115,6 +121,10 @@ def scrape():
                     drv.close()
                     drv.switch_to.window(main_tab)
 
+            plan.mark(p)
+
+        plan.summary()
+
     finally:
         drv.quit()
         print("\nDone. Files in:", OUT_ROOT.resolve())
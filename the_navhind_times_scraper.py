@@ -8,11 +8,12 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 # from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from bs4 import BeautifulSoup
-import requests
 from datetime import datetime
 from PIL import Image
 import io
 
+from article_fetch import extract_image_urls, fetch_articles, session_from_driver
+
 today = datetime.today()
 formatted_date = today.strftime("%Y-%m-%d")
 base_url = f"https://epaper.navhindtimes.in/mainpage.aspx?pdate={formatted_date}"
@@ -43,69 +44,43 @@ def extract_page_info(element):
     return None, None
 
 
-def download_article_images(driver, story_id, date, page_num):
-    """Download images from a specific article page"""
-    try:
-        print(f"\nProcessing article {story_id} for page {page_num}")
-
-        # Create directory structure
-        root_dir = "downloads/the_navhind_times"
-        edition_dir = os.path.join(root_dir, "goa")
-        if not os.path.exists(edition_dir):
-            os.makedirs(edition_dir)
-
-        # Navigate to article page
-        article_url = f"https://epaper.navhindtimes.in/NewsDetail.aspx?storyid={story_id}&date={date}"
-        print(f"Navigating to: {article_url}")
-
-        # Open in new tab
-        driver.execute_script(f"window.open('{article_url}', '_blank');")
-        time.sleep(2)
+def article_url_for(story_id, date):
+    return f"https://epaper.navhindtimes.in/NewsDetail.aspx?storyid={story_id}&date={date}"
 
-        # Switch to new tab
-        driver.switch_to.window(driver.window_handles[-1])
 
-        # Find and download images
-        images = driver.find_elements(By.TAG_NAME, "img")
-        image_count = 0
+def save_article_images(session, story_id, article_url, html, page_num):
+    """Download images from a fetched article page"""
+    # Create directory structure
+    root_dir = "downloads/the_navhind_times"
+    edition_dir = os.path.join(root_dir, "goa")
+    os.makedirs(edition_dir, exist_ok=True)
 
-        for img in images:
-            img_url = img.get_attribute('src')
-            if img_url and ('storyImages' in img_url or 'PageImages' in img_url):
-                print(f"Found image: {img_url}")
-                try:
-                    # Download image
-                    response = requests.get(img_url)
-                    if response.status_code == 200:
-                        # Create filename with new format
-                        filename = f"the_navhind_times{formatted_date}{page_num}.png"
-                        filepath = os.path.join(edition_dir, filename)
-
-                        # Save image directly as PNG
-                        with open(filepath, 'wb') as f:
-                            f.write(response.content)
-                        print(f"Saved image to {filepath}")
-                        image_count += 1
-                except Exception as e:
-                    print(f"Error downloading image: {e}")
-
-        # Close tab and switch back
-        driver.close()
-        driver.switch_to.window(driver.window_handles[0])
-        time.sleep(1)
-
-        print(f"Downloaded {image_count} images for article {story_id}")
-        return image_count
+    img_urls = extract_image_urls(
+        html, article_url,
+        keep=lambda url: 'storyImages' in url or 'PageImages' in url)
+    image_count = 0
 
-    except Exception as e:
-        print(f"Error processing article images: {e}")
-        # Try to close tab and switch back in case of error
+    for img_index, img_url in enumerate(img_urls):
+        print(f"Found image: {img_url}")
         try:
-            driver.close()
-            driver.switch_to.window(driver.window_handles[0])
-        except:
-            pass
-        return 0
+            response = session.get(img_url, timeout=30)
+            if response.status_code == 200:
+                # Articles of one page are saved concurrently, so the story id
+                # keeps their filenames apart.
+                suffix = f"_{img_index}" if img_index else ""
+                filename = f"the_navhind_times{formatted_date}{page_num}_{story_id}{suffix}.png"
+                filepath = os.path.join(edition_dir, filename)
+
+                # Save image directly as PNG
+                with open(filepath, 'wb') as f:
+                    f.write(response.content)
+                print(f"Saved image to {filepath}")
+                image_count += 1
+        except Exception as e:
+            print(f"Error downloading image: {e}")
+
+    print(f"Downloaded {image_count} images for article {story_id}")
+    return image_count
 
 
 def process_modal_links(driver, modal_html, page_num, date):
@@ -117,19 +92,23 @@ def process_modal_links(driver, modal_html, page_num, date):
 
         print(f"\nFound {len(click_links)} GetClickData links in page {page_num}")
 
-        total_images = 0
+        articles = []
         for link in click_links:
             onclick = link['onclick']
             match = re.search(r"GetClickData\('(\d+)','([^']+)'\)", onclick)
             if match:
                 story_id = match.group(1)
                 date = match.group(2)
-                print(f"\nProcessing link: {link.text.strip()}")
-                print(f"Story ID: {story_id}, Date: {date}")
-
-                # Download images from article
-                image_count = download_article_images(driver, story_id, date, page_num)
-                total_images += image_count
+                print(f"Story ID: {story_id}, Date: {date} ({link.text.strip()})")
+                articles.append((story_id, article_url_for(story_id, date)))
+
+        # Article pages are fetched over HTTP in parallel instead of being
+        # opened one by one in a browser tab.
+        session = session_from_driver(driver, referer=base_url)
+        counts = fetch_articles(
+            session, articles,
+            lambda story_id, url, html: save_article_images(session, story_id, url, html, page_num))
+        total_images = sum(count or 0 for count in counts)
 
         print(f"\nTotal images downloaded for page {page_num}: {total_images}")
         return total_images
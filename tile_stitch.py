@@ -0,0 +1,188 @@
+"""
+Disk-backed stitching of tiled page images.
+
+Sakal-style viewers serve each page as a grid of JPEG tiles. Pasting decoded
+tiles into one in-memory RGB image costs width * height * 3 bytes of RAM per
+page, which reaches hundreds of MB at higher zoom levels. TiledPage instead
+reads the grid layout from the tile headers, decodes one tile at a time into
+a memory-mapped raw array on disk and streams that array to the encoder, so
+resident memory stays around one tile plus the compressed output.
+"""
+import math
+import os
+import struct
+import tempfile
+import time
+import zlib
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from image_validate import image_header
+
+# Width / height of a typical broadsheet page; used only to choose between
+# grid shapes when every tile has the same size.
+PAGE_ASPECT = 0.65
+MAX_TILES = 400
+
+
+def fetch_tiles(fetch, max_tiles=MAX_TILES, retries=3, backoff=1.0):
+    """Fetch tiles 0, 1, 2, ... until ``fetch(index)`` returns None.
+
+    ``fetch`` returns None only when the tile does not exist (404 or an
+    out-of-range answer) and raises on any other failure. Failures are
+    retried; a tile that still fails raises ValueError, because stopping
+    there would stitch a truncated page.
+    """
+    tiles = []
+    for index in range(max_tiles):
+        for attempt in range(retries + 1):
+            try:
+                data = fetch(index)
+                break
+            except Exception as e:
+                if attempt == retries:
+                    raise ValueError(f"tile {index} failed after {retries + 1} attempts: {e}")
+                time.sleep(backoff * 2 ** attempt)
+        if data is None:
+            break
+        tiles.append(data)
+    return tiles
+
+
+def _is_prime(n):
+    return n > 1 and all(n % d for d in range(2, math.isqrt(n) + 1))
+
+
+def check_grid(sizes, cols, rows):
+    """Raise ValueError unless every column has one width and every row one height."""
+    if cols * rows != len(sizes):
+        raise ValueError(f"{len(sizes)} tiles do not fill a {cols}x{rows} grid")
+    for col in range(cols):
+        if len({sizes[row * cols + col][0] for row in range(rows)}) > 1:
+            raise ValueError(f"tile widths differ within column {col} of a {cols}x{rows} grid")
+    for row in range(rows):
+        if len({sizes[row * cols + col][1] for col in range(cols)}) > 1:
+            raise ValueError(f"tile heights differ within row {row} of a {cols}x{rows} grid")
+
+
+def detect_grid(sizes):
+    """Return ``(columns, rows)`` for tile sizes given in row-major order.
+
+    Edge tiles are usually cropped, so the first tile narrower than tile 0
+    closes the first row. With uniform tiles the factorisation whose page
+    shape is closest to PAGE_ASPECT wins (a square count gives a square grid).
+    Raises ValueError for counts no real page has (a prime number of tiles
+    other than one, or a count that the edge tiles do not divide into rows),
+    which is what a page missing some of its tiles looks like.
+    """
+    count = len(sizes)
+    first_width = sizes[0][0]
+    for index, (width, _) in enumerate(sizes[1:], start=1):
+        if width != first_width:
+            cols = index + 1
+            if count % cols:
+                raise ValueError(f"{count} tiles do not fill rows of {cols} "
+                                 f"(edge tile at index {index})")
+            check_grid(sizes, cols, count // cols)
+            return cols, count // cols
+    if _is_prime(count):
+        raise ValueError(f"{count} tiles cannot form a page grid")
+
+    width, height = sizes[0]
+    shapes = [(cols, count // cols) for cols in range(1, count + 1)
+              if count % cols == 0]
+    return min(shapes, key=lambda shape: (
+        abs(math.log((shape[0] * width) / (shape[1] * height) / PAGE_ASPECT)),
+        abs(shape[0] - shape[1])))
+
+
+class TiledPage:
+    """One page assembled from encoded tiles into a memory-mapped array."""
+
+    def __init__(self, tiles, grid=None, workdir=None):
+        if not tiles:
+            raise ValueError("no tiles")
+        self.tiles = tiles
+        sizes = []
+        for data in tiles:
+            header = image_header(data[:256 * 1024])
+            if header is None or header[1] is None:
+                with Image.open(BytesIO(data)) as image:
+                    sizes.append(image.size)
+            else:
+                sizes.append((header[1], header[2]))
+        self.cols, self.rows = grid or detect_grid(sizes)
+        check_grid(sizes, self.cols, self.rows)
+
+        column_widths = [sizes[col][0] for col in range(self.cols)]
+        row_heights = [sizes[row * self.cols][1] for row in range(self.rows)]
+        self._x = np.cumsum([0] + column_widths).tolist()
+        self._y = np.cumsum([0] + row_heights).tolist()
+        self.width, self.height = self._x[-1], self._y[-1]
+
+        handle, self._path = tempfile.mkstemp(suffix=".rgbx", dir=workdir)
+        os.close(handle)
+        # RGBX rows let Pillow wrap the mapping without copying it
+        self.pixels = np.memmap(self._path, dtype=np.uint8, mode="w+",
+                                shape=(self.height, self.width, 4))
+        self._assemble()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _assemble(self):
+        for index, data in enumerate(self.tiles):
+            row, col = divmod(index, self.cols)
+            x, y = self._x[col], self._y[row]
+            with Image.open(BytesIO(data)) as tile:
+                rgba = np.asarray(tile.convert("RGBX"))
+            h = min(rgba.shape[0], self.height - y)
+            w = min(rgba.shape[1], self.width - x)
+            self.pixels[y:y + h, x:x + w] = rgba[:h, :w]
+        self.pixels.flush()
+        self.tiles = None  # the encoded tiles are no longer needed
+
+    def image(self):
+        """Pillow view of the page backed by the memory map (no copy)."""
+        return Image.frombuffer("RGBX", (self.width, self.height), self.pixels,
+                                "raw", "RGBX", 0, 1)
+
+    def _write_png(self, out, compress_level, rows_per_chunk=256):
+        def chunk(kind, payload):
+            out.write(struct.pack(">I", len(payload)) + kind + payload)
+            out.write(struct.pack(">I", zlib.crc32(kind + payload) & 0xFFFFFFFF))
+
+        out.write(b"\x89PNG\r\n\x1a\n")
+        chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+        compressor = zlib.compressobj(compress_level)
+        filters = np.zeros((rows_per_chunk, 1), dtype=np.uint8)
+        for y in range(0, self.height, rows_per_chunk):
+            block = self.pixels[y:y + rows_per_chunk, :, :3]
+            rows = block.shape[0]
+            scanlines = np.hstack([filters[:rows], block.reshape(rows, -1)])
+            data = compressor.compress(scanlines.tobytes())
+            if data:
+                chunk(b"IDAT", data)
+        chunk(b"IDAT", compressor.flush())
+        chunk(b"IEND", b"")
+
+    def encode(self, fmt="jpeg", quality=90, compress_level=1):
+        """Encode the page; JPEG and PNG stream rows from the memory map."""
+        out = BytesIO()
+        if fmt in ("jpeg", "jpg"):
+            self.image().save(out, "JPEG", quality=quality)
+        elif fmt == "png":
+            self._write_png(out, compress_level)
+        else:
+            self.image().convert("RGB").save(out, fmt.upper())
+        return out.getvalue()
+
+    def close(self):
+        if self.pixels is not None:
+            self.pixels = None  # dropping the last reference unmaps the file
+            os.remove(self._path)
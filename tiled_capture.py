@@ -0,0 +1,133 @@
+"""
+Viewer screenshots captured as fixed-size clip tiles.
+
+A ``full_page=True`` screenshot of a zoomed e-paper viewer makes Chromium
+rasterise and encode one giant bitmap, which spikes renderer memory and keeps
+the browser thread busy encoding. TiledCapture grabs the page region as a
+grid of clipped screenshots (through the CDP ``Page.captureScreenshot`` call
+where available, otherwise Playwright's clipped screenshot) and hands the
+tiles to a worker thread that stitches them with tile_stitch.TiledPage and
+encodes the result, so the browser can move on to the next page meanwhile.
+"""
+import base64
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from tile_stitch import TiledPage
+
+# Page coordinates of an element: bounding_box() is relative to the viewport
+_ELEMENT_BOX = """(el) => {
+    const r = el.getBoundingClientRect();
+    return {x: r.left + window.scrollX, y: r.top + window.scrollY,
+            width: r.width, height: r.height};
+}"""
+_DOCUMENT_BOX = """() => ({x: 0, y: 0,
+    width: document.documentElement.scrollWidth,
+    height: document.documentElement.scrollHeight})"""
+
+
+class TiledCapture:
+    """Screenshot a page or element as ``tile_size`` CSS-pixel clip tiles.
+
+    ``tile_format`` is what the browser encodes each tile as ("png" or
+    "jpeg"); the stitched page is saved through ``codec`` when one is given.
+    ``capture`` returns a Future for the saved path; ``close`` waits for all.
+    """
+
+    def __init__(self, tile_size=1024, tile_format="png", quality=90,
+                 use_cdp=True, workers=2, workdir=None):
+        self.tile_size = tile_size
+        self.tile_format = tile_format
+        self.quality = quality
+        self.use_cdp = use_cdp
+        self.workdir = workdir
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._futures = []
+        self._sessions = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _cdp_session(self, page):
+        if not self.use_cdp:
+            return None
+        if page not in self._sessions:
+            try:
+                self._sessions[page] = page.context.new_cdp_session(page)
+            except Exception as e:  # not Chromium
+                logging.info(f"CDP unavailable, using clipped screenshots: {e}")
+                self._sessions[page] = None
+        return self._sessions[page]
+
+    def _grab(self, page, clip):
+        session = self._cdp_session(page)
+        if session is not None:
+            params = {"format": self.tile_format, "clip": dict(clip, scale=1),
+                      "captureBeyondViewport": True}
+            if self.tile_format == "jpeg":
+                params["quality"] = self.quality
+            return base64.b64decode(session.send("Page.captureScreenshot", params)["data"])
+        options = {"quality": self.quality} if self.tile_format == "jpeg" else {}
+        return page.screenshot(clip=clip, full_page=True, type=self.tile_format, **options)
+
+    def grab_tiles(self, page, element=None):
+        """Capture the clip tiles in row-major order; returns (tiles, grid)."""
+        box = element.evaluate(_ELEMENT_BOX) if element else page.evaluate(_DOCUMENT_BOX)
+        x0, y0 = round(box["x"]), round(box["y"])
+        width, height = round(box["width"]), round(box["height"])
+        if width <= 0 or height <= 0:
+            raise ValueError("nothing to capture (empty region)")
+        xs = range(x0, x0 + width, self.tile_size)
+        ys = range(y0, y0 + height, self.tile_size)
+        tiles = []
+        for y in ys:
+            for x in xs:
+                clip = {"x": x, "y": y,
+                        "width": min(self.tile_size, x0 + width - x),
+                        "height": min(self.tile_size, y0 + height - y)}
+                tiles.append(self._grab(page, clip))
+        return tiles, (len(xs), len(ys))
+
+    def _assemble(self, tiles, grid, dest, codec, fmt):
+        with TiledPage(tiles, grid=grid, workdir=self.workdir) as stitched:
+            data = stitched.encode(fmt, quality=self.quality,
+                                   compress_level=codec.png_compress_level if codec else 1)
+        if codec is not None:
+            return codec.save_bytes(data, dest)
+        with open(dest, "wb") as f:
+            f.write(data)
+        return dest
+
+    def capture(self, page, dest, element=None, codec=None):
+        """Grab the tiles now; stitch and save them to ``dest`` in the background."""
+        tiles, grid = self.grab_tiles(page, element)
+        fmt = codec.fmt if codec is not None and codec.fmt != "original" else self.tile_format
+        future = self._executor.submit(self._assemble, tiles, grid, str(dest), codec, fmt)
+        self._futures.append(future)
+        return future
+
+    def wait(self):
+        """Wait for pending pages; returns the paths saved (failures logged)."""
+        saved = []
+        pending, self._futures = self._futures, []
+        for future in pending:
+            try:
+                saved.append(future.result())
+            except Exception as e:
+                logging.error(f"❌ Failed to stitch captured tiles: {e}")
+        return saved
+
+    def close(self):
+        saved = self.wait()
+        self._executor.shutdown()
+        for session in self._sessions.values():
+            if session is not None:
+                try:
+                    session.detach()
+                except Exception:
+                    pass
+        self._sessions.clear()
+        return saved
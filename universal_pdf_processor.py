@@ -0,0 +1,239 @@
+"""
+Parallel PDF-to-image rasterization for the PDF e-papers.
+
+Papers such as Sanaleibak, Mawphor and Suvarna Times publish one PDF per
+page. Converting them one page at a time through ``convert_from_path`` and
+``Image.save`` is the slowest step of those crawls. Every page here is a
+separate job: a pool of workers each drives its own ``pdftoppm`` process,
+which writes the image straight to disk. Pages whose image already exists are
+skipped, so a re-run only renders what is missing.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+DEFAULT_DPI = 200
+DEFAULT_FORMAT = "png"
+
+PAPERS = {
+    "sanaleibak": {
+        "download_dir": "downloads/sanaleibak",
+        "date_format": "%d-%m-%Y",
+        "edition_name": "sanaleibak",
+        "edition_city": "imphal",
+        "publication": {
+            "publicationName": "Sanaleibak",
+            "editionName": "Imphal",
+            "languageName": "Manipuri",
+            "zoneName": "East",
+        },
+    },
+    "mawphor": {
+        "download_dir": "downloads/mawphor",
+        "date_format": "%Y%m%d",
+        "edition_name": "mawphor",
+        "edition_city": "imphal",
+        "publication": {
+            "publicationName": "Mawphor",
+            "editionName": "Imphal",
+            "languageName": "Manipuri",
+            "zoneName": "East",
+        },
+    },
+    "suvarna_times": {
+        "download_dir": "downloads/suvarna_times_of_karnataka",
+        "date_format": "%Y%m%d",
+        "edition_name": "suvarna_times",
+        "edition_city": "bangalore",
+        "publication": {
+            "publicationName": "Suvarna Times of Karnataka",
+            "editionName": "Bangalore",
+            "languageName": "Kannada",
+            "zoneName": "South",
+        },
+    },
+}
+
+
+def newspaper_images_dir():
+    """Common storage directory for page images (same as epaperset2.py)."""
+    is_docker = os.path.exists('/.dockerenv') or os.environ.get('DOCKER_CONTAINER')
+    if is_docker:
+        return "/app/newspaper_images"
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))), "newspaper_images")
+
+
+def page_jobs(pdf_path, output_dir, stem, fmt=DEFAULT_FORMAT):
+    """Return one ``(pdf_path, page, output_path)`` job per page of a PDF.
+
+    A single-page PDF renders to ``<stem>.<fmt>``; further pages get a
+    ``_<page>`` suffix.
+    """
+    pages = pdfinfo_from_path(str(pdf_path))["Pages"]
+    jobs = []
+    for page in range(1, pages + 1):
+        name = f"{stem}.{fmt}" if pages == 1 else f"{stem}_{page}.{fmt}"
+        jobs.append((str(pdf_path), page, os.path.join(str(output_dir), name)))
+    return jobs
+
+
+def render_page(pdf_path, page, output_path, dpi=DEFAULT_DPI, fmt=DEFAULT_FORMAT):
+    """Render one PDF page to ``output_path`` with pdftoppm.
+
+    The image is written under a temporary name and renamed once complete,
+    so an interrupted run never leaves a truncated page behind to be skipped.
+    """
+    folder, name = os.path.split(output_path)
+    os.makedirs(folder or ".", exist_ok=True)
+    temp_stem = os.path.splitext(name)[0] + ".part"
+    paths = convert_from_path(
+        pdf_path,
+        dpi=dpi,
+        first_page=page,
+        last_page=page,
+        fmt=fmt,
+        output_folder=folder or ".",
+        output_file=temp_stem,
+        single_file=True,
+        paths_only=True,
+    )
+    if not paths:
+        raise RuntimeError(f"pdftoppm produced no image for page {page}")
+    os.replace(paths[0], output_path)
+    return output_path
+
+
+def rasterize(jobs, dpi=DEFAULT_DPI, fmt=DEFAULT_FORMAT, workers=None):
+    """Render every ``(pdf_path, page, output_path)`` job in parallel.
+
+    Each worker thread waits on its own pdftoppm process, so pages render
+    on separate cores. Returns ``(rendered, skipped, failed)`` lists of jobs.
+    """
+    started = time.perf_counter()
+    rendered, skipped, failed = [], [], []
+    todo = []
+    for job in jobs:
+        output_path = job[2]
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            skipped.append(job)
+        else:
+            todo.append(job)
+
+    workers = workers or os.cpu_count() or 1
+    if todo:
+        print(f"🖼️  Rendering {len(todo)} pages at {dpi} DPI with {workers} workers "
+              f"({len(skipped)} already rendered)")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(render_page, pdf_path, page, output_path,
+                                       dpi, fmt): (pdf_path, page, output_path)
+                       for pdf_path, page, output_path in todo}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    print(f"✅ Saved image: {future.result()}")
+                    rendered.append(job)
+                except Exception as e:
+                    print(f"❌ Failed to render page {job[1]} of {job[0]}: {e}")
+                    failed.append(job)
+
+    elapsed = time.perf_counter() - started
+    print(f"Rendered {len(rendered)} pages, skipped {len(skipped)}, "
+          f"failed {len(failed)} in {elapsed:.1f}s")
+    return rendered, skipped, failed
+
+
+def convert_pdfs(pdf_files, output_dir, stem_for, dpi=DEFAULT_DPI,
+                 fmt=DEFAULT_FORMAT, workers=None, delete_pdfs=True):
+    """Rasterize a list of PDFs; ``stem_for(pdf_path)`` names their images.
+
+    PDFs whose pages all rendered (or were already on disk) are deleted
+    when ``delete_pdfs`` is set. Returns True when no page failed.
+    """
+    jobs = []
+    for pdf_path in pdf_files:
+        try:
+            jobs.extend(page_jobs(pdf_path, output_dir, stem_for(pdf_path), fmt))
+        except Exception as e:
+            print(f"❌ Could not read {pdf_path}: {e}")
+            return False
+
+    rendered, skipped, failed = rasterize(jobs, dpi=dpi, fmt=fmt, workers=workers)
+
+    if delete_pdfs:
+        failed_pdfs = {job[0] for job in failed}
+        for pdf_path in pdf_files:
+            if str(pdf_path) in failed_pdfs:
+                continue
+            try:
+                os.remove(pdf_path)
+                print(f"🗑️  Deleted PDF: {pdf_path}")
+            except Exception as e:
+                print(f"Failed to delete original PDF file {pdf_path}: {e}")
+    return not failed
+
+
+def notify_gateway(paper, images_dir):
+    try:
+        from notify_gateway import process_newspaper_directory
+        from config import config
+
+        settings = PAPERS[paper]
+        publication_info = config.get(settings["download_dir"], settings["publication"])
+        success = process_newspaper_directory(images_dir, {paper: publication_info})
+        print("Successfully notified gateway" if success else "Failed to notify gateway")
+        return success
+    except Exception as e:
+        print(f"Error notifying gateway: {e}")
+        return False
+
+
+def process_paper(paper, notify=False, date=None, dpi=DEFAULT_DPI, workers=None):
+    """Rasterize the PDFs a paper's crawler downloaded for ``date``."""
+    settings = PAPERS[paper]
+    date = date or datetime.today()
+    source_dir = os.path.join(settings["download_dir"],
+                              date.strftime(settings["date_format"]))
+    if not os.path.isdir(source_dir):
+        print(f"No downloads found in {source_dir}")
+        return False
+
+    pdf_files = sorted(
+        (os.path.join(source_dir, name) for name in os.listdir(source_dir)
+         if name.lower().endswith(".pdf")),
+        key=lambda path: (len(path), path),
+    )
+    if not pdf_files:
+        print(f"No PDFs found in {source_dir}")
+        return False
+
+    images_dir = newspaper_images_dir()
+    prefix = (f"{settings['edition_name']}_{settings['edition_city']}_"
+              f"{date.strftime('%Y-%m-%d')}")
+    print(f"Converting {len(pdf_files)} PDFs to images in {images_dir}")
+    success = convert_pdfs(
+        pdf_files,
+        images_dir,
+        lambda path: f"{prefix}_{pdf_files.index(path) + 1:02d}",
+        dpi=dpi,
+        workers=workers,
+    )
+
+    if success and notify:
+        success = notify_gateway(paper, images_dir)
+    return success
+
+
+def process_sanaleibak(notify=False, **kwargs):
+    return process_paper("sanaleibak", notify=notify, **kwargs)
+
+
+def process_mawphor(notify=False, **kwargs):
+    return process_paper("mawphor", notify=notify, **kwargs)
+
+
+def process_suvarna_times(notify=False, **kwargs):
+    return process_paper("suvarna_times", notify=notify, **kwargs)
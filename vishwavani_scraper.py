@@ -6,11 +6,20 @@ from pathlib import Path
 from PIL import Image
 from playwright.async_api import async_playwright
 
+from edition_pool import DEFAULT_CONCURRENCY, run_editions_async
+from image_hash import HashIndex
+from image_output import OutputCodec
 
 
 class VishwavaniEpaperDownloader:
-    def __init__(self, playwright):
+    def __init__(self, playwright, concurrency=DEFAULT_CONCURRENCY,
+                 output_format="original"):
         self.playwright = playwright
+        self.concurrency = concurrency
+        # "original" keeps the page image exactly as served
+        self.codec = OutputCodec(output_format)
+        # Flags pages already seen in another edition or on an earlier day
+        self.hash_index = HashIndex()
         self.today = datetime.today()
         self.date_str = self.today.strftime("%Y-%m-%d")
         self.formatted_date = datetime.strptime(self.date_str,
@@ -20,8 +29,7 @@ class VishwavaniEpaperDownloader:
         self.root_dir = Path(os.path.join("downloads","vishwavani"))
         self.root_dir.mkdir(parents=True, exist_ok=True)
 
-    async def download_vishwavani_epaper_with_edition(self):
-        browser = await self.playwright.chromium.launch(headless=True)
+    async def open_viewer(self, browser):
         context = await browser.new_context()
         page = await context.new_page()
 
@@ -29,6 +37,11 @@ class VishwavaniEpaperDownloader:
         await page.evaluate(
             f"document.querySelector('#datepicker')._flatpickr.setDate('{self.date_str}')"
         )
+        return context, page
+
+    async def download_vishwavani_epaper_with_edition(self):
+        browser = await self.playwright.chromium.launch(headless=True)
+        context, page = await self.open_viewer(browser)
 
         editions = await page.query_selector_all('#select-main-edition option')
         edition_values = []
@@ -36,32 +49,48 @@ class VishwavaniEpaperDownloader:
             edition_value = await edition.get_attribute("value")
             edition_name = await edition.inner_text()
             edition_values.append((edition_value, edition_name.strip().lower()))
+        await context.close()
 
         print(f"Found {len(edition_values)} editions: {edition_values}")
 
-        for edition_value, edition_name in edition_values:
-            print(f"🔄 Switching to edition: {edition_name} (ID: {edition_value})")
+        report = await run_editions_async(
+            "vishwavani", edition_values,
+            lambda edition: self.download_edition(browser, *edition),
+            concurrency=self.concurrency,
+            name=lambda edition: edition[1])
 
-            # Create edition-specific folder structure
-            edition_base_dir = self.root_dir / edition_name
-            # pages_dir = edition_base_dir / "Pages"
-            # news_paper_dir = edition_base_dir / "News_Paper"
+        await browser.close()
+        report.print_summary()
+        self.codec.report("pages")
+        print("✅ All editions processed successfully!")
+        return report
 
-            # for directory in [pages_dir, news_paper_dir]:
-            edition_base_dir.mkdir(parents=True, exist_ok=True)
+    async def download_edition(self, browser, edition_value, edition_name):
+        print(f"🔄 Switching to edition: {edition_name} (ID: {edition_value})")
 
+        # Create edition-specific folder structure
+        edition_base_dir = self.root_dir / edition_name
+        # pages_dir = edition_base_dir / "Pages"
+        # news_paper_dir = edition_base_dir / "News_Paper"
+
+        # for directory in [pages_dir, news_paper_dir]:
+        edition_base_dir.mkdir(parents=True, exist_ok=True)
+
+        # Each edition drives its own context so editions can run side by side.
+        context, page = await self.open_viewer(browser)
+        try:
             await page.select_option("#select-main-edition", value=edition_value)
             await page.wait_for_timeout(1000)
 
             image_paths = await self.download_pages(page,edition_base_dir,edition_name)
+        finally:
+            await context.close()
 
-            # if image_paths:
-            #     await self.create_pdf(edition_name, image_paths, edition_base_dir)
+        # if image_paths:
+        #     await self.create_pdf(edition_name, image_paths, edition_base_dir)
 
-            print(f"📄 Finished downloading edition {edition_name}.")
-
-        await browser.close()
-        print("✅ All editions processed successfully!")
+        print(f"📄 Finished downloading edition {edition_name}.")
+        return len(image_paths)
 
     async def navigate_to_next_page(self, page, current_page_num):
         """
@@ -111,7 +140,12 @@ class VishwavaniEpaperDownloader:
 
         img_path = edition_pages_dir / (f"{edition_name}_{self.formatted_date}_page"
                                         f"_{page_num:02d}.png")
-        img_path.write_bytes(img_bytes)
+        # The extension follows the format actually written
+        img_path = Path(self.codec.save_bytes(img_bytes, img_path))
+        await asyncio.to_thread(
+            self.hash_index.check,
+            f"vishwavani/{edition_name}/{self.date_str}/page_{page_num:02d}",
+            img_bytes, img_path)
         downloaded_pages.add(page_num)  # Mark this page as downloaded
         print(f"✅ Downloaded page {page_num}")
         return img_path